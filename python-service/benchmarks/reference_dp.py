@@ -0,0 +1,75 @@
+"""networkx implementation of the path DP, the original algorithm.
+
+The array kernel in graph_engine.py must give the same ``prev`` table on
+acyclic graphs; tests/test_dp_reference.py and ``benchmarks.run --check``
+compare the two. The two implementations break cycles differently, so
+only acyclic graphs are comparable and the reference rejects the others.
+"""
+import math
+
+import networkx as nx
+
+from graph_engine import (
+    ALPHA, BETA, DELTA, LENGTH_PENALTY, MAX_PATH_LENGTH, CSRGraph, DEFAULT_SEM_PEN,
+    break_cycles, run_dp, topological_levels,
+)
+
+
+def reference_prev(nodes, label_of, edges):
+    """node id -> previous node id on its best path, computed with networkx.
+
+    Raises networkx.NetworkXUnfeasible if the graph has a cycle.
+    """
+    # Edges go from prerequisite (REQUIRES target) to dependent skill (source)
+    G = nx.DiGraph()
+    G.add_nodes_from(nodes)
+    scores = [float(edge["score"]) for edge in edges if edge.get("score") is not None]
+    Smax = max(scores) if scores else 1.0
+    for edge in edges:
+        if edge["source"] in nodes and edge["target"] in nodes:
+            G.add_edge(edge["target"], edge["source"], cost=float(edge.get("score", 0.5)))
+
+    dp = {n: -math.inf for n in G}
+    prev = {}
+    path_lens = {n: 0 for n in G}
+
+    # Sources: Concept/HardSkill nodes without prerequisites, else every
+    # Concept, else the ten nodes with the lowest in-degree
+    sources = [
+        n for n in G
+        if G.in_degree(n) == 0 and ("Concept" in label_of.get(n, ()) or "HardSkill" in label_of.get(n, ()))
+    ]
+    if not sources:
+        sources = [n for n in G if "Concept" in label_of.get(n, ())]
+    if not sources:
+        sources = [n for n, _ in sorted(G.in_degree(), key=lambda item: item[1])[:10]]
+    for n in sources:
+        dp[n] = 0.0
+        path_lens[n] = 1
+
+    for u in nx.topological_sort(G):
+        if dp[u] < -1e8:
+            continue
+        for _, v, d in G.out_edges(u, data=True):
+            s_norm = d["cost"] / Smax if Smax else 0.5
+            gain = DELTA - ALPHA * s_norm - BETA * DEFAULT_SEM_PEN - LENGTH_PENALTY * path_lens[u]
+            cand = dp[u] + gain
+            if path_lens[u] + 1 <= MAX_PATH_LENGTH and cand > dp[v]:
+                dp[v] = cand
+                prev[v] = u
+                path_lens[v] = path_lens[u] + 1
+    return prev
+
+
+def kernel_prev(nodes, label_of, edges):
+    """node id -> previous node id on its best path, computed by the array kernel"""
+    graph = CSRGraph.from_graph_data(nodes, label_of, edges)
+    dag, _ = break_cycles(graph)
+    return dict(run_dp(dag, topological_levels(dag)).prev_map())
+
+
+def prev_mismatches(nodes, label_of, edges):
+    """Node ids whose ``prev`` differs between the array kernel and networkx"""
+    prev = kernel_prev(nodes, label_of, edges)
+    reference = reference_prev(nodes, label_of, edges)
+    return sorted(n for n in set(prev) | set(reference) if prev.get(n) != reference.get(n))
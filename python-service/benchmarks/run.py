@@ -0,0 +1,204 @@
+"""Time the path generation hot paths on synthetic graphs.
+
+Run from the python-service directory:
+
+    python -m benchmarks.run --sizes 1000 10000 100000 1000000 --output results.json
+    python -m benchmarks.run --sizes 10000 --compare results.json
+
+Results are written as JSON (one entry per size and benchmark, timings in
+seconds) so runs from different releases can be compared with --compare.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import main
+from benchmarks.reference_dp import prev_mismatches
+from benchmarks.stub_driver import install
+from benchmarks.synthetic_graph import generate_graph
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def measure(fn, repeats):
+    """Run ``fn`` ``repeats`` times and summarize the wall-clock timings"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "repeats": repeats,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+    }
+
+
+def bench_size(num_edges, repeats, seed, check):
+    """Run every benchmark on one synthetic graph"""
+    graph = generate_graph(num_edges, seed=seed)
+    stub = install(main, graph)
+    # Fresh cache per size so nothing leaks between graphs
+    main.graph_cache = main.GraphSnapshotCache()
+
+    results = {}
+    fetched = {}
+
+    def fetch():
+        fetched["data"] = asyncio.run(main.get_all_graph_data())
+
+    results["get_all_graph_data"] = measure(fetch, repeats)
+    nodes, label_of, edges = fetched["data"]
+
+    holder = {}
+
+    def build_dp():
+        holder["prev"] = main.build_dp_paths(nodes, label_of, edges)
+
+    results["build_dp_paths"] = measure(build_dp, repeats)
+    prev = holder["prev"]
+
+    def build_snapshot():
+        holder["snapshot"] = main.GraphSnapshot(nodes, label_of, edges, "bench")
+
+    results["graph_snapshot"] = measure(build_snapshot, repeats)
+    snapshot = holder["snapshot"]
+
+    job_skills = {
+        job_id: asyncio.run(main.get_job_skills(job_id)) for job_id in graph.job_skills
+    }
+    skill_ids = [skill["id"] for skills in job_skills.values() for skill in skills]
+
+    def build_paths():
+        for skill_id in skill_ids:
+            main.build_path_for_skill(skill_id, prev, nodes)
+
+    results["build_path_for_skill"] = measure(build_paths, repeats)
+
+    def assemble():
+        for job_id, skills in job_skills.items():
+            main.assemble_job_paths(job_id, skills, [], snapshot)
+
+    results["assemble_job_paths"] = measure(assemble, repeats)
+
+    def simple_relationships():
+        for skills in job_skills.values():
+            main.create_simple_skill_relationships(skills)
+
+    results["create_simple_skill_relationships"] = measure(simple_relationships, repeats)
+
+    summary = {
+        "size": num_edges,
+        "nodes": len(nodes),
+        "edges": len(edges),
+        "jobs": len(job_skills),
+        "jobSkills": len(skill_ids),
+        "droppedCycleEdges": len(snapshot.dp_tables.dropped_edges),
+        "neo4jRoundTrips": stub.round_trips,
+    }
+    if check:
+        # The reference breaks cycles differently, so compare on an acyclic graph
+        acyclic = generate_graph(num_edges, seed=seed, cycle_ratio=0.0)
+        mismatches = prev_mismatches(acyclic.nodes, acyclic.label_of, normalized_edges(acyclic.edges))
+        summary["dpMatchesReference"] = not mismatches
+        if mismatches:
+            print(f"DP kernel differs from networkx on {len(mismatches)} nodes, e.g. {mismatches[:5]}")
+    return summary, results
+
+
+def normalized_edges(edges):
+    """Apply the defaults get_all_graph_data() uses for missing score/predicted"""
+    return [
+        {
+            "source": e["source"],
+            "target": e["target"],
+            "score": e["score"] or 0.5,
+            "predicted": e["predicted"] if e["predicted"] is not None else False,
+        }
+        for e in edges
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline_path):
+    """Print the median speedup of every benchmark against a previous run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["size"], r["benchmark"]): r for r in baseline["results"]}
+    print(f"{'size':>10}  {'benchmark':<36}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for result in current["results"]:
+        old = previous.get((result["size"], result["benchmark"]))
+        if old is None:
+            continue
+        ratio = result["median"] / old["median"] if old["median"] else float("inf")
+        print(
+            f"{result['size']:>10}  {result['benchmark']:<36}"
+            f"{old['median']:>12.4f}{result['median']:>12.4f}{ratio:>8.2f}"
+        )
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Approximate number of REQUIRES edges per graph")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    parser.add_argument("--check", action="store_true",
+                        help="Also verify the DP against the networkx reference (slow)")
+    parser.add_argument("--log", action="store_true",
+                        help="Keep the service's logging enabled while timing")
+    args = parser.parse_args(argv)
+
+    if not args.log:
+        logging.disable(logging.WARNING)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "gitRevision": git_revision(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "graphs": [],
+        "results": [],
+    }
+    for size in args.sizes:
+        summary, results = bench_size(size, args.repeats, args.seed, args.check)
+        report["graphs"].append(summary)
+        for name, timing in results.items():
+            report["results"].append({"size": size, "benchmark": name, **timing})
+            print(f"{size:>10}  {name:<36}{timing['median']:>10.4f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(report, args.compare)
+    return report
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,141 @@
+"""In-memory stand-in for the async Neo4j driver.
+
+Answers the read queries issued by main.py from a SyntheticGraph so the
+service code can be benchmarked without a database. Queries are matched
+on their MATCH clauses; anything else raises NotImplementedError so a new
+query shows up immediately instead of silently returning nothing.
+"""
+
+
+class StubResult:
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self._records:
+            yield record
+
+    async def single(self):
+        return self._records[0] if self._records else None
+
+
+class StubTransaction:
+    def __init__(self, driver):
+        self._driver = driver
+
+    async def run(self, query, parameters=None, **kwargs):
+        params = {**(parameters or {}), **kwargs}
+        self._driver.round_trips += 1
+        records = self._driver.answer(" ".join(query.split()), params)
+        self._driver.rows += len(records)
+        return StubResult(records)
+
+
+class StubSession:
+    def __init__(self, driver):
+        self._driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, parameters=None, **kwargs):
+        return await StubTransaction(self._driver).run(query, parameters, **kwargs)
+
+    async def execute_read(self, work, *args, **kwargs):
+        return await work(StubTransaction(self._driver), *args, **kwargs)
+
+
+class StubDriver:
+    """Async driver serving a SyntheticGraph; counts round-trips and rows"""
+    def __init__(self, graph):
+        self.graph = graph
+        self.round_trips = 0
+        self.rows = 0
+        self._skill_records = {
+            record["id"]: record
+            for records in graph.job_skills.values() for record in records
+        }
+        self._out_edges = {}
+        for edge in graph.edges:
+            self._out_edges.setdefault(edge["source"], []).append(edge)
+
+    def session(self, **kwargs):
+        return StubSession(self)
+
+    async def close(self):
+        pass
+
+    def _job_skill_rows(self, job_id):
+        return self.graph.job_skills.get(job_id, [])
+
+    def answer(self, query, params):
+        graph = self.graph
+        if "RETURN 1" in query:
+            return [{"test": 1}]
+        if "nodeCount" in query and "edgeCount" in query:
+            return [{
+                "nodeCount": len(graph.nodes),
+                "edgeCount": len(graph.edges),
+                "nodesUpdatedAt": None,
+                "edgesUpdatedAt": None,
+            }]
+        if "scoreMax" in query:
+            scores = [edge["score"] or 0.5 for edge in graph.edges]
+            return [{"scoreMax": max(scores) if scores else None}]
+        if "HAS_DESCRIPTION" in query:
+            return []
+        if "UNWIND $jobIds" in query:
+            return [
+                {"jobId": job_id, **record}
+                for job_id in params["jobIds"] for record in self._job_skill_rows(job_id)
+            ]
+        if "MATCH (j:Job {id: $jobId})-[:REQUIRES]->(s)" in query:
+            return list(self._job_skill_rows(params["jobId"]))
+        if "UNWIND $ids" in query and "s.definition" in query:
+            return [
+                {"id": node_id, "definition": graph.nodes[node_id].get("definition")}
+                for node_id in params["ids"] if node_id in graph.nodes
+            ]
+        if "UNWIND $ids" in query and "[r:REQUIRES]" in query:
+            rows = []
+            for node_id in params["ids"]:
+                for edge in self._out_edges.get(node_id, ()):
+                    target = edge["target"]
+                    if "Job" in graph.label_of[target]:
+                        continue
+                    rows.append({
+                        "source": node_id,
+                        "sourceName": graph.nodes[node_id]["name"],
+                        "sourceLabels": list(graph.label_of[node_id]),
+                        "target": target,
+                        "targetName": graph.nodes[target]["name"],
+                        "targetLabels": list(graph.label_of[target]),
+                        "score": edge["score"],
+                        "predicted": edge["predicted"],
+                    })
+            return rows
+        if "MATCH (n1)-[r:REQUIRES]->(n2)" in query:
+            return graph.edges
+        if "RETURN n.id as id, n.name as name, labels(n) as labels" in query:
+            records = [
+                {"id": node_id, "name": node["name"], "labels": list(node["labels"])}
+                for node_id, node in graph.nodes.items()
+            ]
+            if "n.definition" in query:
+                for record in records:
+                    record["definition"] = graph.nodes[record["id"]].get("definition")
+            return records
+        raise NotImplementedError(f"Stub driver cannot answer query: {query}")
+
+
+def install(main_module, graph):
+    """Point main.neo4j_driver at a stub serving ``graph`` and return the stub"""
+    driver = StubDriver(graph)
+    main_module.neo4j_driver._driver = driver
+    return driver
@@ -0,0 +1,114 @@
+"""Synthetic skill graphs shaped like the production Neo4j data.
+
+Nodes are numbered so that lower ids are more foundational: a skill
+REQUIRES skills with a lower number, and prerequisites are drawn with a
+bias towards the lowest numbers. That gives a heavy-tailed in-degree
+(a few basic concepts are required by everything) and a log-normal
+out-degree. A small share of the edges is reversed to inject cycles,
+like the link predictor does in the real graph.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+
+SKILL_LABELS = ["Concept", "HardSkill", "Technology", "SoftSkill"]
+# Share of each skill label in the production graph
+LABEL_WEIGHTS = [0.3, 0.35, 0.25, 0.1]
+
+
+@dataclass
+class SyntheticGraph:
+    """Graph data in the shapes main.py gets back from Neo4j"""
+    nodes: dict
+    label_of: dict
+    edges: list
+    # job id -> list of skill records as returned by the job skills query
+    job_skills: dict = field(default_factory=dict)
+    seed: int = 0
+
+    @property
+    def num_edges(self):
+        return len(self.edges)
+
+
+def _skill_edges(rng, num_skills, num_edges, cycle_ratio):
+    """Draw (dependent, prerequisite) index pairs without duplicates"""
+    # Log-normal out-degree: most skills have a few prerequisites, some many
+    weights = rng.lognormal(mean=0.0, sigma=1.0, size=num_skills)
+    weights[0] = 0.0
+    weights /= weights.sum()
+
+    pairs = np.empty((0, 2), dtype=np.int64)
+    wanted = num_edges
+    while len(pairs) < num_edges:
+        draw = int(wanted * 1.2) + 16
+        src = rng.choice(num_skills, size=draw, p=weights)
+        # u ** 3 concentrates prerequisites on the most foundational skills
+        dst = (src * rng.random(draw) ** 3).astype(np.int64)
+        batch = np.stack([src, dst], axis=1)
+        batch = batch[batch[:, 0] != batch[:, 1]]
+        pairs = np.unique(np.concatenate([pairs, batch]), axis=0)
+        wanted = num_edges - len(pairs)
+    pairs = pairs[rng.permutation(len(pairs))[:num_edges]]
+
+    # Reverse a few edges so the graph contains cycles
+    flip = rng.random(len(pairs)) < cycle_ratio
+    pairs[flip] = pairs[flip][:, ::-1]
+    return np.unique(pairs, axis=0)
+
+
+def generate_graph(num_edges, seed=0, avg_degree=4.0, predicted_ratio=0.3,
+                   cycle_ratio=0.001, skills_per_job=(5, 30)):
+    """Generate a synthetic graph with about ``num_edges`` REQUIRES edges.
+
+    ``predicted_ratio`` is the share of skill edges flagged as predicted and
+    ``cycle_ratio`` the share of edges reversed to create cycles. Jobs make
+    up the remaining edges, each requiring between ``skills_per_job`` skills.
+    """
+    rng = np.random.default_rng(seed)
+    num_skills = max(int(num_edges / avg_degree), 10)
+    num_jobs = max(num_skills // 200, 5)
+    low, high = skills_per_job
+    job_sizes = rng.integers(low, high + 1, size=num_jobs)
+    job_sizes = np.minimum(job_sizes, num_skills)
+    skill_edge_count = max(num_edges - int(job_sizes.sum()), 1)
+
+    labels = rng.choice(len(SKILL_LABELS), size=num_skills, p=LABEL_WEIGHTS)
+    nodes = {}
+    label_of = {}
+    for i, label_idx in enumerate(labels.tolist()):
+        label = SKILL_LABELS[label_idx]
+        node_id = f"s{i}"
+        nodes[node_id] = {"id": node_id, "name": f"{label} {i}", "labels": {label}}
+        label_of[node_id] = {label}
+
+    pairs = _skill_edges(rng, num_skills, skill_edge_count, cycle_ratio)
+    predicted = rng.random(len(pairs)) < predicted_ratio
+    scores = np.round(rng.random(len(pairs)), 4)
+    edges = [
+        {"source": f"s{s}", "target": f"s{t}", "score": score, "predicted": pred}
+        for (s, t), score, pred in zip(pairs.tolist(), scores.tolist(), predicted.tolist())
+    ]
+
+    # Jobs require advanced skills, i.e. the ones with high numbers
+    job_skills = {}
+    for j, size in enumerate(job_sizes.tolist()):
+        job_id = f"job{j}"
+        nodes[job_id] = {"id": job_id, "name": f"Job {j}", "labels": {"Job"}}
+        label_of[job_id] = {"Job"}
+        picks = np.unique(num_skills - 1 - (num_skills * rng.random(size * 2) ** 2).astype(np.int64))
+        picks = rng.permutation(picks)[:size]
+        records = []
+        for i in picks.tolist():
+            skill_id = f"s{i}"
+            label = next(iter(label_of[skill_id]))
+            records.append({
+                "id": skill_id,
+                "name": nodes[skill_id]["name"],
+                "definition": f"Definition of {nodes[skill_id]['name']}",
+                "labels": [label],
+            })
+            edges.append({"source": job_id, "target": skill_id, "score": None, "predicted": None})
+        job_skills[job_id] = records
+
+    return SyntheticGraph(nodes=nodes, label_of=label_of, edges=edges, job_skills=job_skills, seed=seed)
@@ -0,0 +1,152 @@
+"""Node embedding store used for the semantic penalty of the DP.
+
+Embeddings are kept in a float32 ``.npy`` matrix with one L2-normalized
+row per node, memory-mapped read-only, plus a ``.ids.txt`` sidecar with
+the node id of every row. The ``node-embeddings.pt`` file produced by the
+training notebook (a dict of node id -> tensor) is converted to that
+format once, offline or at startup:
+
+    python -m embeddings models/node-embeddings.pt
+
+torch is only imported for that conversion, never on the request path.
+"""
+import logging
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from graph_engine import DEFAULT_SEM_PEN
+
+logger = logging.getLogger(__name__)
+
+# Edges per chunk when computing penalties, bounds the gathered row memory
+PENALTY_CHUNK = 65536
+
+
+def matrix_paths(model_path):
+    """(.npy matrix, .ids.txt sidecar) paths for a model path"""
+    path = Path(model_path)
+    base = path.with_suffix("")
+    return base.with_suffix(".npy"), base.with_suffix(".ids.txt")
+
+
+def convert_pt(pt_path, npy_path=None):
+    """Convert a torch ``{node_id: tensor}`` file into the .npy + ids format"""
+    import torch  # only needed for the one-off conversion
+
+    npy_path, ids_path = matrix_paths(npy_path or pt_path)
+    data = torch.load(pt_path, map_location="cpu")
+    if not isinstance(data, dict) or not data:
+        raise ValueError(f"Expected a non-empty dict of node id -> embedding in {pt_path}")
+    # Node ids are ints in the notebook export and strings in Neo4j
+    ids = [str(k) for k in data]
+    matrix = np.stack([
+        np.asarray(v.detach().cpu().numpy() if hasattr(v, "detach") else v, dtype=np.float32)
+        for v in data.values()
+    ])
+    write_matrix(matrix, ids, npy_path, ids_path)
+    logger.info(f"Converted {len(ids)} embeddings of dimension {matrix.shape[1]} to {npy_path}")
+    return npy_path
+
+
+def write_matrix(matrix, ids, npy_path, ids_path):
+    """Write L2-normalized float32 rows and their node ids"""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    tmp = Path(str(npy_path) + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp, npy_path)
+    Path(ids_path).write_text("\n".join(ids) + "\n", encoding="utf-8")
+
+
+class EmbeddingStore:
+    """Memory-mapped, row-normalized embedding matrix with an id -> row index"""
+
+    def __init__(self, matrix, ids):
+        self.matrix = matrix
+        self.ids = ids
+        self.index = {node_id: row for row, node_id in enumerate(ids)}
+
+    @classmethod
+    def open(cls, npy_path, ids_path):
+        matrix = np.load(npy_path, mmap_mode="r")
+        ids = Path(ids_path).read_text(encoding="utf-8").splitlines()
+        if len(ids) != matrix.shape[0]:
+            raise ValueError(f"{ids_path} has {len(ids)} ids for {matrix.shape[0]} embedding rows")
+        return cls(matrix, ids)
+
+    @property
+    def dim(self):
+        return self.matrix.shape[1]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows_for(self, node_ids):
+        """int64 row of every node id, -1 where the node has no embedding"""
+        index = self.index
+        return np.fromiter((index.get(n, -1) for n in node_ids), dtype=np.int64, count=len(node_ids))
+
+    def edge_penalties(self, graph):
+        """Semantic penalty ``1 - cos(u, v)`` of every edge of a CSRGraph.
+
+        Edges with an endpoint that has no embedding get DEFAULT_SEM_PEN.
+        The result is aligned with the graph's edge positions.
+        """
+        node_rows = self.rows_for(graph.ids)
+        penalties, known = self._penalties(node_rows[graph.sources], node_rows[graph.targets])
+        logger.info(f"Computed semantic penalties for {known} of {graph.num_edges} edges")
+        return penalties
+
+    def penalties(self, source_ids, target_ids):
+        """Semantic penalty of the edges between parallel lists of node ids"""
+        return self._penalties(self.rows_for(source_ids), self.rows_for(target_ids))[0]
+
+    def _penalties(self, src_rows, dst_rows):
+        penalties = np.full(len(src_rows), DEFAULT_SEM_PEN)
+        known = np.flatnonzero((src_rows >= 0) & (dst_rows >= 0))
+        matrix = self.matrix
+        for start in range(0, len(known), PENALTY_CHUNK):
+            chunk = known[start:start + PENALTY_CHUNK]
+            u = matrix[src_rows[chunk]]
+            v = matrix[dst_rows[chunk]]
+            # Rows are unit vectors, so the dot product is the cosine
+            penalties[chunk] = 1.0 - np.einsum("ij,ij->i", u, v, dtype=np.float64)
+        return penalties, len(known)
+
+
+def load_embedding_store(model_path):
+    """Open the embedding store for MODEL_PATH, converting a .pt file if needed.
+
+    Returns None when no embeddings are available, in which case the DP
+    falls back to DEFAULT_SEM_PEN for every edge.
+    """
+    if not model_path:
+        return None
+    path = Path(model_path)
+    npy_path, ids_path = matrix_paths(path)
+    try:
+        if path.suffix == ".pt" and path.exists():
+            stale = not npy_path.exists() or npy_path.stat().st_mtime < path.stat().st_mtime
+            if stale:
+                logger.info(f"Converting {path} to a memory-mappable matrix")
+                convert_pt(path, npy_path)
+        if not npy_path.exists() or not ids_path.exists():
+            logger.warning(f"No node embeddings found at {model_path}, using a constant semantic penalty")
+            return None
+        store = EmbeddingStore.open(npy_path, ids_path)
+        logger.info(f"Loaded {len(store)} node embeddings of dimension {store.dim} from {npy_path}")
+        return store
+    except Exception as e:
+        logger.error(f"Failed to load node embeddings from {model_path}: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for arg in sys.argv[1:]:
+        convert_pt(arg)
@@ -0,0 +1,926 @@
+"""Array-backed skill graph and DP kernel used by the path service.
+
+The graph is stored in compressed sparse row (CSR) form with integer node
+indices. Edges point from a prerequisite to the skill that requires it,
+i.e. the reverse of the (skill)-[:REQUIRES]->(prerequisite) relationship
+in Neo4j, which is the direction the DP walks.
+"""
+from collections.abc import Mapping, Sequence
+import heapq
+import logging
+
+import numpy as np
+
+from tracing import detail
+
+logger = logging.getLogger(__name__)
+
+# Scoring constants from the original Python algorithm
+DELTA, ALPHA, BETA, PRED = 0.3, 0.9, 0.1, 0.7
+MAX_PATH_LENGTH = 15                # maximum reasonable path length
+LENGTH_PENALTY = 0.03               # penalty for longer paths
+DEFAULT_SEM_PEN = 0.5               # semantic penalty when no embeddings are available
+
+# Upper bound on edges scanned while removing cycle edges one at a time
+# before falling back to a single DFS pass per strongly connected component
+CYCLE_BREAK_WORK_BUDGET = 2_000_000
+
+# One bit per node label we care about
+LABEL_BITS = {
+    "Concept": 1,
+    "HardSkill": 2,
+    "Technology": 4,
+    "SoftSkill": 8,
+    "Job": 16,
+}
+
+
+def label_mask(labels):
+    """Encode an iterable of label names as a bitmask"""
+    mask = 0
+    for label in labels:
+        mask |= LABEL_BITS.get(label, 0)
+    return mask
+
+
+def mask_labels(mask):
+    """Decode a label bitmask back into a set of label names"""
+    return {label for label, bit in LABEL_BITS.items() if mask & bit}
+
+
+def row_edges(offsets, rows):
+    """Return the edge positions of the given CSR rows, row by row in order"""
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = offsets[rows]
+    counts = offsets[rows + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    # Offset of every row's first edge inside the concatenated output
+    shifts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return shifts + np.arange(total, dtype=np.int64)
+
+
+class CSRGraph:
+    """Integer-indexed graph with CSR adjacency and per-edge score arrays"""
+
+    def __init__(self, ids, labels, offsets, targets, scores, predicted, score_max, index=None):
+        self.ids = ids                  # node index -> node id
+        self.index = index if index is not None else {node_id: i for i, node_id in enumerate(ids)}
+        self.labels = labels            # uint8 label bitmask per node
+        self.offsets = offsets          # int64, row start of every node (+ sentinel)
+        self.targets = targets          # int32, dependent node of every edge
+        self.scores = scores            # float64 REQUIRES score of every edge
+        self.predicted = predicted      # bool, whether the edge was predicted
+        self.score_max = score_max      # max score used to normalize edge costs
+        self.sources = np.repeat(
+            np.arange(len(ids), dtype=np.int32), np.diff(offsets)
+        )
+
+    @property
+    def num_nodes(self):
+        return len(self.ids)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    @classmethod
+    def from_graph_data(cls, nodes, label_of, edges, score_max=None):
+        """Build the CSR graph from the dicts returned by get_all_graph_data().
+
+        ``score_max`` overrides the edges' own maximum score, so that a
+        subgraph normalizes its costs like the whole graph does.
+        """
+        ids = list(nodes)
+        index = {node_id: i for i, node_id in enumerate(ids)}
+        labels = np.fromiter(
+            (label_mask(label_of.get(node_id, ())) for node_id in ids),
+            dtype=np.uint8, count=len(ids)
+        )
+
+        if score_max is None:
+            scores = [float(edge.get("score", 0.5)) for edge in edges if edge.get("score") is not None]
+            score_max = max(scores) if scores else 1.0
+
+        # Parallel edges collapse onto the first occurrence but keep the
+        # attributes of the last one, like repeated DiGraph.add_edge calls
+        position = {}
+        src, dst, edge_scores, edge_predicted = [], [], [], []
+        for edge in edges:
+            prereq = index.get(edge["target"])
+            dependent = index.get(edge["source"])
+            if prereq is None or dependent is None:
+                continue
+            key = (prereq, dependent)
+            score = float(edge.get("score", 0.5))
+            predicted = bool(edge.get("predicted", False))
+            if key in position:
+                pos = position[key]
+                edge_scores[pos] = score
+                edge_predicted[pos] = predicted
+                continue
+            position[key] = len(src)
+            src.append(prereq)
+            dst.append(dependent)
+            edge_scores.append(score)
+            edge_predicted.append(predicted)
+
+        return cls.from_arrays(
+            ids, labels,
+            np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int32),
+            np.asarray(edge_scores, dtype=np.float64), np.asarray(edge_predicted, dtype=bool),
+            score_max
+        )
+
+    @classmethod
+    def from_arrays(cls, ids, labels, src, dst, scores, predicted, score_max):
+        """Build the CSR graph from parallel edge arrays (prerequisite -> dependent)"""
+        # A stable sort keeps the insertion order of every node's successors
+        order = np.argsort(src, kind="stable")
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(ids)), out=offsets[1:])
+        return cls(
+            ids, labels, offsets,
+            dst[order].astype(np.int32, copy=False),
+            scores[order], predicted[order], score_max
+        )
+
+    def with_edge_changes(self, removed, updated, added, score_max=None):
+        """Copy of the graph with some edges removed, re-scored or added.
+
+        ``removed`` lists edge positions, ``updated`` maps edge positions to
+        ``(score, predicted)`` and ``added`` lists ``(prerequisite, dependent,
+        score, predicted)`` tuples. Added edges go at the end of their rows.
+        Node ids, labels and, if nothing is removed or added, the adjacency
+        arrays are shared with this graph; a reverse adjacency that was
+        already built is carried over instead of being sorted again.
+
+        Returns ``(graph, position)`` where ``position`` maps every old edge
+        position to its new one (-1 for removed edges).
+        """
+        scores = self.scores.copy()
+        predicted = self.predicted.copy()
+        for pos, (score, is_predicted) in updated.items():
+            scores[pos] = score
+            predicted[pos] = is_predicted
+        score_max = self.score_max if score_max is None else score_max
+
+        if not removed and not added:
+            graph = CSRGraph(self.ids, self.labels, self.offsets, self.targets,
+                             scores, predicted, score_max, index=self.index)
+            graph.sources = self.sources
+            graph._in_csr = getattr(self, "_in_csr", None)
+            return graph, np.arange(self.num_edges, dtype=np.int64)
+
+        keep = np.ones(self.num_edges, dtype=bool)
+        keep[removed] = False
+        kept = np.flatnonzero(keep)
+        add_src = np.array([a[0] for a in added], dtype=np.int64)
+        # Kept edges stay grouped by row, so added edges are merged in
+        # behind the last kept edge of their row instead of re-sorting
+        kept_src = self.sources[kept]
+        order = np.argsort(add_src, kind="stable")
+        slots = np.searchsorted(kept_src, add_src[order], side="right")
+
+        def merge(kept_values, added_values, dtype):
+            return np.insert(kept_values, slots, np.asarray(added_values, dtype=dtype)[order])
+
+        targets = merge(self.targets[kept], [a[1] for a in added], np.int32)
+        scores = merge(scores[kept], [a[2] for a in added], np.float64)
+        predicted = merge(predicted[kept], [a[3] for a in added], bool)
+        offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(np.insert(kept_src, slots, add_src[order]), minlength=self.num_nodes),
+                  out=offsets[1:])
+
+        position = np.full(self.num_edges, -1, dtype=np.int64)
+        position[kept] = np.arange(len(kept)) + np.searchsorted(slots, np.arange(len(kept)), side="right")
+        graph = CSRGraph(self.ids, self.labels, offsets, targets, scores, predicted, score_max, index=self.index)
+
+        if getattr(self, "_in_csr", None) is not None:
+            # Reverse edges stay sorted by (dependent, position): remap the
+            # kept ones and merge the added ones in the same way
+            in_ids = position[self._in_csr[1]]
+            in_ids = in_ids[in_ids >= 0]
+            added_ids = slots + np.arange(len(slots))
+            n = max(graph.num_edges, 1)
+            added_keys = targets[added_ids].astype(np.int64) * n + added_ids
+            key_order = np.argsort(added_keys)
+            in_slots = np.searchsorted(targets[in_ids].astype(np.int64) * n + in_ids, added_keys[key_order])
+            in_offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(targets, minlength=self.num_nodes), out=in_offsets[1:])
+            graph._in_csr = (in_offsets, np.insert(in_ids, in_slots, added_ids[key_order]))
+        return graph, position
+
+    def edge_position(self, prereq, dependent):
+        """Position of the prereq -> dependent edge, or None"""
+        start = self.offsets[prereq]
+        hits = np.flatnonzero(self.targets[start:self.offsets[prereq + 1]] == dependent)
+        return int(start + hits[0]) if len(hits) else None
+
+    def in_degree(self):
+        if getattr(self, "_in_csr", None) is not None:
+            return np.diff(self._in_csr[0])
+        return np.bincount(self.targets, minlength=self.num_nodes)
+
+    def in_csr(self):
+        """Reverse adjacency as ``(in_offsets, in_edge_ids)``, built on first use"""
+        if getattr(self, "_in_csr", None) is None:
+            in_edge_ids = np.argsort(self.targets, kind="stable")
+            in_offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(self.in_degree(), out=in_offsets[1:])
+            self._in_csr = (in_offsets, in_edge_ids)
+        return self._in_csr
+
+    def without_edges(self, keep):
+        """Copy of the graph keeping only the edges selected by the boolean mask"""
+        return CSRGraph.from_arrays(
+            self.ids, self.labels,
+            self.sources[keep].astype(np.int64), self.targets[keep],
+            self.scores[keep], self.predicted[keep], self.score_max
+        )
+
+    def edge_weakness(self):
+        """How weak each edge is as a prerequisite link (higher is weaker)"""
+        return self.scores + PRED * self.predicted
+
+    def has_label(self, *labels):
+        """Boolean mask of nodes carrying any of the given labels"""
+        return (self.labels & label_mask(labels)) != 0
+
+
+class EdgeIndex:
+    """O(1) lookup of REQUIRES edge metadata by Neo4j (source, target) node ids.
+
+    Keys are packed node-index pairs mapped to edge positions, so scores
+    and predicted flags stay in the graph's arrays instead of per-edge dicts.
+    With ``by_row`` no table is built and lookups scan the prerequisite's
+    CSR row instead, for graphs mapped from a shared snapshot file.
+    """
+
+    def __init__(self, graph, position=None, by_row=False):
+        self.graph = graph
+        if position is None and not by_row:
+            n = graph.num_nodes
+            # Neo4j source is the dependent skill, target the prerequisite
+            keys = graph.targets.astype(np.int64) * n + graph.sources
+            position = dict(zip(keys.tolist(), range(graph.num_edges)))
+        self._position = position
+
+    def updated(self, graph):
+        """Index over an updated copy of the graph, reusing the lookup table if no edge moved"""
+        if self._position is None:
+            return EdgeIndex(graph, by_row=True)
+        if graph.offsets is self.graph.offsets and graph.targets is self.graph.targets:
+            return EdgeIndex(graph, self._position)
+        return EdgeIndex(graph)
+
+    def get(self, source, target):
+        """Return ``(score, predicted)`` for source-[:REQUIRES]->target, or None"""
+        index = self.graph.index
+        s = index.get(source)
+        t = index.get(target)
+        if s is None or t is None:
+            return None
+        if self._position is None:
+            pos = self.graph.edge_position(t, s)
+        else:
+            pos = self._position.get(s * self.graph.num_nodes + t)
+        if pos is None:
+            return None
+        return float(self.graph.scores[pos]), bool(self.graph.predicted[pos])
+
+    def between(self, node_ids):
+        """All REQUIRES edges whose endpoints are both in node_ids"""
+        graph = self.graph
+        members = np.array(
+            sorted({graph.index[n] for n in node_ids if n in graph.index}), dtype=np.int64
+        )
+        if len(members) == 0:
+            return []
+        edge_ids = row_edges(graph.offsets, members)
+        edge_ids = edge_ids[np.isin(graph.targets[edge_ids], members)]
+        return [
+            {
+                "source": graph.ids[graph.targets[e]],
+                "target": graph.ids[graph.sources[e]],
+                "score": float(graph.scores[e]),
+                "predicted": bool(graph.predicted[e])
+            }
+            for e in edge_ids.tolist()
+        ]
+
+
+def _peel_order(graph, alive=None):
+    """Kahn-style peeling; returns the levels that could be peeled off"""
+    targets = graph.targets if alive is None else np.where(alive, graph.targets, -1)
+    indeg = np.bincount(targets[targets >= 0], minlength=graph.num_nodes)
+    level = np.flatnonzero(indeg == 0)
+    order = [level]
+    level_offsets = [0, len(level)]
+
+    while len(level):
+        edge_ids = row_edges(graph.offsets, level)
+        children = targets[edge_ids]
+        children = children[children >= 0]
+        np.subtract.at(indeg, children, 1)
+        # A child is appended when its last in-edge of this generation is
+        # seen, so order the new generation by last occurrence
+        reversed_children = children[::-1]
+        unique, first_in_reversed = np.unique(reversed_children, return_index=True)
+        ready = indeg[unique] == 0
+        last_seen = len(children) - 1 - first_in_reversed[ready]
+        level = unique[ready][np.argsort(last_seen, kind="stable")]
+        if len(level):
+            order.append(level)
+            level_offsets.append(level_offsets[-1] + len(level))
+
+    return np.concatenate(order).astype(np.int32, copy=False), level_offsets
+
+
+def topological_levels(graph):
+    """Group nodes into topological generations.
+
+    Returns ``(order, level_offsets)`` where ``order[level_offsets[k]:
+    level_offsets[k + 1]]`` is the k-th generation. Within a generation
+    nodes are listed in the same order networkx.topological_sort yields
+    them, so the DP below breaks ties exactly like the networkx version.
+    Returns None if the graph has a cycle.
+    """
+    order, level_offsets = _peel_order(graph)
+    if len(order) != graph.num_nodes:
+        return None
+    return order, np.asarray(level_offsets, dtype=np.int64)
+
+
+def _tarjan(num_nodes, offsets, targets):
+    """Iterative Tarjan SCC over a local CSR; returns components with 2+ nodes"""
+    offsets = offsets.tolist()
+    targets = targets.tolist()
+    index = [-1] * num_nodes
+    low = [0] * num_nodes
+    on_stack = [False] * num_nodes
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(num_nodes):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [[root, offsets[root]]]
+
+        while work:
+            frame = work[-1]
+            v, pos = frame
+            if pos < offsets[v + 1]:
+                frame[1] = pos + 1
+                w = targets[pos]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append([w, offsets[w]])
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+
+            work.pop()
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == v:
+                        break
+                if len(component) > 1:
+                    components.append(component)
+
+    return components
+
+
+def _local_csr(graph, nodes, alive):
+    """CSR of the subgraph induced by ``nodes`` over alive edges.
+
+    Returns ``(offsets, targets, edge_ids)`` in local indices, where
+    ``edge_ids`` maps every local edge back to its global edge position.
+    """
+    local = np.full(graph.num_nodes, -1, dtype=np.int64)
+    local[nodes] = np.arange(len(nodes))
+    edge_ids = row_edges(graph.offsets, nodes)
+    edge_ids = edge_ids[alive[edge_ids] & (local[graph.targets[edge_ids]] >= 0)]
+    src = local[graph.sources[edge_ids]]
+    offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=len(nodes)), out=offsets[1:])
+    # row_edges already returns edges grouped by row in the order of nodes
+    return offsets, local[graph.targets[edge_ids]], edge_ids
+
+
+def strongly_connected_components(graph, alive=None, nodes=None):
+    """Strongly connected components with more than one node, as arrays of node indices"""
+    if alive is None:
+        alive = np.ones(graph.num_edges, dtype=bool)
+    if nodes is None:
+        # Anything Kahn's algorithm can peel off is not on a cycle
+        peeled = np.zeros(graph.num_nodes, dtype=bool)
+        peeled[_peel_order(graph, alive)[0]] = True
+        nodes = np.flatnonzero(~peeled)
+    nodes = np.sort(np.asarray(nodes, dtype=np.int64))
+    offsets, targets, _ = _local_csr(graph, nodes, alive)
+    return [nodes[np.asarray(c)] for c in _tarjan(len(nodes), offsets, targets)]
+
+
+def _drop_back_edges(graph, component, alive, weakness):
+    """Make one SCC acyclic in a single DFS pass by dropping its back edges"""
+    offsets, targets, edge_ids = _local_csr(graph, component, alive)
+    state = [0] * len(component)        # 0 = new, 1 = on DFS stack, 2 = done
+    dropped = []
+    rows = []
+    for v in range(len(component)):
+        row = list(range(offsets[v], offsets[v + 1]))
+        # Follow the strongest edges first so the weak ones end up as back edges
+        row.sort(key=lambda e: (weakness[edge_ids[e]], e))
+        rows.append(row)
+
+    for root in range(len(component)):
+        if state[root]:
+            continue
+        state[root] = 1
+        work = [[root, 0]]
+        while work:
+            frame = work[-1]
+            v, pos = frame
+            if pos < len(rows[v]):
+                frame[1] = pos + 1
+                e = rows[v][pos]
+                w = int(targets[e])
+                if state[w] == 0:
+                    state[w] = 1
+                    work.append([w, 0])
+                elif state[w] == 1:
+                    dropped.append(int(edge_ids[e]))
+                continue
+            state[v] = 2
+            work.pop()
+
+    alive[dropped] = False
+    return dropped
+
+
+def break_cycles(graph, work_budget=CYCLE_BREAK_WORK_BUDGET):
+    """Remove the weakest edges of every cycle so the DP runs on a DAG.
+
+    Cycles are found with a linear-time SCC condensation instead of being
+    enumerated. Inside each strongly connected component the weakest edge
+    (highest score, predicted edges penalized by PRED, later edges first
+    on ties) is removed and the component is split again, until no cycle
+    is left. Once ``work_budget`` edge visits are spent, the remaining
+    components are made acyclic in one DFS pass that drops back edges,
+    following the strongest edges first.
+
+    Returns ``(dag, dropped)`` where ``dropped`` lists the removed edges in
+    the Neo4j REQUIRES direction.
+    """
+    alive = np.ones(graph.num_edges, dtype=bool)
+    weakness = graph.edge_weakness()
+    dropped = []
+
+    # Self-loops are cycles on their own
+    self_loops = np.flatnonzero(graph.sources == graph.targets)
+    alive[self_loops] = False
+    dropped.extend(self_loops.tolist())
+
+    work = strongly_connected_components(graph, alive)
+    component_count = len(work)
+    spent = 0
+    while work:
+        component = work.pop()
+        if spent >= work_budget:
+            dropped.extend(_drop_back_edges(graph, component, alive, weakness))
+            continue
+
+        _, _, intra = _local_csr(graph, component, alive)
+        spent += len(intra)
+        weakest = intra[np.lexsort((intra, weakness[intra]))[-1]]
+        alive[weakest] = False
+        dropped.append(int(weakest))
+        work.extend(strongly_connected_components(graph, alive, component))
+
+    if not dropped:
+        return graph, []
+
+    logger.warning(
+        f"Dropped {len(dropped)} edges to break cycles in "
+        f"{component_count} strongly connected components"
+    )
+    report = []
+    for e in sorted(dropped):
+        prereq = graph.ids[graph.sources[e]]
+        dependent = graph.ids[graph.targets[e]]
+        detail(logger, "Removed edge from %s to %s to break cycle", prereq, dependent)
+        report.append({
+            "source": dependent,
+            "target": prereq,
+            "score": float(graph.scores[e]),
+            "predicted": bool(graph.predicted[e])
+        })
+    return graph.without_edges(alive), report
+
+
+class DPTables:
+    """dp / prev / path_lens arrays indexed by node index"""
+
+    def __init__(self, graph, dp, prev, path_lens, dropped_edges=None, sem_pen=None, source_nodes=None,
+                 order=None, rank=None):
+        self.graph = graph
+        self.dp = dp                    # float64 best score, -inf if unreached
+        self.prev = prev                # int32 predecessor index, -1 if none
+        self.path_lens = path_lens      # int32 number of nodes on the best path
+        self.dropped_edges = dropped_edges or []    # edges removed to break cycles
+        self.sem_pen = sem_pen          # per-edge semantic penalty, None if constant
+        self.source_nodes = source_nodes    # node indices the DP was seeded from
+        self.order = order              # topological order the DP relaxed nodes in
+        self.rank = rank                # node index -> position in order
+        if rank is None and order is not None:
+            self.rank = np.empty(len(order), dtype=np.int64)
+            self.rank[order] = np.arange(len(order))
+        self.cycle_components = None    # SCC id of every node (-1 if none), built on first use
+
+    def prev_map(self):
+        return PrevMap(self.graph, self.prev)
+
+    def path_count(self):
+        return int(np.count_nonzero((self.dp > -1e8) & (self.prev >= 0)))
+
+
+class PrevMap(Mapping):
+    """Read-only ``{node_id: predecessor_id}`` view over a prev array"""
+
+    def __init__(self, graph, prev):
+        self._graph = graph
+        self._prev = prev
+
+    def __getitem__(self, node_id):
+        i = self._graph.index.get(node_id)
+        if i is None or self._prev[i] < 0:
+            raise KeyError(node_id)
+        return self._graph.ids[self._prev[i]]
+
+    def __contains__(self, node_id):
+        i = self._graph.index.get(node_id)
+        return i is not None and self._prev[i] >= 0
+
+    def __iter__(self):
+        ids = self._graph.ids
+        return (ids[i] for i in np.flatnonzero(self._prev >= 0))
+
+    def __len__(self):
+        return int(np.count_nonzero(self._prev >= 0))
+
+
+class EdgeList(Sequence):
+    """Read-only list of edge dicts (as returned by get_all_graph_data) over a graph's arrays"""
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self)))]
+        graph = self._graph
+        return {
+            "source": graph.ids[graph.targets[pos]],
+            "target": graph.ids[graph.sources[pos]],
+            "score": float(graph.scores[pos]),
+            "predicted": bool(graph.predicted[pos]),
+        }
+
+    def __len__(self):
+        return self._graph.num_edges
+
+
+def init_sources(graph):
+    """Initial dp / path_lens arrays, seeded the same way as the original DP"""
+    n = graph.num_nodes
+    dp = np.full(n, -np.inf)
+    path_lens = np.zeros(n, dtype=np.int32)
+    indeg = graph.in_degree()
+
+    # Sources are Concept/HardSkill nodes with no prerequisites
+    sources = np.flatnonzero((indeg == 0) & graph.has_label("Concept", "HardSkill"))
+    if len(sources) == 0:
+        logger.warning("No valid source nodes found. Initializing all concept nodes.")
+        sources = np.flatnonzero(graph.has_label("Concept"))
+    if len(sources) == 0:
+        logger.warning("No valid concept nodes found. Initializing nodes arbitrarily.")
+        sources = np.argsort(indeg, kind="stable")[:10]
+
+    dp[sources] = 0.0
+    path_lens[sources] = 1
+    logger.info(f"Initialized {len(sources)} source nodes")
+    return dp, path_lens
+
+
+def edge_gains(graph, edge_ids, src_path_lens, sem_pen=None):
+    """Vectorized gain of taking the given edges from paths of the given lengths"""
+    Smax = graph.score_max
+    if Smax:
+        s_norm = graph.scores[edge_ids] / Smax
+    else:
+        s_norm = np.full(len(edge_ids), 0.5)
+    pen = DEFAULT_SEM_PEN if sem_pen is None else sem_pen[edge_ids]
+    length_factor = LENGTH_PENALTY * src_path_lens
+    return DELTA - ALPHA * s_norm - BETA * pen - length_factor
+
+
+def run_dp(graph, levels, sem_pen=None):
+    """Run the learning-path DP level by level over a DAG.
+
+    Produces the same dp / prev / path_lens as relaxing every edge in
+    networkx topological order, including tie-breaking: when several
+    predecessors give the same score, the first one in topological order
+    wins.
+    """
+    order, level_offsets = levels
+    dp, path_lens = init_sources(graph)
+    source_nodes = np.flatnonzero(path_lens == 1)
+    prev = np.full(graph.num_nodes, -1, dtype=np.int32)
+
+    for k in range(len(level_offsets) - 1):
+        level = order[level_offsets[k]:level_offsets[k + 1]]
+        # Skip nodes we haven't reached yet
+        level = level[dp[level] >= -1e8]
+        if len(level) == 0:
+            continue
+
+        edge_ids = row_edges(graph.offsets, level)
+        if len(edge_ids) == 0:
+            continue
+        src = graph.sources[edge_ids]
+        src_lens = path_lens[src]
+        # Only consider reasonable path lengths
+        ok = src_lens + 1 <= MAX_PATH_LENGTH
+        if not ok.all():
+            edge_ids, src, src_lens = edge_ids[ok], src[ok], src_lens[ok]
+            if len(edge_ids) == 0:
+                continue
+
+        cand = dp[src] + edge_gains(graph, edge_ids, src_lens, sem_pen)
+        dst = graph.targets[edge_ids]
+
+        # Best candidate per dependent; ties go to the earliest edge
+        seq = np.arange(len(edge_ids))
+        ranked = np.lexsort((seq, -cand, dst))
+        dst_ranked = dst[ranked]
+        first = np.ones(len(ranked), dtype=bool)
+        first[1:] = dst_ranked[1:] != dst_ranked[:-1]
+        best = ranked[first]
+
+        best_dst = dst[best]
+        improves = cand[best] > dp[best_dst]
+        best, best_dst = best[improves], best_dst[improves]
+        dp[best_dst] = cand[best]
+        prev[best_dst] = src[best]
+        path_lens[best_dst] = src_lens[best] + 1
+
+    return DPTables(graph, dp, prev, path_lens, sem_pen=sem_pen, source_nodes=source_nodes,
+                    order=order.astype(np.int64))
+
+
+def _reaches(graph, start, goal, rank=None, limit=None):
+    """Depth-first search from ``start`` for ``goal``.
+
+    With ``rank``, only nodes ranked below ``limit`` are followed. Returns
+    ``(found, visited)``.
+    """
+    offsets, targets = graph.offsets, graph.targets
+    visited = {start}
+    stack = [start]
+    while stack:
+        x = stack.pop()
+        for y in targets[offsets[x]:offsets[x + 1]].tolist():
+            if y == goal:
+                return True, visited
+            if y not in visited and (rank is None or rank[y] < limit):
+                visited.add(y)
+                stack.append(y)
+    return False, visited
+
+
+def _restore_order(graph, order, rank, prereq, dependent):
+    """Keep ``order`` topological after adding the prereq -> dependent edge.
+
+    The dependent and everything it reaches with a rank below the
+    prerequisite's move right behind the prerequisite, keeping their
+    relative order, so only the ranks in between are rewritten. Returns
+    False if the edge closes a cycle.
+    """
+    lo, hi = rank[dependent], rank[prereq]
+    if lo > hi:
+        return True
+    found, moved = _reaches(graph, dependent, prereq, rank, hi)
+    if found:
+        return False
+    window = order[lo:hi + 1]
+    is_moved = np.zeros(len(window), dtype=bool)
+    is_moved[rank[list(moved)] - lo] = True
+    order[lo:hi + 1] = np.concatenate([window[~is_moved], window[is_moved]])
+    rank[order[lo:hi + 1]] = np.arange(lo, hi + 1)
+    return True
+
+
+def _repair_dp(tables, graph, order, rank, sem_pen, sources, dirty):
+    """Recompute dp / prev / path_lens for ``dirty`` nodes and whatever they reach.
+
+    Nodes are settled in topological rank order from a heap. A node only
+    passes the change on to its dependents when its own entry changed, so
+    the work stays within the part of the downstream cone that moved.
+    Every node takes its best predecessor exactly like run_dp: the highest
+    candidate score, ties going to the predecessor ranked first.
+    """
+    dp = tables.dp.copy()
+    prev = tables.prev.copy()
+    path_lens = tables.path_lens.copy()
+    is_source = np.zeros(graph.num_nodes, dtype=bool)
+    is_source[sources] = True
+    in_offsets, in_edge_ids = graph.in_csr()
+
+    heap = [(int(rank[v]), v) for v in dirty]
+    heapq.heapify(heap)
+    queued = set(dirty)
+    visited = changed = 0
+    while heap:
+        _, v = heapq.heappop(heap)
+        queued.discard(v)
+        visited += 1
+        if is_source[v]:
+            entry = (0.0, -1, 1)
+        else:
+            edge_ids = in_edge_ids[in_offsets[v]:in_offsets[v + 1]]
+            src = graph.sources[edge_ids]
+            src_lens = path_lens[src]
+            # Same reachability and path length limits as run_dp
+            ok = (dp[src] >= -1e8) & (src_lens + 1 <= MAX_PATH_LENGTH)
+            edge_ids, src, src_lens = edge_ids[ok], src[ok], src_lens[ok]
+            if len(edge_ids) == 0:
+                entry = (-np.inf, -1, 0)
+            else:
+                cand = dp[src] + edge_gains(graph, edge_ids, src_lens, sem_pen)
+                best = np.lexsort((rank[src], -cand))[0]
+                entry = (cand[best], int(src[best]), int(src_lens[best]) + 1)
+
+        if entry == (dp[v], prev[v], path_lens[v]):
+            continue
+        dp[v], prev[v], path_lens[v] = entry
+        changed += 1
+        for w in graph.targets[graph.offsets[v]:graph.offsets[v + 1]].tolist():
+            if w not in queued:
+                queued.add(w)
+                heapq.heappush(heap, (int(rank[w]), w))
+
+    return DPTables(graph, dp, prev, path_lens, sem_pen=sem_pen, source_nodes=sources), visited, changed
+
+
+def apply_edge_changes(graph, tables, changes, embeddings=None):
+    """Apply REQUIRES edge changes to a graph and repair its DP tables.
+
+    ``changes`` maps ``(prerequisite, dependent)`` node index pairs to
+    ``(score, predicted)`` to insert or re-score an edge, or to None to
+    delete it. Deleting a missing edge or re-scoring an edge to its
+    current values is a no-op, so a batch can safely be applied twice.
+
+    Only the dependents of changed edges and the nodes downstream of them
+    are recomputed, in topological order. Changes that alter the DP's
+    global inputs make the tables be recomputed from scratch instead: a
+    new maximum score (it normalizes every edge), an edge inside or
+    closing a cycle (it changes which edges break_cycles drops) or losing
+    every root source.
+
+    Returns ``(graph, tables, info)``. ``tables`` is None when a full
+    recompute is needed; ``info`` reports what was done and why.
+    """
+    info = {"incremental": False, "reason": None, "changedEdges": 0, "visitedNodes": 0, "changedNodes": 0}
+    removed, updated, added = [], {}, []
+    effective = []
+    for (prereq, dependent), value in changes.items():
+        pos = graph.edge_position(prereq, dependent)
+        if value is None:
+            if pos is None:
+                continue
+            removed.append(pos)
+        elif pos is None:
+            added.append((prereq, dependent) + tuple(value))
+        elif (graph.scores[pos], graph.predicted[pos]) != tuple(value):
+            updated[pos] = tuple(value)
+        else:
+            continue
+        effective.append((prereq, dependent))
+    info["changedEdges"] = len(effective)
+    if not effective:
+        info["incremental"] = True
+        return graph, tables, info
+
+    # Scores are normalized by the maximum, a new maximum moves every gain
+    old_scores = graph.scores[removed + list(updated)]
+    new_scores = [value[0] for value in updated.values()] + [edge[2] for edge in added]
+    score_max = graph.score_max
+    if new_scores and max(new_scores) > score_max:
+        score_max = max(new_scores)
+    new_graph, position = graph.with_edge_changes(removed, updated, added, score_max)
+    if score_max == graph.score_max and len(old_scores) and old_scores.max() >= score_max:
+        score_max = float(new_graph.scores.max()) if new_graph.num_edges else 1.0
+        new_graph.score_max = score_max
+
+    def full(reason):
+        info["reason"] = reason
+        return new_graph, None, info
+
+    if score_max != graph.score_max:
+        return full("maximum score changed")
+    if tables.rank is None:
+        return full("no topological order")
+    if any(prereq == dependent for prereq, dependent in effective):
+        return full("self-loop")
+
+    cyclic = len(tables.dropped_edges) > 0
+    if cyclic:
+        if tables.cycle_components is None:
+            components = np.full(graph.num_nodes, -1, dtype=np.int64)
+            for i, component in enumerate(strongly_connected_components(graph)):
+                components[component] = i
+            tables.cycle_components = components
+        components = tables.cycle_components
+        for prereq, dependent in effective:
+            if components[prereq] >= 0 and components[prereq] == components[dependent]:
+                return full("edge inside a cycle")
+        for prereq, dependent, _, _ in added:
+            if _reaches(new_graph, dependent, prereq)[0]:
+                return full("edge closes a cycle")
+
+    # Without dropped edges the DAG is the graph itself; otherwise the
+    # changed edges are outside every cycle and sit in the DAG unchanged
+    dag = tables.graph
+    if dag is graph:
+        new_dag, dag_position = new_graph, position
+    else:
+        dag_removed = [dag.edge_position(graph.sources[p], graph.targets[p]) for p in removed]
+        dag_updated = {
+            dag.edge_position(graph.sources[p], graph.targets[p]): value for p, value in updated.items()
+        }
+        new_dag, dag_position = dag.with_edge_changes(dag_removed, dag_updated, added, score_max)
+
+    order = tables.order.copy()
+    rank = tables.rank.copy()
+    for prereq, dependent, _, _ in added:
+        if not _restore_order(new_dag, order, rank, prereq, dependent):
+            return full("edge closes a cycle")
+
+    # The DP is seeded from Concept/HardSkill nodes without prerequisites,
+    # unless init_sources had to fall back to other nodes
+    seedable = dag.has_label("Concept", "HardSkill")
+    old_roots = np.flatnonzero((dag.in_degree() == 0) & seedable)
+    if tables.source_nodes is None or not np.array_equal(old_roots, tables.source_nodes):
+        return full("DP was not seeded from root skills")
+    sources = np.flatnonzero((new_dag.in_degree() == 0) & seedable)
+    if len(sources) == 0:
+        return full("no root skills left")
+    # Only dependents of changed edges can gain or lose their prerequisites
+    dirty = {dependent for _, dependent in effective}
+
+    sem_pen = None
+    if tables.sem_pen is not None:
+        sem_pen = np.empty(new_dag.num_edges)
+        kept = dag_position >= 0
+        sem_pen[dag_position[kept]] = tables.sem_pen[kept]
+        if added:
+            # Added edges are the only positions not carried over
+            fresh = np.ones(new_dag.num_edges, dtype=bool)
+            fresh[dag_position[kept]] = False
+            fresh = np.flatnonzero(fresh)
+            sem_pen[fresh] = (
+                embeddings.penalties(
+                    [new_dag.ids[i] for i in new_dag.sources[fresh]],
+                    [new_dag.ids[i] for i in new_dag.targets[fresh]],
+                )
+                if embeddings is not None else DEFAULT_SEM_PEN
+            )
+
+    new_tables, visited, changed = _repair_dp(tables, new_dag, order, rank, sem_pen, sources, dirty)
+    new_tables.order, new_tables.rank = order, rank
+    new_tables.dropped_edges = tables.dropped_edges
+    new_tables.cycle_components = tables.cycle_components
+    info.update(incremental=True, visitedNodes=visited, changedNodes=changed)
+    logger.info(
+        "Repaired DP tables for %d changed edges: visited %d nodes, %d changed",
+        info["changedEdges"], visited, changed,
+    )
+    return new_graph, new_tables, info
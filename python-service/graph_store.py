@@ -0,0 +1,558 @@
+"""Compact on-disk graph snapshots.
+
+A snapshot file holds everything the service needs to answer path
+requests without Neo4j: the node id table with names and definitions,
+label bitmasks, the REQUIRES edges in CSR form with their scores and
+predicted flags, and optionally the node embeddings and DP tables. The
+arrays are stored raw, 64-byte aligned behind a small JSON header, so the
+file is memory-mapped and only the pages a request touches are read.
+Node ids stay in their string table too; lookups binary-search a sorted
+permutation of it instead of building a per-process dict.
+
+    python -m graph_store export snapshot.graph
+    python -m graph_store import nodes_final.csv relationships_final.csv snapshot.graph
+    python -m graph_store info snapshot.graph
+
+``export`` reads the graph from Neo4j (NEO4J_* variables) and the
+embeddings from MODEL_PATH. ``import`` streams the neo4j-admin CSV
+exports used by the notebooks row by row instead of loading them with
+pandas.
+
+SharedGraphStore publishes snapshot files in a directory that all
+service processes on a host can map (e.g. under /dev/shm), so the graph
+is held in memory once however many workers serve it.
+"""
+import argparse
+import asyncio
+import csv
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from embeddings import EmbeddingStore
+from graph_engine import CSRGraph, DPTables, label_mask, mask_labels
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CPNGRAPH"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+# Magic followed by the little-endian byte length of the JSON header
+PREAMBLE = struct.Struct("<8sQ")
+
+
+def _encode_strings(values):
+    """UTF-8 string table as ``(offsets, data)`` arrays; None is stored as ''"""
+    encoded = [(value or "").encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _decode_strings(offsets, data):
+    raw = data.tobytes()
+    bounds = offsets.tolist()
+    return [raw[a:b].decode("utf-8") for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _edge_arrays(graph, prefix=""):
+    """CSR arrays of ``graph``, including the reverse adjacency"""
+    in_offsets, in_edge_ids = graph.in_csr()
+    return {
+        prefix + "offsets": graph.offsets.astype(np.int64, copy=False),
+        prefix + "targets": graph.targets.astype(np.int32, copy=False),
+        prefix + "sources": graph.sources.astype(np.int32, copy=False),
+        prefix + "scores": graph.scores.astype(np.float64, copy=False),
+        prefix + "predicted": graph.predicted.astype(bool, copy=False),
+        prefix + "in_offsets": in_offsets.astype(np.int64, copy=False),
+        prefix + "in_edge_ids": in_edge_ids.astype(np.int64, copy=False),
+    }
+
+
+def write_snapshot(path, graph, names, definitions, version, embeddings=None, dp_tables=None):
+    """Write ``graph`` and its node names/definitions to a snapshot file.
+
+    ``names`` and ``definitions`` are aligned with ``graph.ids``. With an
+    EmbeddingStore, the rows of the graph's nodes are stored as well, and
+    with DPTables the DP results (and the DAG they were computed on, if
+    cycle edges were dropped). The file is written next to ``path`` and
+    renamed into place.
+    """
+    encoded_ids = [node_id.encode("utf-8") for node_id in graph.ids]
+    id_offsets, id_data = _encode_strings(graph.ids)
+    name_offsets, name_data = _encode_strings(names)
+    definition_offsets, definition_data = _encode_strings(definitions)
+    arrays = {
+        "labels": graph.labels.astype(np.uint8, copy=False),
+        **_edge_arrays(graph),
+        "id_offsets": id_offsets,
+        "id_data": id_data,
+        # Node indices in byte order of their ids, for SortedIdIndex
+        "id_order": np.array(sorted(range(len(encoded_ids)), key=encoded_ids.__getitem__), dtype=np.int64),
+        "name_offsets": name_offsets,
+        "name_data": name_data,
+        "definition_offsets": definition_offsets,
+        "definition_data": definition_data,
+    }
+    if embeddings is not None:
+        rows = embeddings.rows_for(graph.ids)
+        nodes = np.flatnonzero(rows >= 0)
+        node_rows = np.full(graph.num_nodes, -1, dtype=np.int64)
+        node_rows[nodes] = np.arange(len(nodes))
+        arrays["embedding_rows"] = node_rows
+        arrays["embeddings"] = np.ascontiguousarray(embeddings.matrix[rows[nodes]], dtype=np.float32)
+    dropped_edges = None
+    if dp_tables is not None:
+        arrays.update(dp=dp_tables.dp, prev=dp_tables.prev, path_lens=dp_tables.path_lens)
+        for name in ("order", "rank", "source_nodes", "sem_pen"):
+            if getattr(dp_tables, name) is not None:
+                arrays[name] = getattr(dp_tables, name)
+        if dp_tables.graph is not graph:
+            arrays.update(_edge_arrays(dp_tables.graph, prefix="dag_"))
+        dropped_edges = dp_tables.dropped_edges
+
+    # Array offsets are relative to the end of the (padded) header
+    layout = {}
+    position = 0
+    for name, values in arrays.items():
+        position = -(-position // ALIGNMENT) * ALIGNMENT
+        layout[name] = {"dtype": values.dtype.str, "shape": list(values.shape), "offset": position}
+        position += values.nbytes
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "version": version,
+        "createdAt": time.time(),
+        "nodes": graph.num_nodes,
+        "edges": graph.num_edges,
+        "scoreMax": graph.score_max,
+        "droppedEdges": dropped_edges,
+        "arrays": layout,
+    }).encode("utf-8")
+    data_start = -(-(PREAMBLE.size + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, len(header)))
+        f.write(header)
+        for name, values in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(values).tobytes())
+        # Empty trailing arrays write nothing, but their offsets must still
+        # fall inside the file
+        f.truncate(data_start + position)
+    os.replace(tmp, path)
+    logger.info(
+        f"Wrote graph snapshot {version} to {path}: {graph.num_nodes} nodes, "
+        f"{graph.num_edges} edges, {path.stat().st_size} bytes"
+    )
+    return path
+
+
+class StringTable(Sequence):
+    """Read-only list over a snapshot string table, decoding entries on access"""
+
+    def __init__(self, offsets, data):
+        self._offsets = offsets
+        self._data = data
+        self._raw = memoryview(data)
+
+    def encoded(self, i):
+        return self._raw[int(self._offsets[i]):int(self._offsets[i + 1])].tobytes()
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.encoded(i).decode("utf-8")
+
+    def __iter__(self):
+        # Decode in chunks rather than one slice per string
+        for start in range(0, len(self), 65536):
+            bounds = self._offsets[start:min(start + 65536, len(self)) + 1]
+            yield from _decode_strings(bounds - bounds[0], self._data[bounds[0]:bounds[-1]])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+
+class SortedIdIndex(Mapping):
+    """``{node_id: node index}`` by binary search over the id table's sorted order"""
+
+    def __init__(self, ids, order):
+        self._ids = ids
+        self._order = order
+
+    def _find(self, node_id):
+        if not isinstance(node_id, str):
+            return None
+        key = node_id.encode("utf-8")
+        ids, order = self._ids, self._order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ids.encoded(order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and ids.encoded(order[lo]) == key:
+            return int(order[lo])
+        return None
+
+    def __getitem__(self, node_id):
+        i = self._find(node_id)
+        if i is None:
+            raise KeyError(node_id)
+        return i
+
+    def get(self, node_id, default=None):
+        i = self._find(node_id)
+        return default if i is None else i
+
+    def __contains__(self, node_id):
+        return self._find(node_id) is not None
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+
+class NodeTable(Mapping):
+    """Read-only ``{node_id: {"id", "name", "definition", "labels"}}`` view over a snapshot file"""
+
+    def __init__(self, graph, name_offsets, name_data, definition_offsets, definition_data):
+        self._graph = graph
+        self._names = (name_offsets, name_data)
+        self._definitions = (definition_offsets, definition_data)
+
+    @staticmethod
+    def _string(table, i):
+        offsets, data = table
+        value = data[offsets[i]:offsets[i + 1]].tobytes().decode("utf-8")
+        return value or None
+
+    def __getitem__(self, node_id):
+        i = self._graph.index[node_id]
+        return {
+            "id": node_id,
+            "name": self._string(self._names, i),
+            "definition": self._string(self._definitions, i),
+            "labels": mask_labels(int(self._graph.labels[i])),
+        }
+
+    def __contains__(self, node_id):
+        return node_id in self._graph.index
+
+    def __iter__(self):
+        return iter(self._graph.ids)
+
+    def __len__(self):
+        return self._graph.num_nodes
+
+
+class NodeEmbeddings(EmbeddingStore):
+    """Embeddings stored in a snapshot file, one optional row per graph node"""
+
+    def __init__(self, graph, matrix, node_rows):
+        self.graph = graph
+        self.matrix = matrix
+        self.node_rows = node_rows      # node index -> matrix row, -1 if none
+
+    @property
+    def ids(self):
+        return [self.graph.ids[i] for i in np.flatnonzero(self.node_rows >= 0).tolist()]
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def rows_for(self, node_ids):
+        if node_ids is self.graph.ids:
+            return self.node_rows
+        index, node_rows = self.graph.index, self.node_rows
+        return np.fromiter(
+            (node_rows[i] if i is not None else -1 for i in map(index.get, node_ids)),
+            dtype=np.int64, count=len(node_ids)
+        )
+
+
+class GraphFile:
+    """A memory-mapped snapshot file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_size = PREAMBLE.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a graph snapshot")
+        self.header = json.loads(self._buffer[PREAMBLE.size:PREAMBLE.size + header_size])
+        if self.header["format"] != FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot format {self.header['format']}, expected {FORMAT_VERSION}")
+        self._data_start = -(-(PREAMBLE.size + header_size) // ALIGNMENT) * ALIGNMENT
+
+    @property
+    def version(self):
+        return self.header["version"]
+
+    def array(self, name):
+        """Read-only array view into the mapped file (None if not stored)"""
+        spec = self.header["arrays"].get(name)
+        if spec is None:
+            return None
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        values = np.frombuffer(self._buffer, dtype=dtype, count=count, offset=self._data_start + spec["offset"])
+        return values.reshape(spec["shape"])
+
+    def _graph(self, ids, index, prefix=""):
+        graph = CSRGraph(
+            ids, self.array("labels"), self.array(prefix + "offsets"), self.array(prefix + "targets"),
+            self.array(prefix + "scores"), self.array(prefix + "predicted"), self.header["scoreMax"],
+            index=index
+        )
+        graph.sources = self.array(prefix + "sources")
+        graph._in_csr = (self.array(prefix + "in_offsets"), self.array(prefix + "in_edge_ids"))
+        return graph
+
+    def graph(self):
+        """CSRGraph over the mapped arrays, with ids and index read from the file"""
+        ids = StringTable(self.array("id_offsets"), self.array("id_data"))
+        return self._graph(ids, SortedIdIndex(ids, self.array("id_order")))
+
+    def nodes(self, graph):
+        return NodeTable(
+            graph, self.array("name_offsets"), self.array("name_data"),
+            self.array("definition_offsets"), self.array("definition_data")
+        )
+
+    def embeddings(self, graph):
+        """Store over the stored embedding rows, or None"""
+        matrix = self.array("embeddings")
+        if matrix is None:
+            return None
+        return NodeEmbeddings(graph, matrix, self.array("embedding_rows"))
+
+    def dp_tables(self, graph):
+        """DPTables stored with the graph, or None if they have to be computed"""
+        if self.array("dp") is None:
+            return None
+        dag = graph if self.array("dag_offsets") is None else self._graph(graph.ids, graph.index, "dag_")
+        return DPTables(
+            dag, self.array("dp"), self.array("prev"), self.array("path_lens"),
+            dropped_edges=self.header["droppedEdges"], sem_pen=self.array("sem_pen"),
+            source_nodes=self.array("source_nodes"), order=self.array("order"), rank=self.array("rank")
+        )
+
+
+def open_snapshot(path):
+    return GraphFile(path)
+
+
+# ─── Snapshots shared between processes ─────────────────────────────────
+class SharedGraphStore:
+    """Snapshot files published in a directory shared by all service processes.
+
+    The ``current`` file names the published snapshot. A new snapshot is
+    written under a fresh name and ``current`` is renamed over, so readers
+    always see one complete version. Publishers serialize on an flock, and
+    a replaced file is kept for GRACE_SECONDS for processes that are still
+    attaching to it.
+    """
+
+    POINTER = "current"
+    # Seconds a replaced snapshot file stays on disk after it was replaced
+    GRACE_SECONDS = 60
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def current(self):
+        """Path of the published snapshot file, or None"""
+        try:
+            name = (self.directory / self.POINTER).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        path = self.directory / name
+        return path if name and path.exists() else None
+
+    def acquire(self):
+        """Block until this process may publish; returns the lock handle"""
+        fd = os.open(self.directory / "publish.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    def release(self, fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def publish(self, write):
+        """Publish the file written by ``write(path)``; call with the lock held"""
+        previous = self.current()
+        path = self.directory / f"graph-{time.time_ns()}.cpg"
+        write(path)
+        pointer = self.directory / (self.POINTER + ".tmp")
+        pointer.write_text(path.name, encoding="utf-8")
+        os.replace(pointer, self.directory / self.POINTER)
+        # A replaced file's mtime records when it was replaced
+        if previous is not None:
+            os.utime(previous)
+        # Processes that mapped an older file keep their mapping after the
+        # unlink, the memory is freed once the last one lets go
+        expired = time.time() - self.GRACE_SECONDS
+        for old in self.directory.glob("graph-*.cpg"):
+            if old != path and old != previous and old.stat().st_mtime < expired:
+                old.unlink(missing_ok=True)
+        return path
+
+
+# ─── Import from the neo4j-admin CSV exports ─────────────────────────────
+def _column(fieldnames, *needles, required=True):
+    for needle in needles:
+        for name in fieldnames:
+            if needle in name.lower():
+                return name
+    if required:
+        raise ValueError(f"No column matching {needles} in {fieldnames}")
+    return None
+
+
+def import_csv(nodes_csv, edges_csv, output, embeddings=None):
+    """Build a snapshot from ``nodes_final.csv`` / ``relationships_final.csv``.
+
+    Columns are picked by name like the notebooks do (``nodeId:ID``,
+    ``name``, ``definition``, ``labels:LABEL`` and ``:START_ID``,
+    ``:END_ID``, ``type``, ``score:float``, ``predicted:boolean``).
+    Nodes without any of the service's labels are skipped, and the
+    edges get the same defaults and de-duplication as a Neo4j load.
+    """
+    ids, names, definitions, labels = [], [], [], array("B")
+    index = {}
+    with open(nodes_csv, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        id_col = _column(reader.fieldnames, ":id")
+        name_col = _column(reader.fieldnames, "name", "title")
+        definition_col = _column(reader.fieldnames, "def", required=False)
+        label_col = _column(reader.fieldnames, "label")
+        for row in reader:
+            mask = label_mask(row[label_col].split(";"))
+            if not mask:
+                continue
+            node_id = row[id_col]
+            if node_id in index:
+                continue
+            index[node_id] = len(ids)
+            ids.append(node_id)
+            names.append(row[name_col] or row.get("title"))
+            definitions.append(row[definition_col] if definition_col else None)
+            labels.append(mask)
+
+    # (skill)-[:REQUIRES]->(prerequisite): START requires END
+    prereqs, dependents, scores, predicted = array("q"), array("q"), array("d"), array("B")
+    score_max = None
+    with open(edges_csv, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        start_col = _column(reader.fieldnames, "start")
+        end_col = _column(reader.fieldnames, "end")
+        type_col = _column(reader.fieldnames, "type", required=False)
+        score_col = _column(reader.fieldnames, "score", required=False)
+        predicted_col = _column(reader.fieldnames, "predicted", required=False)
+        for row in reader:
+            if type_col and row[type_col] and row[type_col] != "REQUIRES":
+                continue
+            # Same defaults as get_all_graph_data (a missing or zero score is 0.5)
+            score = float(row[score_col] or 0) if score_col else 0.0
+            score = score or 0.5
+            score_max = score if score_max is None else max(score_max, score)
+            prereq = index.get(row[end_col])
+            dependent = index.get(row[start_col])
+            if prereq is None or dependent is None:
+                continue
+            prereqs.append(prereq)
+            dependents.append(dependent)
+            scores.append(score)
+            predicted.append(predicted_col is not None and row[predicted_col].strip().lower() == "true")
+
+    prereqs = np.frombuffer(prereqs, dtype=np.int64)
+    dependents = np.frombuffer(dependents, dtype=np.int64)
+    scores = np.frombuffer(scores, dtype=np.float64)
+    predicted = np.frombuffer(predicted, dtype=np.uint8).astype(bool)
+    # Parallel edges keep their first position and their last attributes,
+    # like CSRGraph.from_graph_data
+    keys = prereqs * max(len(ids), 1) + dependents
+    _, first = np.unique(keys, return_index=True)
+    _, last_reversed = np.unique(keys[::-1], return_index=True)
+    last = len(keys) - 1 - last_reversed
+    order = np.argsort(first, kind="stable")
+    first, last = first[order], last[order]
+
+    graph = CSRGraph.from_arrays(
+        ids, np.frombuffer(labels, dtype=np.uint8).copy(),
+        prereqs[first], dependents[first].astype(np.int32), scores[last], predicted[last],
+        score_max if score_max is not None else 1.0
+    )
+    version = f"csv:{int(max(Path(nodes_csv).stat().st_mtime, Path(edges_csv).stat().st_mtime))}"
+    return write_snapshot(output, graph, names, definitions, version, embeddings)
+
+
+# ─── Export from Neo4j ───────────────────────────────────────────────────
+async def export_neo4j(output):
+    """Write the graph currently in Neo4j (and MODEL_PATH embeddings) to a snapshot"""
+    import main  # the service module holds the Neo4j driver and queries
+
+    try:
+        version = await main.get_graph_version()
+        nodes, label_of, edges = await main.get_all_graph_data(include_definitions=True)
+    finally:
+        await main.neo4j_driver.close()
+    graph = CSRGraph.from_graph_data(nodes, label_of, edges)
+    names = [nodes[node_id]["name"] for node_id in graph.ids]
+    definitions = [nodes[node_id].get("definition") for node_id in graph.ids]
+    embeddings = await asyncio.to_thread(main.load_embedding_store, main.MODEL_PATH)
+    return write_snapshot(output, graph, names, definitions, version, embeddings)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Export the graph from Neo4j")
+    export.add_argument("output")
+    imported = commands.add_parser("import", help="Import neo4j-admin CSV exports")
+    imported.add_argument("nodes_csv")
+    imported.add_argument("edges_csv")
+    imported.add_argument("output")
+    imported.add_argument("--embeddings", help="Node embeddings (.pt or .npy) to include")
+    info = commands.add_parser("info", help="Print a snapshot's header")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "export":
+        asyncio.run(export_neo4j(args.output))
+    elif args.command == "import":
+        store = None
+        if args.embeddings:
+            from embeddings import load_embedding_store
+            store = load_embedding_store(args.embeddings)
+        import_csv(args.nodes_csv, args.edges_csv, args.output, store)
+    else:
+        header = open_snapshot(args.path).header
+        print(json.dumps({k: v for k, v in header.items() if k not in ("arrays", "droppedEdges")}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,22 +1,44 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import os
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase
 import logging
 import traceback
 import sys
 import json
+import time
+import asyncio
+import hashlib
+import bisect
+import heapq
+from collections import Counter, OrderedDict
+from path_search import personalized_paths, astar_path, k_best_paths
+from embeddings import load_embedding_store
+from path_pool import PathWorkerPool, PoolSaturated, DeadlineExceeded
+from graph_store import SharedGraphStore, open_snapshot, write_snapshot
+from name_index import NameIndex
+import metrics
+from metrics import stage
+import tracing
+from tracing import PathNames, detail
+from graph_engine import (
+    CSRGraph, EdgeIndex, EdgeList, break_cycles, topological_levels, run_dp, apply_edge_changes,
+    MAX_PATH_LENGTH
+)
 
 # Set up logging
+log_handler = logging.StreamHandler(sys.stdout)
+# Tag every line with the id of the request that produced it
+log_handler.addFilter(tracing.RequestIdFilter())
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s',
     handlers=[
-        logging.StreamHandler(sys.stdout)
+        log_handler
     ]
 )
 logger = logging.getLogger(__name__)
@@ -30,6 +52,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients revalidate the skill catalog with If-None-Match
+    expose_headers=["ETag"],
 )
 
 # Neo4j connection
@@ -39,40 +63,211 @@ NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "")
 
 logger.info(f"Neo4j connection details: URI={NEO4J_URI}, USER={NEO4J_USER}")
 
+@app.middleware("http")
+async def bind_request_trace(request: Request, call_next):
+    """Bind a request id to the request's log lines; trace it if X-Debug-Trace is set"""
+    debug = request.headers.get(tracing.DEBUG_TRACE_HEADER, "").lower() in ("1", "true", "yes")
+    request_id, tokens = tracing.start_request(request.headers.get(tracing.REQUEST_ID_HEADER), debug)
+    try:
+        response = await call_next(request)
+    finally:
+        tracing.finish_request(tokens, logger)
+    response.headers[tracing.REQUEST_ID_HEADER] = request_id
+    return response
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record request latency and attach the Server-Timing header if enabled"""
+    if not metrics.METRICS_ENABLED and not metrics.SERVER_TIMING_ENABLED:
+        return await call_next(request)
+    token = metrics.start_request_timings()
+    start = time.perf_counter()
+    # An exception escaping the handler is answered with a 500
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        route = request.scope.get("route")
+        metrics.REQUEST_SECONDS.observe(
+            elapsed,
+            route=getattr(route, "path", "unmatched"),
+            method=request.method,
+            status=str(status),
+        )
+        server_timing = metrics.finish_request_timings(token)
+    if token is not None:
+        entries = [server_timing] if server_timing else []
+        entries.append(f"total;dur={elapsed * 1000:.2f}")
+        response.headers["Server-Timing"] = ", ".join(entries)
+    return response
+
+# Node embeddings used for the semantic penalty of the DP
+MODEL_PATH = os.getenv("MODEL_PATH", "./models/node-embeddings.pt")
+
+# Graph snapshot settings
+# Minimum number of seconds between two graph-version checks against Neo4j; with
+# a version property every check reads all skill/job nodes and REQUIRES edges
+GRAPH_VERSION_CHECK_INTERVAL = float(os.getenv("GRAPH_VERSION_CHECK_INTERVAL", "300"))
+# Property used as the "last updated" marker on nodes and REQUIRES relationships,
+# empty to fingerprint the graph by its counts only
+GRAPH_VERSION_PROPERTY = os.getenv("GRAPH_VERSION_PROPERTY", "updatedAt")
+# On-disk snapshot (see graph_store.py) served at startup, before and without Neo4j
+GRAPH_SNAPSHOT_PATH = os.getenv("GRAPH_SNAPSHOT_PATH", "")
+# Directory (e.g. under /dev/shm) where uvicorn workers share one copy of the graph
+GRAPH_SHARED_DIR = os.getenv("GRAPH_SHARED_DIR", "")
+# Seconds to fail fast after a failed Neo4j connection before trying again
+NEO4J_RECONNECT_INTERVAL = float(os.getenv("NEO4J_RECONNECT_INTERVAL", "10"))
+
+# Worker processes for path computation (0 = compute in the API process)
+PATH_WORKERS = int(os.getenv("PATH_WORKERS", "0"))
+# Queued + running computations before requests get a 503
+PATH_MAX_PENDING = int(os.getenv("PATH_MAX_PENDING", str(max(PATH_WORKERS, 1) * 8)))
+# Seconds a path computation may take before the request gets a 504
+PATH_TIMEOUT = float(os.getenv("PATH_TIMEOUT", "30"))
+# Where graph snapshots are written for the workers to load
+PATH_SNAPSHOT_DIR = os.getenv("PATH_SNAPSHOT_DIR", "")
+
+# Maximum number of items accepted by /generate-paths
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "200"))
+
+# Search states (node, path length) /skill-path may expand before giving up
+ASTAR_MAX_EXPANSIONS = int(os.getenv("ASTAR_MAX_EXPANSIONS", "20000"))
+
+# Upper bound on alternatives per skill and on the edges the k-best DP may relax
+MAX_ALTERNATIVE_PATHS = int(os.getenv("MAX_ALTERNATIVE_PATHS", "5"))
+KBEST_MAX_EXPANSIONS = int(os.getenv("KBEST_MAX_EXPANSIONS", "200000"))
+
+# /generate-path response cache settings
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+
+# Skill catalog page sizes
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", "100"))
+CATALOG_MAX_PAGE_SIZE = int(os.getenv("CATALOG_MAX_PAGE_SIZE", "1000"))
+
+# Largest number of /autocomplete results per request
+AUTOCOMPLETE_MAX_RESULTS = int(os.getenv("AUTOCOMPLETE_MAX_RESULTS", "50"))
+
+# Seconds the database statistics of /health and /health/stats are reused
+HEALTH_STATS_TTL = float(os.getenv("HEALTH_STATS_TTL", "60"))
+
 class PathRequest(BaseModel):
     jobId: str
     userSkills: Optional[List[str]] = []
+    # Start paths from the user's known skills instead of the graph roots
+    personalized: Optional[bool] = False
+    # Number of ranked alternative paths per end skill (0 = none)
+    alternatives: Optional[int] = 0
+    # Alternatives avoid predicted edges / these skills
+    excludePredicted: Optional[bool] = False
+    excludeSkills: Optional[List[str]] = []
+
+class BatchPathItem(PathRequest):
+    # Key of this item in the response; defaults to the jobId
+    key: Optional[str] = None
+
+class BatchPathRequest(BaseModel):
+    items: List[BatchPathItem]
+
+class EdgeChange(BaseModel):
+    # "insert", "update" (re-score) or "delete"
+    op: str
+    # (source)-[:REQUIRES]->(target): target is the prerequisite
+    source: str
+    target: str
+    score: Optional[float] = None
+    predicted: Optional[bool] = None
+
+class EdgeDeltaRequest(BaseModel):
+    # Graph version the changes were made against (a snapshot version)
+    baseVersion: str
+    changes: List[EdgeChange]
+
+class SkillPathRequest(BaseModel):
+    # Skill the user already knows
+    startSkill: str
+    # Skill the user wants to learn
+    targetSkill: str
+    maxLength: Optional[int] = MAX_PATH_LENGTH
 
 class Neo4jDriver:
     def __init__(self):
         self._driver = None
+        self._lock = asyncio.Lock()
+        self._failed_at = None
 
-    def get_driver(self):
+    async def get_driver(self):
         if self._driver is None:
-            try:
-                logger.info(f"Initializing Neo4j driver with URI: {NEO4J_URI}")
-                self._driver = GraphDatabase.driver(
-                    NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD)
-                )
-                # Test the connection
-                with self._driver.session() as session:
-                    result = session.run("RETURN 1 as test")
-                    record = result.single()
-                    assert record["test"] == 1
-                logger.info(f"Successfully connected to Neo4j at {NEO4J_URI}")
-            except Exception as e:
-                logger.error(f"Failed to connect to Neo4j: {e}")
-                logger.error(traceback.format_exc())
-                raise
+            async with self._lock:
+                if self._driver is None:
+                    # Don't make every request wait for a connect timeout
+                    # while Neo4j is down
+                    if self._failed_at is not None and time.time() - self._failed_at < NEO4J_RECONNECT_INTERVAL:
+                        raise ConnectionError("Neo4j is unavailable, not retrying yet")
+                    try:
+                        self._driver = await self._connect()
+                    except Exception:
+                        self._failed_at = time.time()
+                        raise
+                    self._failed_at = None
         return self._driver
 
-    def close(self):
+    async def _connect(self):
+        try:
+            logger.info(f"Initializing Neo4j driver with URI: {NEO4J_URI}")
+            driver = AsyncGraphDatabase.driver(
+                NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD)
+            )
+            # Test the connection
+            async with driver.session() as session:
+                result = await session.run("RETURN 1 as test")
+                record = await result.single()
+                assert record["test"] == 1
+            logger.info(f"Successfully connected to Neo4j at {NEO4J_URI}")
+            return driver
+        except Exception as e:
+            logger.error(f"Failed to connect to Neo4j: {e}")
+            logger.error(traceback.format_exc())
+            raise
+
+    async def close(self):
         if self._driver is not None:
-            self._driver.close()
+            await self._driver.close()
             self._driver = None
 
 neo4j_driver = Neo4jDriver()
 
+async def _collect_records(tx, query, params):
+    result = await tx.run(query, params)
+    return [record async for record in result]
+
+async def run_read(query, **params):
+    """Run a read query in a managed transaction and return all records"""
+    driver = await neo4j_driver.get_driver()
+    start = time.perf_counter()
+    async with driver.session() as session:
+        records = await session.execute_read(_collect_records, query, params)
+    metrics.NEO4J_QUERY_SECONDS.observe(time.perf_counter() - start)
+    metrics.NEO4J_ROUND_TRIPS.inc()
+    metrics.NEO4J_ROWS.inc(len(records))
+    return records
+
+# Loaded once at startup; None means a constant semantic penalty
+embedding_store = None
+
+@app.on_event("startup")
+async def load_node_embeddings():
+    global embedding_store
+    # A .pt file may need a one-off conversion, keep it off the event loop
+    embedding_store = await asyncio.to_thread(load_embedding_store, MODEL_PATH)
+
+@app.on_event("shutdown")
+async def close_neo4j_driver():
+    await neo4j_driver.close()
+    path_pool.shutdown()
+
 # Custom exception handlers to ensure JSON responses
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
@@ -92,348 +287,975 @@ async def general_exception_handler(request, exc):
     )
 
 
+def skill_type_of(labels):
+    """Pick the skill type for a node, preferring its HardSkill label"""
+    if "HardSkill" in labels:
+        return "HardSkill"
+    if "Technology" in labels:
+        return "Technology"
+    if "SoftSkill" in labels:
+        return "SoftSkill"
+    if "Concept" in labels:
+        return "Concept"
+    return "HardSkill"
+
 # Modified get_job_skills function to fix the skill type assignment issue
 
-def get_job_skills(job_id):
+async def get_job_skills(job_id):
     """Get all skills required for a specific job from Neo4j, including related concept nodes"""
     try:
-        driver = neo4j_driver.get_driver()
-        with driver.session() as session:
-            # First, get all skills directly associated with the job
-            direct_skills_query = """
-            MATCH (j:Job {id: $jobId})-[:REQUIRES]->(s)
-            RETURN s.id as id, s.name as name, s.definition as definition, 
-                labels(s) as labels
-            """
-            logger.info(f"Executing query for job skills: {direct_skills_query} with jobId={job_id}")
-            result = session.run(direct_skills_query, jobId=job_id)
+        # First, get all skills directly associated with the job
+        direct_skills_query = """
+        MATCH (j:Job {id: $jobId})-[:REQUIRES]->(s)
+        RETURN s.id as id, s.name as name, s.definition as definition, 
+            labels(s) as labels
+        """
+        detail(logger, "Executing query for job skills: %s with jobId=%s", direct_skills_query, job_id)
+        result = await run_read(direct_skills_query, jobId=job_id)
+        
+        skills = []
+        skill_ids = set()  # Track skill IDs to avoid duplicates
+        
+        for record in result:
+            labels = record["labels"]
             
-            skills = []
-            skill_ids = set()  # Track skill IDs to avoid duplicates
+            # FIXED: Preserve the original node label rather than using precedence logic
+            # This ensures HardSkill nodes are correctly identified
+            skill_type = skill_type_of(labels)
             
-            for record in result:
-                labels = record["labels"]
-                
-                # FIXED: Preserve the original node label rather than using precedence logic
-                # This ensures HardSkill nodes are correctly identified
-                if "HardSkill" in labels:
-                    skill_type = "HardSkill"
-                elif "Technology" in labels:
-                    skill_type = "Technology"
-                elif "SoftSkill" in labels:
-                    skill_type = "SoftSkill"
-                elif "Concept" in labels:
-                    skill_type = "Concept"
-                else:
-                    # Default case
-                    skill_type = "HardSkill"
-                
-                # Log the labels and assigned type for debugging
-                logger.info(f"Node labels: {labels}, Assigned type: {skill_type}")
-                
-                skill_id = record["id"]
-                skills.append({
-                    "id": skill_id,
-                    "name": record["name"],
-                    "definition": record["definition"],
-                    "type": skill_type
-                })
-                skill_ids.add(skill_id)
+            # Log the labels and assigned type for debugging
+            detail(logger, "Node labels: %s, Assigned type: %s", labels, skill_type)
             
-            logger.info(f"Found {len(skills)} direct skills for job {job_id}")
+            skill_id = record["id"]
+            skills.append({
+                "id": skill_id,
+                "name": record["name"],
+                "definition": record["definition"],
+                "type": skill_type,
+                "labels": labels
+            })
+            skill_ids.add(skill_id)
+        
+        logger.info("Found %d direct skills for job %s", len(skills), job_id)
+        
+        # Rest of the function remains the same...
+        # If no direct skills found, try to find any skills related to the job
+        if not skills:
+            broader_query = """
+            MATCH (j:Job {id: $jobId})
+            OPTIONAL MATCH (j)-[:HAS_DESCRIPTION]->(:Description)-[:MENTIONS]->(s)
+            WHERE s:HardSkill OR s:Technology OR s:SoftSkill OR s:Concept
+            RETURN DISTINCT s.id as id, s.name as name, s.definition as definition, 
+                labels(s) as labels
+            """
+            logger.info("No direct skills found for job %s, trying broader query", job_id)
+            detail(logger, "Broader query: %s", broader_query)
+            broader_result = await run_read(broader_query, jobId=job_id)
             
-            # Rest of the function remains the same...
-            # If no direct skills found, try to find any skills related to the job
-            if not skills:
-                broader_query = """
-                MATCH (j:Job {id: $jobId})
-                OPTIONAL MATCH (j)-[:HAS_DESCRIPTION]->(:Description)-[:MENTIONS]->(s)
-                WHERE s:HardSkill OR s:Technology OR s:SoftSkill OR s:Concept
-                RETURN DISTINCT s.id as id, s.name as name, s.definition as definition, 
-                    labels(s) as labels
-                """
-                logger.info(f"No direct skills found, trying broader query: {broader_query}")
-                broader_result = session.run(broader_query, jobId=job_id)
-                
-                for record in broader_result:
-                    if not record["id"]:
-                        continue
-                        
-                    labels = record["labels"]
-                    # Use the same corrected type assignment logic here
-                    if "HardSkill" in labels:
-                        skill_type = "HardSkill"
-                    elif "Technology" in labels:
-                        skill_type = "Technology"
-                    elif "SoftSkill" in labels:
-                        skill_type = "SoftSkill"
-                    elif "Concept" in labels:
-                        skill_type = "Concept"
-                    else:
-                        skill_type = "HardSkill"
+            for record in broader_result:
+                if not record["id"]:
+                    continue
                     
-                    skill_id = record["id"]
-                    if skill_id not in skill_ids:
-                        skills.append({
-                            "id": skill_id,
-                            "name": record["name"],
-                            "definition": record["definition"],
-                            "type": skill_type
-                        })
-                        skill_ids.add(skill_id)
+                labels = record["labels"]
+                # Use the same corrected type assignment logic here
+                skill_type = skill_type_of(labels)
                 
-                logger.info(f"Found {len(skills)} skills through broader search")
-            
-            # Add additional debugging log to see the final distribution of skill types
-            type_counts = {}
-            for skill in skills:
-                stype = skill["type"]
-                type_counts[stype] = type_counts.get(stype, 0) + 1
-            
-            logger.info(f"Skill type distribution: {type_counts}")
+                skill_id = record["id"]
+                if skill_id not in skill_ids:
+                    skills.append({
+                        "id": skill_id,
+                        "name": record["name"],
+                        "definition": record["definition"],
+                        "type": skill_type,
+                        "labels": labels
+                    })
+                    skill_ids.add(skill_id)
             
-            return skills
+            logger.info("Found %d skills through broader search", len(skills))
+        
+        # Add additional debugging log to see the final distribution of skill types
+        type_counts = {}
+        for skill in skills:
+            stype = skill["type"]
+            type_counts[stype] = type_counts.get(stype, 0) + 1
+        
+        logger.info("Skill type distribution: %s", type_counts)
+        
+        return skills
     except Exception as e:
         logger.error(f"Error getting job skills: {e}")
         logger.error(traceback.format_exc())
+        # Answer from the graph snapshot while Neo4j is unavailable
+        snapshot = graph_cache.peek()
+        if snapshot is not None:
+            logger.warning(f"Using the graph snapshot for the skills of job {job_id}")
+            return snapshot.job_skills(job_id)
         return []
 
-def get_all_graph_data():
-    """Fetch all nodes and relationships from Neo4j for DP calculation"""
+async def get_job_skills_batch(job_ids):
+    """Get the skills of many jobs at once, keyed by job id"""
     try:
-        driver = neo4j_driver.get_driver()
-        with driver.session() as session:
-            # Get all nodes with relevant labels
-            nodes_query = """
-            MATCH (n)
-            WHERE n:Concept OR n:HardSkill OR n:Technology OR n:SoftSkill OR n:Job
-            RETURN n.id as id, n.name as name, labels(n) as labels
+        # One parameterized query for all jobs instead of one per job
+        direct_skills_query = """
+        UNWIND $jobIds AS jobId
+        MATCH (j:Job {id: jobId})-[:REQUIRES]->(s)
+        RETURN jobId, s.id as id, s.name as name, s.definition as definition,
+            labels(s) as labels
+        """
+        result = await run_read(direct_skills_query, jobIds=list(job_ids))
+        
+        skills_by_job = {job_id: [] for job_id in job_ids}
+        seen = set()
+        for record in result:
+            key = (record["jobId"], record["id"])
+            if key in seen:
+                continue
+            seen.add(key)
+            skills_by_job[record["jobId"]].append({
+                "id": record["id"],
+                "name": record["name"],
+                "definition": record["definition"],
+                "type": skill_type_of(record["labels"]),
+                "labels": record["labels"]
+            })
+        
+        # Same broader fallback as get_job_skills for jobs without direct skills
+        missing = [job_id for job_id, skills in skills_by_job.items() if not skills]
+        if missing:
+            broader_query = """
+            UNWIND $jobIds AS jobId
+            MATCH (j:Job {id: jobId})-[:HAS_DESCRIPTION]->(:Description)-[:MENTIONS]->(s)
+            WHERE s:HardSkill OR s:Technology OR s:SoftSkill OR s:Concept
+            RETURN DISTINCT jobId, s.id as id, s.name as name, s.definition as definition,
+                labels(s) as labels
             """
-            nodes_result = session.run(nodes_query)
-            nodes = {}
-            label_of = {}
-            
-            for record in nodes_result:
-                node_id = record["id"]
-                nodes[node_id] = {
-                    "id": node_id,
+            broader_result = await run_read(broader_query, jobIds=missing)
+            for record in broader_result:
+                key = (record["jobId"], record["id"])
+                if not record["id"] or key in seen:
+                    continue
+                seen.add(key)
+                skills_by_job[record["jobId"]].append({
+                    "id": record["id"],
                     "name": record["name"],
-                    "labels": set(record["labels"])
-                }
-                label_of[node_id] = set(record["labels"])
-            
-            # Get all REQUIRES relationships
-            # (n1)-[:REQUIRES]->(n2) means n1 requires n2 (n2 is prerequisite for n1)
-            edges_query = """
-            MATCH (n1)-[r:REQUIRES]->(n2)
-            RETURN n1.id as source, n2.id as target, 
-                   r.score as score, r.predicted as predicted
-            """
-            edges_result = session.run(edges_query)
-            edges = []
-            
-            for record in edges_result:
-                edges.append({
-                    "source": record["source"],  # The skill that requires something
-                    "target": record["target"],  # The prerequisite
-                    "score": record["score"] or 0.5,
-                    "predicted": record["predicted"] if record["predicted"] is not None else False
+                    "definition": record["definition"],
+                    "type": skill_type_of(record["labels"]),
+                    "labels": record["labels"]
                 })
-            
-            logger.info(f"Found {len(nodes)} nodes and {len(edges)} edges")
-            return nodes, label_of, edges
+        
+        logger.info(f"Found skills for {sum(1 for s in skills_by_job.values() if s)} of {len(job_ids)} jobs")
+        return skills_by_job
+    except Exception as e:
+        logger.error(f"Error getting job skills for batch: {e}")
+        logger.error(traceback.format_exc())
+        snapshot = graph_cache.peek()
+        if snapshot is not None:
+            logger.warning("Using the graph snapshot for the skills of the batch")
+            return {job_id: snapshot.job_skills(job_id) for job_id in job_ids}
+        return {job_id: [] for job_id in job_ids}
+
+async def get_all_graph_data(include_definitions=False):
+    """Fetch all nodes and relationships from Neo4j for DP calculation"""
+    try:
+        # Get all nodes with relevant labels
+        nodes_query = f"""
+        MATCH (n)
+        WHERE n:Concept OR n:HardSkill OR n:Technology OR n:SoftSkill OR n:Job
+        RETURN n.id as id, n.name as name, labels(n) as labels
+            {", n.definition as definition" if include_definitions else ""}
+        """
+        # Get all REQUIRES relationships
+        # (n1)-[:REQUIRES]->(n2) means n1 requires n2 (n2 is prerequisite for n1)
+        edges_query = """
+        MATCH (n1)-[r:REQUIRES]->(n2)
+        RETURN n1.id as source, n2.id as target, 
+               r.score as score, r.predicted as predicted
+        """
+        # Both queries are independent, so run them concurrently
+        nodes_result, edges_result = await asyncio.gather(
+            run_read(nodes_query), run_read(edges_query)
+        )
+        nodes = {}
+        label_of = {}
+        
+        for record in nodes_result:
+            node_id = record["id"]
+            nodes[node_id] = {
+                "id": node_id,
+                "name": record["name"],
+                "labels": set(record["labels"])
+            }
+            if include_definitions:
+                nodes[node_id]["definition"] = record["definition"]
+            label_of[node_id] = set(record["labels"])
+        
+        edges = []
+        
+        for record in edges_result:
+            edges.append({
+                "source": record["source"],  # The skill that requires something
+                "target": record["target"],  # The prerequisite
+                "score": record["score"] or 0.5,
+                "predicted": record["predicted"] if record["predicted"] is not None else False
+            })
+        
+        logger.info(f"Found {len(nodes)} nodes and {len(edges)} edges")
+        return nodes, label_of, edges
     except Exception as e:
         logger.error(f"Error fetching graph data: {e}")
         raise
 
-def build_dp_paths(nodes, label_of, edges):
-    """Build learning paths using Dynamic Programming according to original algorithm"""
-    import networkx as nx
-    import math
-    
-    logger.info(f"Starting DP path calculation with {len(nodes)} nodes and {len(edges)} edges")
-    
-    # Constants from the original Python algorithm
-    Δ, α, β, PRED = 0.3, 0.9, 0.1, 0.7  # scoring constants
-    MAX_PATH_LENGTH = 15                # maximum reasonable path length
-    LENGTH_PENALTY = 0.03               # penalty for longer paths
-    
-    # Create a directed graph where edges go from prerequisite to skill
-    G = nx.DiGraph()
-    
-    # Add all nodes
-    for node_id in nodes:
-        G.add_node(node_id)
-    
-    logger.info(f"Added {len(nodes)} nodes to graph")
-    
-    # Calculate the maximum score for normalization
-    scores = [float(edge.get("score", 0.5)) for edge in edges if edge.get("score") is not None]
-    Smax = max(scores) if scores else 1.0
-    logger.info(f"Max score for normalization: {Smax}")
-    
-    # Add edges - IMPORTANT: In the original algorithm, edges go from prerequisite to skill
-    # In Neo4j: (A)-[:REQUIRES]->(B) means A requires B as prerequisite
-    # So we need to add edges from B -> A for the DP algorithm
-    edge_count = 0
-    for edge in edges:
-        source_id = edge["source"]  # Skill that requires prerequisite
-        target_id = edge["target"]  # Prerequisite
-        
-        if source_id in nodes and target_id in nodes:
-            # Add edge from prerequisite (target) to dependent skill (source)
-            G.add_edge(target_id, source_id, 
-                      cost=float(edge.get("score", 0.5)),
-                      raw=float(edge.get("score", 0.5)),
-                      predicted=edge.get("predicted", False))
-            edge_count += 1
-    
-    logger.info(f"Added {edge_count} edges to graph")
-    
-    # Check for cycles
+async def get_job_subgraph(job_id, skills):
+    """Fetch only the REQUIRES-ancestor closure of a job's skills.
+
+    Expands the frontier one hop per query, starting from the job and its
+    skills, for at most MAX_PATH_LENGTH hops. Returns the same
+    (nodes, label_of, edges) structure as get_all_graph_data().
+    """
     try:
-        cycles = list(nx.simple_cycles(G))
-        if cycles:
-            logger.warning(f"Found {len(cycles)} cycles in the graph, removing them")
-            # Remove edges to break cycles
-            for cycle in cycles:
-                if len(cycle) > 1:
-                    G.remove_edge(cycle[0], cycle[1])
-                    logger.info(f"Removed edge from {cycle[0]} to {cycle[1]} to break cycle")
-    except Exception as e:
-        logger.warning(f"Error checking for cycles: {e}")
-    
-    # DP tables for path calculation
-    dp = {n: -math.inf for n in G}
-    prev = {}
-    path_lens = {n: 0 for n in G}
-    
-    # Initialize sources (nodes with no prerequisites)
-    source_count = 0
-    for n in G:
-        if G.in_degree(n) == 0:
-            # Check if it's a concept or hard skill (not a technology)
-            node_labels = label_of.get(n, ())
-            if "Concept" in node_labels or "HardSkill" in node_labels:
-                dp[n] = 0.0
-                path_lens[n] = 1
-                source_count += 1
-    
-    logger.info(f"Initialized {source_count} source nodes with no prerequisites")
-    
-    # If no source nodes, initialize all concept nodes
-    if source_count == 0:
-        logger.warning("No valid source nodes found. Initializing all concept nodes.")
-        for n in G:
-            node_labels = label_of.get(n, ())
-            if "Concept" in node_labels:
-                dp[n] = 0.0
-                path_lens[n] = 1
-                source_count += 1
+        expand_query = """
+        UNWIND $ids AS id
+        MATCH (n:Job|Concept|HardSkill|Technology|SoftSkill {id: id})-[r:REQUIRES]->(m)
+        WHERE m:Concept OR m:HardSkill OR m:Technology OR m:SoftSkill
+        RETURN n.id as source, n.name as sourceName, labels(n) as sourceLabels,
+               m.id as target, m.name as targetName, labels(m) as targetLabels,
+               r.score as score, r.predicted as predicted
+        """
+        nodes = {}
+        label_of = {}
+        edges = []
         
-        logger.info(f"Initialized {source_count} concept nodes as sources")
-    
-    # If still no sources, initialize some nodes arbitrarily
-    if source_count == 0:
-        logger.warning("No valid concept nodes found. Initializing nodes arbitrarily.")
-        # Find nodes with lowest in-degree
-        in_degrees = [(n, G.in_degree(n)) for n in G.nodes()]
-        in_degrees.sort(key=lambda x: x[1])
+        # Seed with the job's skills so skills without prerequisites are kept
+        for skill in skills:
+            nodes[skill["id"]] = {"id": skill["id"], "name": skill["name"], "labels": set(skill["labels"])}
+            label_of[skill["id"]] = set(skill["labels"])
         
-        # Initialize some nodes with lowest in-degree
-        for n, _ in in_degrees[:10]:  # Initialize up to 10 nodes
-            dp[n] = 0.0
-            path_lens[n] = 1
-            source_count += 1
+        visited = {job_id} | set(nodes)
+        frontier = [job_id] + list(nodes)
+        depth = 0
+        while frontier and depth < MAX_PATH_LENGTH:
+            result = await run_read(expand_query, ids=frontier)
+            next_frontier = []
+            for record in result:
+                for node_id, name, labels in (
+                    (record["source"], record["sourceName"], record["sourceLabels"]),
+                    (record["target"], record["targetName"], record["targetLabels"]),
+                ):
+                    nodes[node_id] = {"id": node_id, "name": name, "labels": set(labels)}
+                    label_of[node_id] = set(labels)
+                
+                edges.append({
+                    "source": record["source"],
+                    "target": record["target"],
+                    "score": record["score"] or 0.5,
+                    "predicted": record["predicted"] if record["predicted"] is not None else False
+                })
+                
+                if record["target"] not in visited:
+                    visited.add(record["target"])
+                    next_frontier.append(record["target"])
+            frontier = next_frontier
+            depth += 1
         
-        logger.info(f"Initialized {source_count} arbitrary nodes as sources")
-    
-    # Check if the graph is a DAG
-    is_dag = nx.is_directed_acyclic_graph(G)
-    logger.info(f"Graph is a DAG: {is_dag}")
-    
-    if is_dag:
-        # Run DP in topological order for DAG
+        logger.info(f"Fetched job subgraph for {job_id}: {len(nodes)} nodes and {len(edges)} edges in {depth} hops")
+        return nodes, label_of, edges
+    except Exception as e:
+        logger.error(f"Error fetching job subgraph: {e}")
+        raise
+
+async def get_score_max():
+    """Largest REQUIRES score, as get_all_graph_data() defaults it, over the whole graph"""
+    query = """
+    MATCH ()-[r:REQUIRES]->()
+    RETURN max(CASE WHEN r.score IS NULL OR r.score = 0 THEN 0.5 ELSE r.score END) AS scoreMax
+    """
+    record = (await run_read(query))[0]
+    return float(record["scoreMax"]) if record["scoreMax"] is not None else 1.0
+
+async def get_graph_version():
+    """Get a fingerprint of the graph (counts plus last-updated markers)"""
+    if not GRAPH_VERSION_PROPERTY:
+        # Plain label and relationship-type counts are answered from the
+        # count store, without touching a single node or relationship
+        query = """
+        CALL {
+            MATCH (n:Concept) RETURN count(n) AS c
+            UNION ALL
+            MATCH (n:HardSkill) RETURN count(n) AS c
+            UNION ALL
+            MATCH (n:Technology) RETURN count(n) AS c
+            UNION ALL
+            MATCH (n:SoftSkill) RETURN count(n) AS c
+            UNION ALL
+            MATCH (n:Job) RETURN count(n) AS c
+        }
+        WITH sum(c) AS nodeCount
+        CALL {
+            MATCH ()-[r:REQUIRES]->() RETURN count(r) AS edgeCount
+        }
+        RETURN nodeCount, edgeCount, null AS nodesUpdatedAt, null AS edgesUpdatedAt
+        """
+        record = (await run_read(query))[0]
+        return f"{record['nodeCount']}:{record['edgeCount']}:None:None"
+    # max() over the marker property reads every skill/job node and every
+    # REQUIRES relationship; only the one summary row is shipped back, but
+    # the cost grows with the graph, hence the long check interval
+    query = """
+    CALL {
+        MATCH (n:Concept) RETURN count(n) AS c, max(n[$versionProperty]) AS u
+        UNION ALL
+        MATCH (n:HardSkill) RETURN count(n) AS c, max(n[$versionProperty]) AS u
+        UNION ALL
+        MATCH (n:Technology) RETURN count(n) AS c, max(n[$versionProperty]) AS u
+        UNION ALL
+        MATCH (n:SoftSkill) RETURN count(n) AS c, max(n[$versionProperty]) AS u
+        UNION ALL
+        MATCH (n:Job) RETURN count(n) AS c, max(n[$versionProperty]) AS u
+    }
+    WITH sum(c) AS nodeCount, max(u) AS nodesUpdatedAt
+    OPTIONAL MATCH ()-[r:REQUIRES]->()
+    RETURN nodeCount, nodesUpdatedAt,
+           count(r) AS edgeCount, max(r[$versionProperty]) AS edgesUpdatedAt
+    """
+    record = (await run_read(query, versionProperty=GRAPH_VERSION_PROPERTY))[0]
+    return (
+        f"{record['nodeCount']}:{record['edgeCount']}:"
+        f"{record['nodesUpdatedAt']}:{record['edgesUpdatedAt']}"
+    )
+
+def graph_version_of(version):
+    """Neo4j graph version a snapshot version is based on, without its "+delta<n>" suffix"""
+    return version.partition("+delta")[0]
+
+def file_graph_version(path):
+    """Graph version of the snapshot in a graph_store file; reads only its header"""
+    return graph_version_of(open_snapshot(path).version)
+
+class GraphSnapshot:
+    """In-memory copy of the graph data used to answer path requests"""
+    def __init__(self, nodes, label_of, edges, version, graph=None, edge_index=None, dp_tables=None,
+                 source="neo4j", embeddings=None, score_max=None):
+        self.nodes = nodes
+        self.label_of = label_of
+        self.edges = edges
+        self.version = version
+        self.source = source            # "neo4j" or the snapshot file it was read from
+        self.shared_path = None         # published SharedGraphStore file this snapshot maps
+        self.loaded_at = time.time()
+        if graph is None:
+            with stage("csr_build"):
+                graph = CSRGraph.from_graph_data(nodes, label_of, edges, score_max)
+        self.graph = graph
+        # (source, target) -> score/predicted lookups for path edges
+        if edge_index is None:
+            with stage("edge_index"):
+                edge_index = EdgeIndex(self.graph)
+        self.edge_index = edge_index
+        # The DP tables only depend on the graph, so they are materialized
+        # once per version and every request just follows prev pointers
+        if embeddings is None:
+            embeddings = embedding_store
+        if dp_tables is None:
+            dp_tables = compute_dp_tables(self.graph, embeddings)
+        self.dp_tables = dp_tables
+        self.prev = self.dp_tables.prev_map()
+        # Node index -> embedding row, for the A* heuristic
+        self.embeddings = embeddings
+        self.embedding_rows = (
+            embeddings.rows_for(self.dp_tables.graph.ids) if embeddings is not None else None
+        )
+
+    def with_edge_changes(self, changes, version):
+        """New snapshot with REQUIRES edge changes applied, without reloading the graph.
+
+        ``changes`` are applied in order. Inserting an existing edge
+        re-scores it, and updating or deleting a missing edge does nothing.
+        The DP tables are repaired over the downstream cone of the changed
+        edges, or recomputed from the updated arrays when the change
+        affects the whole DP (see graph_engine.apply_edge_changes).
+        """
+        index = self.graph.index
+        unknown = sorted({
+            skill_id for change in changes for skill_id in (change["source"], change["target"])
+            if skill_id not in index
+        })
+        if unknown:
+            raise ValueError(f"Unknown skills: {unknown}")
+
+        folded = {}
+        for change in changes:
+            key = (change["source"], change["target"])
+            if change["op"] == "delete":
+                folded[key] = None
+                continue
+            current = folded[key] if key in folded else self.edge_index.get(*key)
+            if change["op"] == "update" and current is None:
+                continue
+            # Same defaults as get_all_graph_data for missing properties
+            score = change.get("score")
+            predicted = change.get("predicted")
+            folded[key] = (
+                float(score) if score is not None else (current[0] if current else 0.5),
+                bool(predicted) if predicted is not None else (current[1] if current else False),
+            )
+
+        # The graph engine keys edges prerequisite -> dependent
+        pairs = {(index[target], index[source]): value for (source, target), value in folded.items()}
+        with stage("dp_repair"):
+            graph, dp_tables, info = apply_edge_changes(self.graph, self.dp_tables, pairs, self.embeddings)
+        if dp_tables is None:
+            logger.info(f"Recomputing DP tables after edge changes: {info['reason']}")
+            dp_tables = compute_dp_tables(graph, self.embeddings)
+
+        if isinstance(self.edges, EdgeList):
+            edges = EdgeList(graph)
+        else:
+            edges = [edge for edge in self.edges if (edge["source"], edge["target"]) not in folded]
+            edges.extend(
+                {"source": source, "target": target, "score": value[0], "predicted": value[1]}
+                for (source, target), value in folded.items() if value is not None
+            )
+        snapshot = GraphSnapshot(
+            self.nodes, self.label_of, edges, version,
+            graph=graph, edge_index=self.edge_index.updated(graph), dp_tables=dp_tables,
+            source=self.source, embeddings=self.embeddings
+        )
+        return snapshot, info
+
+    @classmethod
+    def from_file(cls, path, shared=False):
+        """Snapshot served from a graph_store file, without Neo4j.
+
+        Everything stays in the mapped file: node records, edges and, if
+        stored, the DP tables. With ``shared`` the file is a published
+        SharedGraphStore snapshot that other processes map as well.
+        """
+        graph_file = open_snapshot(path)
+        with stage("csr_build"):
+            graph = graph_file.graph()
+        # Embeddings stored with the graph take precedence over MODEL_PATH
+        embeddings = graph_file.embeddings(graph)
+        if embeddings is None:
+            embeddings = embedding_store
+        snapshot = cls(
+            graph_file.nodes(graph), {}, EdgeList(graph), graph_file.version,
+            graph=graph, edge_index=EdgeIndex(graph, by_row=True), dp_tables=graph_file.dp_tables(graph),
+            source=str(path), embeddings=embeddings
+        )
+        if shared:
+            snapshot.shared_path = str(path)
+        return snapshot
+
+    def job_skills(self, job_id):
+        """The job's REQUIRES skills from the snapshot, shaped like get_job_skills()"""
+        graph = self.graph
+        job = graph.index.get(job_id)
+        if job is None:
+            return []
+        # The job is the dependent of the edges to its skills
+        in_offsets, in_edge_ids = graph.in_csr()
+        skills = []
+        for i in graph.sources[in_edge_ids[in_offsets[job]:in_offsets[job + 1]]].tolist():
+            node = self.nodes[graph.ids[i]]
+            skills.append({
+                "id": node["id"],
+                "name": node["name"],
+                "definition": node.get("definition"),
+                "type": skill_type_of(node["labels"]),
+                "labels": sorted(node["labels"])
+            })
+        return skills
+
+    def __reduce_ex__(self, protocol):
+        # Path workers map a shared snapshot themselves instead of unpickling it
+        if self.shared_path is not None:
+            return GraphSnapshot.from_file, (self.shared_path, True)
+        return super().__reduce_ex__(protocol)
+
+    def __getstate__(self):
+        # Path workers only need the arrays, DP tables and node records
+        state = self.__dict__.copy()
+        state["edges"] = []
+        state["label_of"] = {}
+        state["embeddings"] = None
+        state["embedding_rows"] = None
+        return state
+
+    def info(self):
+        return {
+            "version": self.version,
+            "nodeCount": len(self.nodes),
+            "edgeCount": len(self.edges),
+            "pathCount": len(self.prev),
+            "droppedCycleEdges": self.dp_tables.dropped_edges,
+            "semanticPenalty": "embeddings" if self.dp_tables.sem_pen is not None else "constant",
+            "source": self.source,
+            "loadedAt": self.loaded_at
+        }
+
+class GraphSnapshotCache:
+    """Process-wide graph snapshot that is reloaded only when the graph version changes"""
+    def __init__(self):
+        self._snapshot = None
+        self._last_check = 0.0
+        self._lock = asyncio.Lock()
+        self._warm_up_task = None
+        self._listeners = []
+        self._load_started = 0.0    # monotonic time the last Neo4j load began
+        self._deltas = 0            # edge deltas applied so far, numbers snapshot versions
+
+    def add_listener(self, callback):
+        """Call ``callback(snapshot)`` every time a new snapshot is loaded"""
+        self._listeners.append(callback)
+
+    def peek(self):
+        """Return the current snapshot without checking the graph version (None if not loaded)"""
+        return self._snapshot
+
+    def warm_up(self):
+        """Start loading the snapshot in the background if it isn't loaded yet"""
+        if self._snapshot is None and (self._warm_up_task is None or self._warm_up_task.done()):
+            self._warm_up_task = asyncio.create_task(self.get())
+
+    async def get(self):
+        """Return the current snapshot, reloading it if the graph version changed"""
+        if self._snapshot is not None and time.time() - self._last_check < GRAPH_VERSION_CHECK_INTERVAL:
+            return self._snapshot
+
+        async with self._lock:
+            now = time.time()
+            if self._snapshot is not None and now - self._last_check < GRAPH_VERSION_CHECK_INTERVAL:
+                # Another request checked (and reloaded) while this one waited
+                metrics.COALESCED_CALLS.inc(kind="graph_version")
+                return self._snapshot
+
+            try:
+                with stage("graph_version"):
+                    version = await get_graph_version()
+            except Exception as e:
+                if self._snapshot is None:
+                    raise
+                # Keep serving the snapshot we have until Neo4j is back
+                logger.warning(f"Graph version check failed, serving snapshot {self._snapshot.version}: {e}")
+                self._last_check = now
+                return self._snapshot
+            self._last_check = now
+            if self._snapshot is not None and graph_version_of(self._snapshot.version) == version:
+                if shared_graph is not None:
+                    await self._attach_shared_delta(version)
+                return self._snapshot
+
+            metrics.GRAPH_RELOADS.inc(reason="initial" if self._snapshot is None else "version_change")
+            return await self._load(version)
+
+    async def refresh(self):
+        """Reload the snapshot from Neo4j.
+
+        Concurrent refreshes coalesce: a caller that waited for a reload
+        which began after it asked gets that snapshot instead of loading
+        the graph once more.
+        """
+        requested = time.monotonic()
+        async with self._lock:
+            if self._snapshot is not None and self._load_started > requested:
+                metrics.COALESCED_CALLS.inc(kind="graph_refresh")
+                return self._snapshot
+            version = await get_graph_version()
+            self._last_check = time.time()
+            metrics.GRAPH_RELOADS.inc(reason="refresh")
+            return await self._load(version, force=True)
+
+    async def _load(self, version, force=False):
+        self._load_started = time.monotonic()
+        if shared_graph is not None:
+            return await self._load_shared(version, force)
+        previous = self._snapshot.version if self._snapshot is not None else None
+        logger.info(f"Loading graph snapshot (version {previous} -> {version})")
+        with stage("get_all_graph_data"):
+            nodes, label_of, edges = await get_all_graph_data()
+        # Building the CSR graph and DP tables is CPU work, keep it off the event loop
+        snapshot = await asyncio.to_thread(GraphSnapshot, nodes, label_of, edges, version)
+        logger.info(f"Graph snapshot loaded: {len(nodes)} nodes, {len(edges)} edges")
+        return self._publish(snapshot)
+
+    async def _load_shared(self, version, force):
+        """Attach to the host's shared snapshot, loading it from Neo4j if it is stale.
+
+        Only the process holding the publish lock reads Neo4j; the others
+        wait for it and map the file it published.
+        """
+        seen = await asyncio.to_thread(shared_graph.current)
+        if seen is not None and not force and await asyncio.to_thread(file_graph_version, seen) == version:
+            return self._publish(await asyncio.to_thread(GraphSnapshot.from_file, seen, True))
+
+        lock = await asyncio.to_thread(shared_graph.acquire)
         try:
-            # Process nodes in topological order
-            for u in nx.topological_sort(G):
-                if dp[u] < -1e8:  # Skip nodes we haven't reached yet
-                    continue
-                    
-                for _, v, d in G.out_edges(u, data=True):
-                    # Calculate gain as per the original algorithm
-                    cost = d.get("cost", 0.5)
-                    s_norm = cost / Smax if Smax else 0.5
-                    sem_pen = 0.5  # Default semantic penalty
-                    
-                    # Length penalty to discourage very long paths
-                    length_factor = LENGTH_PENALTY * path_lens[u]
-                    
-                    # Calculate gain as in the original algorithm
-                    gain = Δ - α * s_norm - β * sem_pen - length_factor
-                    cand = dp[u] + gain
-                    
-                    new_path_len = path_lens[u] + 1
-                    
-                    # Only update if better path and reasonable length
-                    if new_path_len <= MAX_PATH_LENGTH and cand > dp[v]:
-                        dp[v] = cand
-                        prev[v] = u
-                        path_lens[v] = new_path_len
-            
-            logger.info(f"DP completed successfully. Nodes with valid paths: {sum(1 for v in dp.values() if v > -math.inf)}")
-            
-        except Exception as e:
-            logger.error(f"Error running DP in topological order: {e}")
-            logger.error(traceback.format_exc())
-            # Fall back to simpler algorithm
-            is_dag = False
-    
-    if not is_dag:
-        logger.warning("Using Bellman-Ford-like algorithm for path finding.")
-        # Simpler algorithm for potential cyclic graphs
-        changed = True
-        iterations = 0
-        
-        while changed and iterations < len(G):
-            changed = False
-            iterations += 1
-            
-            for u in G.nodes():
-                if dp[u] < -1e8:
-                    continue
-                    
-                for _, v, d in G.out_edges(u, data=True):
-                    cost = d.get("cost", 0.5)
-                    s_norm = cost / Smax if Smax else 0.5
-                    sem_pen = 0.5
-                    length_factor = LENGTH_PENALTY * path_lens[u]
-                    
-                    gain = Δ - α * s_norm - β * sem_pen - length_factor
-                    cand = dp[u] + gain
-                    
-                    new_path_len = path_lens[u] + 1
-                    
-                    if new_path_len <= MAX_PATH_LENGTH and cand > dp[v]:
-                        dp[v] = cand
-                        prev[v] = u
-                        path_lens[v] = new_path_len
-                        changed = True
-    
-    # Check paths counts
-    paths_found = 0
-    for v in G.nodes():
-        if dp[v] > -1e8 and v in prev:
-            paths_found += 1
-    
-    logger.info(f"DP calculation complete. Found {paths_found} paths in total.")
-    
-    return prev
+            path = await asyncio.to_thread(shared_graph.current)
+            # Another process may have published this version while we waited
+            if (path is None or (force and path == seen)
+                    or await asyncio.to_thread(file_graph_version, path) != version):
+                logger.info(f"Publishing graph snapshot {version} to {shared_graph.directory}")
+                with stage("get_all_graph_data"):
+                    nodes, label_of, edges = await get_all_graph_data(include_definitions=True)
+                built = await asyncio.to_thread(GraphSnapshot, nodes, label_of, edges, version)
+                path = await asyncio.to_thread(self._write_shared, built)
+        finally:
+            shared_graph.release(lock)
+        snapshot = await asyncio.to_thread(GraphSnapshot.from_file, path, True)
+        logger.info(
+            f"Graph snapshot {snapshot.version} mapped from {path}: "
+            f"{snapshot.graph.num_nodes} nodes, {snapshot.graph.num_edges} edges"
+        )
+        return self._publish(snapshot)
+
+    async def _attach_shared_delta(self, version):
+        """Map an edge delta of ``version`` that another process published"""
+        path = await asyncio.to_thread(shared_graph.current)
+        if path is None or str(path) == self._snapshot.shared_path:
+            return
+        if await asyncio.to_thread(file_graph_version, path) != version:
+            return
+        snapshot = await asyncio.to_thread(GraphSnapshot.from_file, path, True)
+        logger.info(f"Graph snapshot {snapshot.version} mapped from {path}")
+        self._publish(snapshot)
+
+    @staticmethod
+    def _write_shared(snapshot):
+        graph, nodes = snapshot.graph, snapshot.nodes
+        return shared_graph.publish(lambda path: write_snapshot(
+            path, graph,
+            [nodes[node_id]["name"] for node_id in graph.ids],
+            [nodes[node_id].get("definition") for node_id in graph.ids],
+            snapshot.version, embeddings=snapshot.embeddings, dp_tables=snapshot.dp_tables
+        ))
+
+    async def load_file(self, path):
+        """Serve the snapshot stored in a graph_store file"""
+        async with self._lock:
+            logger.info(f"Loading graph snapshot from {path}")
+            snapshot = await asyncio.to_thread(GraphSnapshot.from_file, path)
+            # The file stands in for a version check; Neo4j is asked again
+            # after the usual interval
+            self._last_check = time.time()
+            metrics.GRAPH_RELOADS.inc(reason="file")
+            logger.info(
+                f"Graph snapshot {snapshot.version} loaded from {path}: "
+                f"{snapshot.graph.num_nodes} nodes, {snapshot.graph.num_edges} edges"
+            )
+            return self._publish(snapshot)
+
+    async def apply_edge_changes(self, changes, base_version):
+        """Apply REQUIRES edge changes to the current snapshot instead of reloading it.
+
+        Returns ``(snapshot, info)``; ``info`` is None when no snapshot was
+        loaded yet, or when the snapshot isn't of ``base_version``, the graph
+        version the changes were made against. The graph is then simply
+        loaded with the changes already in it.
+
+        The new snapshot is versioned ``<graph version>+delta<n>``: the
+        graph version keeps the next version check from reloading what was
+        just applied, the suffix tells path workers and caches that the
+        tables changed. With a shared snapshot directory the result is
+        published there for the other processes.
+        """
+        async with self._lock:
+            version = await get_graph_version()
+            self._last_check = time.time()
+            if self._snapshot is None:
+                metrics.GRAPH_RELOADS.inc(reason="initial")
+                return await self._load(version), None
+            if shared_graph is not None:
+                # Another process may already have published a delta on top of ours
+                await self._attach_shared_delta(version)
+            if graph_version_of(self._snapshot.version) != graph_version_of(base_version):
+                # The snapshot misses other changes made before these ones
+                logger.info(
+                    f"Edge delta made against {base_version}, snapshot is {self._snapshot.version}: reloading"
+                )
+                metrics.GRAPH_RELOADS.inc(reason="version_change")
+                return await self._load(version), None
+            if shared_graph is not None:
+                snapshot, info = await self._apply_shared(changes, version)
+            else:
+                snapshot, info = await asyncio.to_thread(
+                    self._snapshot.with_edge_changes, changes, self._delta_version(version, self._snapshot)
+                )
+            metrics.GRAPH_RELOADS.inc(reason="edge_delta")
+            return self._publish(snapshot), info
+
+    def _delta_version(self, version, base):
+        """Version of the snapshot made by applying an edge delta to ``base``"""
+        _, _, applied = base.version.partition("+delta")
+        self._deltas = max(self._deltas, int(applied or 0)) + 1
+        return f"{version}+delta{self._deltas}"
+
+    async def _apply_shared(self, changes, version):
+        """Apply edge changes on top of the latest shared snapshot and publish the result.
+
+        Holding the publish lock serializes deltas across processes, and
+        starting from the published file keeps deltas received by other
+        processes.
+        """
+        lock = await asyncio.to_thread(shared_graph.acquire)
+        try:
+            base = self._snapshot
+            path = await asyncio.to_thread(shared_graph.current)
+            if (path is not None and str(path) != base.shared_path
+                    and await asyncio.to_thread(file_graph_version, path) == version):
+                base = await asyncio.to_thread(GraphSnapshot.from_file, path, True)
+            snapshot, info = await asyncio.to_thread(
+                base.with_edge_changes, changes, self._delta_version(version, base)
+            )
+            path = await asyncio.to_thread(self._write_shared, snapshot)
+        finally:
+            shared_graph.release(lock)
+        logger.info(f"Published graph snapshot {snapshot.version} to {shared_graph.directory}")
+        return await asyncio.to_thread(GraphSnapshot.from_file, path, True), info
+
+    def _publish(self, snapshot):
+        self._snapshot = snapshot
+        metrics.GRAPH_NODES.set(len(snapshot.nodes))
+        metrics.GRAPH_EDGES.set(len(snapshot.edges))
+        metrics.GRAPH_DROPPED_EDGES.set(len(snapshot.dp_tables.dropped_edges))
+        for callback in self._listeners:
+            callback(snapshot)
+        return snapshot
+
+shared_graph = SharedGraphStore(GRAPH_SHARED_DIR) if GRAPH_SHARED_DIR else None
+graph_cache = GraphSnapshotCache()
+
+class PathResponseCache:
+    """Size-bounded LRU/TTL cache of serialized /generate-path responses.
+
+    Entries are keyed by job, normalized user skills, options and graph
+    version, and the whole cache is dropped when a new snapshot loads.
+    """
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (body, expires_at)
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(job_id, user_skills, options, version):
+        return (job_id, tuple(sorted(set(user_skills))), tuple(sorted(options.items())), version)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.time():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            metrics.CACHE_LOOKUPS.inc(result="miss")
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        metrics.CACHE_LOOKUPS.inc(result="hit")
+        return entry[0]
+
+    def put(self, key, body):
+        if self.max_bytes <= 0 or len(body) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (body, time.time() + self.ttl)
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+            metrics.CACHE_EVICTIONS.inc()
+        metrics.CACHE_BYTES.set(self._size)
+
+    def clear(self, snapshot=None):
+        if self._entries:
+            logger.info(f"Invalidating {len(self._entries)} cached path responses")
+        self._entries.clear()
+        self._size = 0
+        metrics.CACHE_BYTES.set(0)
+
+    def _remove(self, key):
+        body, _ = self._entries.pop(key)
+        self._size -= len(body)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": self.hits / lookups if lookups else 0.0
+        }
+
+response_cache = PathResponseCache(RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTL)
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one computation.
+
+    The first caller starts ``fn`` as a task; callers arriving with the
+    same key before it finishes await that task and get its result or
+    exception. A caller that goes away doesn't cancel the computation for
+    the others.
+    """
+    def __init__(self, kind):
+        self.kind = kind
+        self._calls = {}    # key -> task
+
+    async def do(self, key, fn, *args, **kwargs):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            metrics.COALESCED_CALLS.inc(kind=self.kind)
+            detail(logger, "Joining in-flight %s computation for %s", self.kind, key)
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieve the exception so it isn't reported when every caller left
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self):
+        return len(self._calls)
+
+job_skills_flight = SingleFlight("job_skills")
+job_snapshot_flight = SingleFlight("job_snapshot")
+path_flight = SingleFlight("path")
+graph_cache.add_listener(response_cache.clear)
+
+path_pool = PathWorkerPool(PATH_WORKERS, PATH_MAX_PENDING, PATH_TIMEOUT, PATH_SNAPSHOT_DIR or None)
+graph_cache.add_listener(path_pool.publish)
+
+def build_name_index(snapshot):
+    """NameIndex over the snapshot's skills and jobs"""
+    nodes = snapshot.nodes
+    entries = []
+    for node_id in snapshot.graph.ids:
+        node = nodes[node_id]
+        labels = node["labels"]
+        entries.append((node_id, node["name"], "Job" if "Job" in labels else skill_type_of(labels), labels))
+    index = NameIndex(entries)
+    logger.info(f"Built name index over {len(index)} skills and jobs for graph {snapshot.version}")
+    return index
+
+class NameIndexCache:
+    """Name index of the current snapshot, rebuilt in the background when the graph changes"""
+    def __init__(self):
+        self.index = None
+        self.version = None
+        self._nodes = None
+        self._building = None
+        self._generation = 0
+
+    def rebuild(self, snapshot):
+        """graph_cache listener: index the new snapshot's nodes"""
+        if snapshot.nodes is self._nodes:
+            # Edge-only changes keep the node records, and so the index
+            self.version = snapshot.version
+            return
+        self._nodes = snapshot.nodes
+        self._generation += 1
+        generation = self._generation
+        building = asyncio.get_running_loop().run_in_executor(None, build_name_index, snapshot)
+
+        def done(future):
+            # A slower build of an older snapshot must not replace a newer index
+            if generation == self._generation and not future.cancelled() and future.exception() is None:
+                self.index, self.version = future.result(), snapshot.version
+            elif not future.cancelled() and future.exception() is not None:
+                logger.error(f"Failed to build name index for graph {snapshot.version}: {future.exception()}")
+                if generation == self._generation:
+                    # Retry on the next graph change, even an edge-only one
+                    self._nodes = None
+        building.add_done_callback(done)
+        self._building = building
+
+    async def get(self):
+        """Index for the current graph; only waits for a build when there is no index yet"""
+        await graph_cache.get()
+        if self.index is None and self._building is not None:
+            await asyncio.shield(self._building)
+        return self.index
+
+name_index = NameIndexCache()
+graph_cache.add_listener(name_index.rebuild)
+
+@app.on_event("startup")
+async def start_path_workers():
+    path_pool.start()
+
+@app.on_event("startup")
+async def load_graph_snapshot_file():
+    if not GRAPH_SNAPSHOT_PATH:
+        return
+    if not os.path.exists(GRAPH_SNAPSHOT_PATH):
+        logger.warning(f"No graph snapshot found at {GRAPH_SNAPSHOT_PATH}, loading the graph from Neo4j")
+        return
+    try:
+        await graph_cache.load_file(GRAPH_SNAPSHOT_PATH)
+    except Exception as e:
+        logger.error(f"Failed to load graph snapshot from {GRAPH_SNAPSHOT_PATH}: {e}")
+        logger.error(traceback.format_exc())
+
+async def get_job_snapshot(job_id, skills):
+    """Build a snapshot over the job's ancestor subgraph only.
+
+    Edge costs are normalized by the whole graph's maximum score, so the
+    paths don't change once the full snapshot is loaded.
+    """
+    with stage("get_job_subgraph"):
+        (nodes, label_of, edges), score_max = await asyncio.gather(
+            get_job_subgraph(job_id, skills), get_score_max()
+        )
+    metrics.SUBGRAPH_SIZE.observe(len(edges))
+    return await asyncio.to_thread(
+        GraphSnapshot, nodes, label_of, edges, f"job:{job_id}", score_max=score_max
+    )
+
+def build_dp_paths(nodes, label_of, edges):
+    """Build learning paths using Dynamic Programming according to original algorithm"""
+    graph = CSRGraph.from_graph_data(nodes, label_of, edges)
+    return compute_dp_tables(graph).prev_map()
+
+def compute_dp_tables(graph, embeddings=None):
+    """Compute the dp, prev and path_lens tables over the whole graph.
+
+    Nothing here depends on the job or the user's skills, so the result is
+    computed once per graph snapshot and shared by all requests. With an
+    embedding store, every edge's semantic penalty is precomputed from the
+    node embeddings instead of using the constant default.
+    """
+    logger.info(f"Starting DP path calculation with {graph.num_nodes} nodes and {graph.num_edges} edges")
+    # Break cycles up front so the DP always runs on a DAG
+    with stage("cycle_breaking"):
+        dag, dropped = break_cycles(graph)
+    with stage("topological_sort"):
+        levels = topological_levels(dag)
+    sem_pen = None
+    if embeddings is not None:
+        with stage("semantic_penalty"):
+            sem_pen = embeddings.edge_penalties(dag)
+
+    with stage("dp"):
+        tables = run_dp(dag, levels, sem_pen)
+    tables.dropped_edges = dropped
+    logger.info(f"DP calculation complete. Found {tables.path_count()} paths in total.")
+    return tables
 
 def build_path_for_skill(skill_id, prev, nodes):
     """Build and log the learning path for a specific skill using the DP results"""
     if skill_id not in prev:
-        logger.info(f"No path found for skill: {nodes[skill_id]['name'] if skill_id in nodes else skill_id}")
+        detail(logger, "No path found for skill: %s", nodes[skill_id]["name"] if skill_id in nodes else skill_id)
         return None
         
     path = []
@@ -459,21 +1281,451 @@ def build_path_for_skill(skill_id, prev, nodes):
     
     # Log the path
     skill_name = nodes[skill_id]["name"] if skill_id in nodes else skill_id
-    path_names = [nodes[p]["name"] if p in nodes else p for p in reversed_path]
-    logger.info(f"Built path for {skill_name}: {' -> '.join(path_names)}")
+    detail(logger, "Built path for %s: %s", skill_name, PathNames(reversed_path, nodes))
     
     return reversed_path
 
-@app.post("/generate-path")
-async def generate_path(request: PathRequest):
-    try:
-        job_id = request.jobId
+def node_record(node_id, nodes, remaining_skills):
+    """Render a graph node the way the frontend expects it, or None if unknown"""
+    if node_id not in nodes:
+        return None
+    labels = nodes[node_id]["labels"]
+    ntype = (
+    "Technology" if "Technology" in labels else
+    "SoftSkill"  if "SoftSkill"  in labels else
+    "Concept"    if "Concept"    in labels else
+    "HardSkill"
+    )
+    existing = remaining_skills.get(node_id)
+    return {
+    "id": node_id,
+    "name": nodes[node_id]["name"],
+    "definition": existing["definition"] if existing else "",
+    "type": ntype
+    }
+
+def path_prerequisites(path, edge_index):
+    """REQUIRES edges along a prerequisites -> skill path, for visualization"""
+    prerequisites = []
+    for i in range(len(path) - 1):
+        source = path[i]
+        target = path[i + 1]
+        
+        # Find if this relationship exists and if it's predicted
+        edge_data = edge_index.get(target, source)
+        
+        is_predicted = False
+        score = 0.7
+        
+        if edge_data:
+            score, is_predicted = edge_data
+        
+        # Add to prerequisites list for visualization
+        prerequisites.append({
+            "source": target,  # In Neo4j format: target requires source
+            "target": source,
+            "type": "REQUIRES",
+            "predicted": is_predicted,
+            "score": score
+        })
+    return prerequisites
+
+def iter_job_paths(job_id, skills, user_skills, snapshot, personalized=False):
+    """Resolve the learning path of every end skill of a job, one at a time.
+
+    Yields ``("skills", remaining_skills)`` first, then
+    ``("path", skill_id, path, prerequisites)`` for every skill as soon as
+    its path is known. Paths come from the snapshot's precomputed DP
+    tables; with ``personalized`` set, they start from the user's known
+    skills (see path_search.personalized_paths) and fall back to the
+    global DP path, trimmed to start at the last skill the user already
+    knows.
+    """
+    logger.info("Found %d skills for job %s", len(skills), job_id)
+    
+    # Filter out skills the user already has
+    if user_skills:
+        skills = [s for s in skills if s["id"] not in user_skills]
+    
+    yield ("skills", skills)
+    
+    # Graph data for DP calculation comes from the in-memory snapshot
+    nodes = snapshot.nodes
+    edge_index = snapshot.edge_index
+    logger.info("Using graph snapshot %s: %d nodes, %d edges", snapshot.version, len(nodes), snapshot.graph.num_edges)
+    
+    # DP results are precomputed for the snapshot
+    prev = snapshot.prev
+    
+    # Find end skills to build paths for (HardSkill or Technology, not Concept)
+    end_skills = [skill for skill in skills 
+                if skill["type"] in ["HardSkill", "Technology", "SoftSkill"]]
+    
+    logger.info("Building paths for %d end skills", len(end_skills))
+    
+    known = set(user_skills) if personalized else set()
+    personal_paths = {}
+    if known:
+        personal_paths = personalized_paths(
+            snapshot.dp_tables.graph, user_skills, [skill["id"] for skill in end_skills],
+            sem_pen=snapshot.dp_tables.sem_pen
+        )
+    
+    paths_found = 0
+    for skill in end_skills:
+        skill_id = skill["id"]
+        
+        # Build a path using DP result
+        path = []
+        current = skill_id
+        
+        # Only start if this skill has a path in the DP results
+        if skill_id in personal_paths:
+            path = list(personal_paths[skill_id])
+        elif current in prev:
+            # Build the path from skill to prerequisites
+            path.append(current)
+            
+            # Safety counter to prevent infinite loops
+            safety = 0
+            max_iter = len(nodes) * 2
+            
+            while current in prev and safety < max_iter:
+                current = prev[current]
+                path.append(current)
+                safety += 1
+            
+            # Reverse to get prerequisites → skill
+            path.reverse()
+            
+            # Skip the part of the path the user already knows
+            if known:
+                last_known = max((i for i, n in enumerate(path) if n in known), default=0)
+                path = path[last_known:]
+        
+        if path:
+            # Only save paths with at least one prerequisite
+            if len(path) > 1:
+                paths_found += 1
+                detail(logger, "Path for %s: %s", skill["name"], PathNames(path, nodes))
+                yield ("path", skill_id, path, path_prerequisites(path, edge_index))
+            else:
+                detail(logger, "No path found for %s", skill["name"])
+    
+    # If no paths found, try to create basic connections
+    if not paths_found:
+        logger.warning("No skill paths found with DP, falling back to simple connections")
+        # Try to link required skills to relevant concepts
+        concept_skills = [s for s in skills if s["type"] == "Concept"]
+        
+        if concept_skills and end_skills:
+            logger.info("Creating simple paths with %d concepts and %d skills", len(concept_skills), len(end_skills))
+            
+            # For each end skill, connect to a concept
+            for i, skill in enumerate(end_skills):
+                skill_id = skill["id"]
+                
+                # Choose a concept (cycle through available ones if multiple skills)
+                concept_idx = i % len(concept_skills)
+                concept = concept_skills[concept_idx]
+                
+                detail(logger, "Created simple path for %s: %s -> %s", skill["name"], concept["name"], skill["name"])
+                
+                # Create a simple path with a single edge
+                yield ("path", skill_id, [concept["id"], skill_id], [{
+                    "source": skill_id,
+                    "target": concept["id"],
+                    "type": "REQUIRES",
+                    "predicted": True,
+                    "score": 0.7
+                }])
+
+def path_options(request):
+    """Path options of a request, as keyword arguments for assemble_job_paths"""
+    return {
+        "personalized": bool(request.personalized),
+        "alternatives": max(0, min(request.alternatives or 0, MAX_ALTERNATIVE_PATHS)),
+        "exclude_predicted": bool(request.excludePredicted),
+        "exclude_skills": tuple(sorted(set(request.excludeSkills or []))),
+    }
+
+def job_alternative_paths(skills, user_skills, snapshot, alternatives, exclude_predicted=False, exclude_skills=()):
+    """Up to ``alternatives`` ranked paths for each end skill of a job"""
+    end_skills = [
+        skill["id"] for skill in skills
+        if skill["id"] not in user_skills and skill["type"] in ["HardSkill", "Technology", "SoftSkill"]
+    ]
+    with stage("alternatives"):
+        ranked, info = k_best_paths(
+            snapshot.dp_tables, end_skills, alternatives,
+            exclude_predicted=exclude_predicted, exclude_ids=exclude_skills,
+            max_expansions=KBEST_MAX_EXPANSIONS
+        )
+    alternative_paths = {}
+    for skill_id, options in ranked.items():
+        alternative_paths[skill_id] = [{
+            "rank": rank,
+            "path": option["path"],
+            "score": option["score"],
+            "prerequisites": path_prerequisites(option["path"], snapshot.edge_index)
+        } for rank, option in enumerate(options, start=1)]
+    return alternative_paths, info["truncated"]
+
+def assemble_job_paths(job_id, skills, user_skills, snapshot, personalized=False,
+                       alternatives=0, exclude_predicted=False, exclude_skills=()):
+    """Build the learning-path payload for one job from the snapshot's precomputed DP tables"""
+    nodes = snapshot.nodes
+    
+    # Build paths for each skill
+    skill_paths = {}
+    prerequisites = []
+    remaining_skills = {}
+    
+    for event in iter_job_paths(job_id, skills, user_skills, snapshot, personalized):
+        if event[0] == "skills":
+            remaining_skills = {s["id"]: s for s in event[1]}
+        else:
+            _, skill_id, path, path_edges = event
+            skill_paths[skill_id] = path
+            prerequisites.extend(path_edges)
+    
+    # Ensure we have unique prerequisites
+    unique_prereqs = []
+    seen_edges = set()
+    
+    for prereq in prerequisites:
+        edge_key = (prereq["source"], prereq["target"])
+        if edge_key not in seen_edges:
+            seen_edges.add(edge_key)
+            unique_prereqs.append(prereq)
+    
+    # Individual paths were already logged (as trace detail) while resolving them
+    logger.info(
+        "Final result: %d skills, %d prerequisites, %d paths",
+        len(remaining_skills), len(unique_prereqs), len(skill_paths),
+    )
+    
+    all_node_ids = set(remaining_skills)
+    for path in skill_paths.values():
+        all_node_ids.update(path)
+    
+    alternative_paths = None
+    if alternatives:
+        alternative_paths, truncated = job_alternative_paths(
+            skills, user_skills, snapshot, alternatives, exclude_predicted, exclude_skills
+        )
+        for options in alternative_paths.values():
+            for option in options:
+                all_node_ids.update(option["path"])
+
+    all_nodes = []
+    for nid in all_node_ids:
+        record = node_record(nid, nodes, remaining_skills)   # from get_all_graph_data()
+        if record:
+            all_nodes.append(record)
+
+# ─── Return a richer payload — rename key to learningPaths for clarity ────
+    response = {
+    "jobId": job_id,
+    "skills": all_nodes,                 # ← every node you need to render
+    "prerequisites": unique_prereqs,
+    "learningPaths": skill_paths        # ← renamed (was “skillPaths”)
+    }
+    if alternative_paths is not None:
+        response["alternativePaths"] = alternative_paths
+        response["alternativesTruncated"] = truncated
+    return response
+
+def assemble_batch_paths(items, skills_by_job, snapshot):
+    """Payload (or error) per batch item, keyed like the /generate-paths response"""
+    results = {}
+    for key, item in items:
+        skills = skills_by_job.get(item["jobId"])
+        if not skills:
+            results[key] = {
+                "status": "error",
+                "message": f"No skills found for job {item['jobId']}"
+            }
+            continue
+        results[key] = assemble_job_paths(
+            item["jobId"], skills, item["userSkills"], snapshot, **item["options"]
+        )
+    return results
+
+async def compute_paths(fn, *args, snapshot, **kwargs):
+    """Run a path computation in the worker pool if it serves this snapshot, else inline"""
+    if await path_pool.serves(snapshot):
+        with stage("path_worker"):
+            return await path_pool.run(fn, *args, **kwargs)
+    with stage("assemble_paths"):
+        return fn(*args, snapshot=snapshot, **kwargs)
+
+async def build_job_path_body(job_id, skills, user_skills, snapshot, options, cache_key=None):
+    """Serialized /generate-path response, stored in the response cache under ``cache_key``"""
+    response = await compute_paths(
+        assemble_job_paths, job_id, skills, user_skills, snapshot=snapshot, **options
+    )
+    with stage("serialize"):
+        body = JSONResponse(content=response).body
+    if cache_key is not None:
+        response_cache.put(cache_key, body)
+    return body
+
+def pool_error_response(e):
+    """503 when the worker pool is saturated, 504 when a computation timed out"""
+    if isinstance(e, PoolSaturated):
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": "1"},
+            content={"status": "error", "message": "Path workers are busy, retry later"}
+        )
+    return JSONResponse(
+        status_code=504,
+        content={"status": "error", "message": f"Path computation exceeded {PATH_TIMEOUT}s"}
+    )
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+def negotiate_stream_format(stream, accept):
+    """Pick the streaming format from ?stream= or the Accept header; None means buffered JSON"""
+    if stream:
+        return stream
+    for fmt, media_type in STREAM_MEDIA_TYPES.items():
+        if media_type in accept:
+            return fmt
+    return None
+
+def encode_frame(frame, stream_format):
+    """Serialize one frame as an NDJSON line or a server-sent event"""
+    data = json.dumps(frame, ensure_ascii=False, separators=(",", ":"))
+    if stream_format == "sse":
+        return f"event: {frame['type']}\ndata: {data}\n\n".encode("utf-8")
+    return (data + "\n").encode("utf-8")
+
+def stream_job_paths(job_id, skills, user_skills, snapshot, stream_format, personalized=False,
+                     alternatives=0, exclude_predicted=False, exclude_skills=()):
+    """Streaming counterpart of assemble_job_paths.
+
+    Emits a ``skills`` frame with the job's remaining skills, one ``path``
+    frame per end skill as soon as its path is resolved (with the records
+    of nodes not sent before), an ``alternatives`` frame if alternatives
+    were requested, then a ``summary`` frame. The frames carry the same
+    data as the buffered payload.
+    """
+    nodes = snapshot.nodes
+    remaining_skills = {}
+    sent_nodes = set()
+    seen_edges = set()
+    path_count = 0
+    try:
+        for event in iter_job_paths(job_id, skills, user_skills, snapshot, personalized):
+            if event[0] == "skills":
+                remaining_skills = {s["id"]: s for s in event[1]}
+                records = [node_record(nid, nodes, remaining_skills) for nid in remaining_skills]
+                sent_nodes.update(remaining_skills)
+                yield encode_frame({
+                    "type": "skills",
+                    "jobId": job_id,
+                    "skills": [r for r in records if r],
+                }, stream_format)
+                continue
+            
+            _, skill_id, path, path_edges = event
+            path_count += 1
+            new_nodes = []
+            for nid in path:
+                if nid not in sent_nodes:
+                    sent_nodes.add(nid)
+                    record = node_record(nid, nodes, remaining_skills)
+                    if record:
+                        new_nodes.append(record)
+            new_edges = []
+            for prereq in path_edges:
+                edge_key = (prereq["source"], prereq["target"])
+                if edge_key not in seen_edges:
+                    seen_edges.add(edge_key)
+                    new_edges.append(prereq)
+            yield encode_frame({
+                "type": "path",
+                "skillId": skill_id,
+                "path": path,
+                "prerequisites": new_edges,
+                "skills": new_nodes,
+            }, stream_format)
+        
+        if alternatives:
+            alternative_paths, truncated = job_alternative_paths(
+                skills, user_skills, snapshot, alternatives, exclude_predicted, exclude_skills
+            )
+            new_nodes = []
+            for options in alternative_paths.values():
+                for option in options:
+                    for nid in option["path"]:
+                        if nid not in sent_nodes:
+                            sent_nodes.add(nid)
+                            record = node_record(nid, nodes, remaining_skills)
+                            if record:
+                                new_nodes.append(record)
+            yield encode_frame({
+                "type": "alternatives",
+                "alternativePaths": alternative_paths,
+                "alternativesTruncated": truncated,
+                "skills": new_nodes,
+            }, stream_format)
+        
+        logger.info("Streamed %d paths for job %s", path_count, job_id)
+        yield encode_frame({
+            "type": "summary",
+            "jobId": job_id,
+            "skillCount": len(sent_nodes),
+            "prerequisiteCount": len(seen_edges),
+            "pathCount": path_count,
+        }, stream_format)
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"Error streaming paths for job {job_id}: {e}")
+        logger.error(traceback.format_exc())
+        yield encode_frame({"type": "error", "message": f"Failed to generate path: {str(e)}"}, stream_format)
+
+@app.post("/generate-path")
+async def generate_path(request: PathRequest, http_request: Request, stream: Optional[str] = None):
+    try:
+        job_id = request.jobId
         user_skills = request.userSkills or []
         
-        logger.info(f"Generating path for job {job_id} with user skills: {user_skills}")
+        logger.info("Generating path for job %s with %d user skills", job_id, len(user_skills))
+        detail(logger, "User skills: %s", user_skills)
+        
+        stream_format = negotiate_stream_format(stream, http_request.headers.get("accept", ""))
+        if stream_format and stream_format not in STREAM_MEDIA_TYPES:
+            return JSONResponse(
+                status_code=400,
+                content={"status": "error", "message": f"Unsupported stream format: {stream_format}"}
+            )
         
-        # Get skills for the job
-        skills = get_job_skills(job_id)
+        cache_key = None
+        if graph_cache.peek() is None:
+            # No precomputed state yet: answer from the job's ancestor subgraph
+            # while the full snapshot loads in the background
+            graph_cache.warm_up()
+            with stage("get_job_skills"):
+                skills = await job_skills_flight.do(job_id, get_job_skills, job_id)
+            snapshot = await job_snapshot_flight.do(job_id, get_job_snapshot, job_id, skills) if skills else None
+        else:
+            # Only the throttled graph-version check can reach Neo4j before a cache hit
+            snapshot = await graph_cache.get()
+            # Streamed responses bypass the response cache
+            if not stream_format:
+                cache_key = response_cache.make_key(job_id, user_skills, path_options(request), snapshot.version)
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Serving cached path for job %s", job_id)
+                    return Response(content=cached, media_type="application/json")
+            with stage("get_job_skills"):
+                skills = await job_skills_flight.do(job_id, get_job_skills, job_id)
         
         if not skills:
             logger.warning(f"No skills found for job {job_id}")
@@ -485,190 +1737,139 @@ async def generate_path(request: PathRequest):
                 }
             )
         
-        logger.info(f"Found {len(skills)} skills for job {job_id}")
-        
-        # Create a skill map for easy lookup
-        skill_map = {skill["id"]: skill for skill in skills}
-        
-        # Filter out skills the user already has
-        if user_skills:
-            skills = [s for s in skills if s["id"] not in user_skills]
-        
-        # Get all graph data for DP calculation
-        nodes, label_of, edges = get_all_graph_data()
-        logger.info(f"Fetched graph data: {len(nodes)} nodes, {len(edges)} edges")
-        
-        # Define name_of function here, inside this scope
-        def name_of(node_id):
-            """Get a human-readable name for a node"""
-            if node_id in nodes and "name" in nodes[node_id]:
-                return nodes[node_id]["name"]
-            if str(node_id) in skill_map:
-                return skill_map[str(node_id)]["name"]
-            return str(node_id)
-        
-        # Run DP to find optimal paths
-        prev = build_dp_paths(nodes, label_of, edges)
+        if stream_format:
+            frames = stream_job_paths(
+                job_id, skills, user_skills, snapshot, stream_format, **path_options(request)
+            )
+            return StreamingResponse(frames, media_type=STREAM_MEDIA_TYPES[stream_format])
         
-        # Build paths for each skill
-        skill_paths = {}
-        prerequisites = []
+        # Identical concurrent requests share one computation
+        options = path_options(request)
+        body = await path_flight.do(
+            response_cache.make_key(job_id, user_skills, options, snapshot.version),
+            build_job_path_body, job_id, skills, user_skills, snapshot, options, cache_key
+        )
+        return Response(content=body, media_type="application/json")
+    except (PoolSaturated, DeadlineExceeded) as e:
+        logger.warning(f"Path computation for job {request.jobId} rejected: {type(e).__name__}")
+        return pool_error_response(e)
+    except Exception as e:
+        logger.error(f"Error generating path: {e}")
+        logger.error(traceback.format_exc())
+        return JSONResponse(
+            status_code=500,
+            content={"status": "error", "message": f"Failed to generate path: {str(e)}"}
+        )
         
-        # Find end skills to build paths for (HardSkill or Technology, not Concept)
-        end_skills = [skill for skill in skills 
-                    if skill["type"] in ["HardSkill", "Technology", "SoftSkill"]]
+@app.post("/generate-paths")
+async def generate_paths(request: BatchPathRequest):
+    """Generate learning paths for many (jobId, userSkills) pairs in one call"""
+    try:
+        items = request.items
+        if len(items) > MAX_BATCH_SIZE:
+            return JSONResponse(
+                status_code=422,
+                content={
+                    "status": "error",
+                    "message": f"Batch too large: {len(items)} items (max {MAX_BATCH_SIZE})"
+                }
+            )
         
-        logger.info(f"Building paths for {len(end_skills)} end skills")
+        keys = [item.key or item.jobId for item in items]
+        duplicates = sorted(key for key, count in Counter(keys).items() if count > 1)
+        if duplicates:
+            return JSONResponse(
+                status_code=422,
+                content={
+                    "status": "error",
+                    "message": f"Duplicate keys in batch: {duplicates}. Set a distinct 'key' per item."
+                }
+            )
         
-        for skill in end_skills:
-            skill_id = skill["id"]
-            
-            # Build a path using DP result
-            path = []
-            current = skill_id
-            
-            # Only start if this skill has a path in the DP results
-            if current in prev:
-                # Build the path from skill to prerequisites
-                path.append(current)
-                
-                # Safety counter to prevent infinite loops
-                safety = 0
-                max_iter = len(nodes) * 2
-                
-                while current in prev and safety < max_iter:
-                    current = prev[current]
-                    path.append(current)
-                    safety += 1
-                
-                # Reverse to get prerequisites → skill
-                path.reverse()
-                
-                # Only save paths with at least one prerequisite
-                if len(path) > 1:
-                    skill_paths[skill_id] = path
-                    path_names = []
-                    for n in path:
-                        if n in nodes:
-                            path_names.append(name_of(n))
-                    logger.info(f"Path for {skill['name']}: {' -> '.join(path_names)}")
-                    
-                    # Create edges based on path for visualization
-                    for i in range(len(path) - 1):
-                        source = path[i]
-                        target = path[i + 1]
-                        
-                        # Find if this relationship exists and if it's predicted
-                        edge_data = next((e for e in edges 
-                                          if e["source"] == target and e["target"] == source), None)
-                        
-                        is_predicted = False
-                        score = 0.7
-                        
-                        if edge_data:
-                            is_predicted = edge_data.get("predicted", False)
-                            score = edge_data.get("score", 0.7)
-                        
-                        # Add to prerequisites list for visualization
-                        prerequisites.append({
-                            "source": target,  # In Neo4j format: target requires source
-                            "target": source,
-                            "type": "REQUIRES",
-                            "predicted": is_predicted,
-                            "score": score
-                        })
-                else:
-                    logger.info(f"No path found for {skill['name']}")
+        job_ids = list(dict.fromkeys(item.jobId for item in items))
+        logger.info(f"Generating paths for a batch of {len(items)} items over {len(job_ids)} jobs")
         
-        # If no paths found, try to create basic connections
-        if not skill_paths:
-            logger.warning("No skill paths found with DP, falling back to simple connections")
-            # Try to link required skills to relevant concepts
-            concept_skills = [s for s in skills if s["type"] == "Concept"]
-            
-            if concept_skills and end_skills:
-                logger.info(f"Creating simple paths with {len(concept_skills)} concepts and {len(end_skills)} skills")
-                
-                # For each end skill, connect to a concept
-                for i, skill in enumerate(end_skills):
-                    skill_id = skill["id"]
-                    
-                    # Choose a concept (cycle through available ones if multiple skills)
-                    concept_idx = i % len(concept_skills)
-                    concept = concept_skills[concept_idx]
-                    
-                    # Create a simple path
-                    path = [concept["id"], skill_id]
-                    skill_paths[skill_id] = path
-                    
-                    # Add an edge
-                    prerequisites.append({
-                        "source": skill_id,
-                        "target": concept["id"],
-                        "type": "REQUIRES",
-                        "predicted": True,
-                        "score": 0.7
-                    })
-                    
-                    logger.info(f"Created simple path for {skill['name']}: {concept['name']} -> {skill['name']}")
-        
-        # Ensure we have unique prerequisites
-        unique_prereqs = []
-        seen_edges = set()
+        # All jobs share one skills query and one graph snapshot / DP pass
+        skills_by_job, snapshot = await asyncio.gather(
+            get_job_skills_batch(job_ids), graph_cache.get()
+        )
         
-        for prereq in prerequisites:
-            edge_key = (prereq["source"], prereq["target"])
-            if edge_key not in seen_edges:
-                seen_edges.add(edge_key)
-                unique_prereqs.append(prereq)
+        # The whole batch is one computation, so it takes a single worker slot
+        batch = [
+            (key, {"jobId": item.jobId, "userSkills": item.userSkills or [], "options": path_options(item)})
+            for key, item in zip(keys, items)
+        ]
+        results = await compute_paths(assemble_batch_paths, batch, skills_by_job, snapshot=snapshot)
         
-        logger.info(f"Final result: {len(skills)} skills, {len(unique_prereqs)} prerequisites, {len(skill_paths)} paths")
+        return JSONResponse(content={"results": results})
+    except (PoolSaturated, DeadlineExceeded) as e:
+        logger.warning(f"Batch path computation rejected: {type(e).__name__}")
+        return pool_error_response(e)
+    except Exception as e:
+        logger.error(f"Error generating paths for batch: {e}")
+        logger.error(traceback.format_exc())
+        return JSONResponse(
+            status_code=500,
+            content={"status": "error", "message": f"Failed to generate paths: {str(e)}"}
+        )
+
+@app.post("/skill-path")
+async def skill_path(request: SkillPathRequest):
+    """Best path from one skill the user knows to one skill they want to learn"""
+    try:
+        snapshot = await graph_cache.get()
+        graph = snapshot.dp_tables.graph
+        for skill_id in (request.startSkill, request.targetSkill):
+            if skill_id not in graph.index:
+                return JSONResponse(
+                    status_code=404,
+                    content={"status": "error", "message": f"Skill {skill_id} not found"}
+                )
         
-        # Log all paths for debugging
-        for skill_id, path in skill_paths.items():
-            skill_name = skill_map.get(skill_id, {}).get("name", skill_id)
-            path_str = " -> ".join(name_of(n) for n in path)
-            logger.info(f"Final path for {skill_name}: {path_str}")
+        # A* is CPU work, keep it off the event loop
+        with stage("astar"):
+            path, info = await asyncio.to_thread(
+                astar_path,
+                graph, request.startSkill, request.targetSkill,
+                max_length=request.maxLength or MAX_PATH_LENGTH,
+                max_expansions=ASTAR_MAX_EXPANSIONS,
+                sem_pen=snapshot.dp_tables.sem_pen,
+                embeddings=snapshot.embeddings,
+                node_rows=snapshot.embedding_rows,
+            )
+        logger.info(
+            "A* from %s to %s expanded %d nodes, found=%s",
+            request.startSkill, request.targetSkill, info["expanded"], path is not None,
+        )
+        if path is None:
+            reason = "search budget exhausted" if info["budgetExhausted"] else "no path"
+            return JSONResponse(
+                status_code=404,
+                content={
+                    "status": "error",
+                    "message": f"No path from {request.startSkill} to {request.targetSkill} ({reason})",
+                    "expanded": info["expanded"]
+                }
+            )
         
-        all_node_ids = {s["id"] for s in skills}
-        for path in skill_paths.values():
-            all_node_ids.update(path)
-
-        all_nodes = []
-        for nid in all_node_ids:
-            if nid in nodes:                                   # from get_all_graph_data()
-                labels = nodes[nid]["labels"]
-                ntype = (
-                "Technology" if "Technology" in labels else
-                "SoftSkill"  if "SoftSkill"  in labels else
-                "Concept"    if "Concept"    in labels else
-                "HardSkill"
-                )
-
-                existing = next((s for s in skills if s["id"] == nid), None)
-                all_nodes.append({
-                "id": nid,
-                "name": nodes[nid]["name"],
-                "definition": existing["definition"] if existing else "",
-                "type": ntype
-                })
-
-# ─── Return a richer payload — rename key to learningPaths for clarity ────
-        response = {
-        "jobId": job_id,
-        "skills": all_nodes,                 # ← every node you need to render
-        "prerequisites": unique_prereqs,
-        "learningPaths": skill_paths        # ← renamed (was “skillPaths”)
-        }
-        return JSONResponse(content=response)
+        nodes = [node_record(n, snapshot.nodes, {}) for n in path]
+        return JSONResponse(content={
+            "startSkill": request.startSkill,
+            "targetSkill": request.targetSkill,
+            "path": path,
+            "skills": [n for n in nodes if n],
+            "prerequisites": path_prerequisites(path, snapshot.edge_index),
+            "cost": info["cost"],
+            "expanded": info["expanded"]
+        })
     except Exception as e:
-        logger.error(f"Error generating path: {e}")
+        logger.error(f"Error finding skill path: {e}")
         logger.error(traceback.format_exc())
         return JSONResponse(
             status_code=500,
-            content={"status": "error", "message": f"Failed to generate path: {str(e)}"}
+            content={"status": "error", "message": f"Failed to find skill path: {str(e)}"}
         )
-        
+
 def create_simple_skill_relationships(skills):
     """Fallback: Create simple relationships between skills"""
     prerequisites = []
@@ -716,293 +1917,432 @@ def create_simple_skill_relationships(skills):
     logger.info(f"Created {len(prerequisites)} simple skill relationships")
     return prerequisites
 
-@app.post("/generate-path")
-async def generate_path(request: PathRequest):
+SKILL_LABELS = ("HardSkill", "SoftSkill", "Technology", "Concept")
+
+class SkillCatalog:
+    """Skill ids of a snapshot sorted per label, for keyset pagination without Neo4j"""
+    def __init__(self, snapshot):
+        self.ids = {label: [] for label in SKILL_LABELS}
+        nodes = snapshot.nodes
+        for node_id in snapshot.graph.ids:
+            labels = nodes[node_id]["labels"]
+            for label in SKILL_LABELS:
+                if label in labels:
+                    self.ids[label].append(node_id)
+        for ids in self.ids.values():
+            ids.sort()
+
+    def page(self, types, after=None, limit=None):
+        """Up to ``limit`` ids with any of ``types``, in id order, after ``after``"""
+        runs = []
+        for label in types:
+            ids = self.ids[label]
+            start = bisect.bisect_right(ids, after) if after is not None else 0
+            runs.append(ids[start:start + limit] if limit is not None else ids[start:])
+        page = []
+        for node_id in heapq.merge(*runs):
+            # A node with several of the selected labels is in several runs
+            if page and page[-1] == node_id:
+                continue
+            page.append(node_id)
+            if len(page) == limit:
+                break
+        return page
+
+class SkillCatalogCache:
+    """SkillCatalog of the current snapshot's nodes; edge-only changes keep it"""
+    def __init__(self):
+        self._catalog = None
+        self._nodes = None
+
+    async def get(self, snapshot):
+        if snapshot.nodes is self._nodes:
+            return self._catalog
+        catalog = await asyncio.to_thread(SkillCatalog, snapshot)
+        self._catalog, self._nodes = catalog, snapshot.nodes
+        return catalog
+
+skill_catalog_cache = SkillCatalogCache()
+
+async def get_skill_definitions(skill_ids):
+    """skill id -> definition, looked up by id"""
+    query = """
+    UNWIND $ids AS id
+    MATCH (s:Concept|HardSkill|Technology|SoftSkill {id: id})
+    RETURN s.id as id, s.definition as definition
+    """
+    result = await run_read(query, ids=list(skill_ids))
+    return {record["id"]: record["definition"] for record in result}
+
+async def query_skills(snapshot, types=SKILL_LABELS, after=None, limit=None, include_definitions=True):
+    """Skill nodes of ``snapshot`` ordered by id, optionally after a given id and limited to ``limit``.
+
+    ``types`` must be a subset of SKILL_LABELS; a node matches if it has any
+    of them. Pages are cut from per-label sorted id lists by binary search
+    (keyset pagination), so every page is as cheap as the first one. Only
+    definitions missing from the snapshot are read from Neo4j, by id and
+    for the page's skills only.
+    """
+    catalog = await skill_catalog_cache.get(snapshot)
+    page = catalog.page([label for label in types if label in SKILL_LABELS], after, limit)
+    nodes = snapshot.nodes
+    skills = []
+    for skill_id in page:
+        node = nodes[skill_id]
+        skills.append({
+            "id": skill_id,
+            "name": node["name"],
+            "type": skill_type_of(node["labels"])
+        })
+    if include_definitions and skills:
+        # Snapshots loaded for path requests skip definitions
+        missing = [skill["id"] for skill in skills if "definition" not in nodes[skill["id"]]]
+        definitions = await get_skill_definitions(missing) if missing else {}
+        for skill in skills:
+            node = nodes[skill["id"]]
+            skill["definition"] = node["definition"] if "definition" in node else definitions.get(skill["id"])
+    return skills
+
+async def get_all_skills():
+    """Get all skills of the current graph snapshot"""
     try:
-        job_id = request.jobId
-        user_skills = request.userSkills or []
-        
-        logger.info(f"Generating path for job {job_id} with user skills: {user_skills}")
+        return await query_skills(await graph_cache.get())
+    except Exception as e:
+        logger.error(f"Error getting all skills: {e}")
+        logger.error(traceback.format_exc())
+        return []
+
+async def get_existing_prerequisites(skills):
+    """Get existing prerequisite relationships between the given skills"""
+    try:
+        # Extract all skill IDs
+        skill_ids = [skill["id"] for skill in skills]
         
-        # Get skills from Neo4j, including concept nodes
-        skills = get_job_skills(job_id)
+        # Find existing REQUIRES relationships between our skills using the
+        # snapshot's edge index. This also covers every skill -> Concept
+        # relationship between the skills, so no separate concept lookup
+        # is needed.
+        snapshot = await graph_cache.get()
+        prerequisites = snapshot.edge_index.between(skill_ids)
+        for prereq in prerequisites:
+            prereq["type"] = "REQUIRES"
         
-        # If no skills found, return a clear error
-        if not skills:
-            logger.warning(f"No skills found for job {job_id}")
+        logger.info(f"Found {len(prerequisites)} existing prerequisite relationships between skills")
+        return prerequisites
+    except Exception as e:
+        logger.error(f"Error getting existing prerequisites: {e}")
+        logger.error(traceback.format_exc())
+        return []
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics for the service"""
+    if not metrics.METRICS_ENABLED:
+        return JSONResponse(
+            status_code=404,
+            content={"status": "error", "message": "Metrics are disabled"}
+        )
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters and size of the /generate-path response cache"""
+    return JSONResponse(content=response_cache.stats())
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value matches ``etag`` (weak comparison)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in tags)
+
+async def current_graph_version():
+    """Graph version of the loaded snapshot (throttled check), or straight from Neo4j"""
+    if graph_cache.peek() is not None:
+        return (await graph_cache.get()).version
+    return await get_graph_version()
+
+@app.get("/autocomplete")
+async def autocomplete(q: str, limit: int = 10, types: Optional[str] = None):
+    """Top skill and job name matches for a search box.
+
+    Names starting with ``q`` come first, then names with a word starting
+    with it, then similar names by trigram overlap. ``types`` is a
+    comma-separated list of HardSkill, SoftSkill, Technology, Concept and
+    Job.
+    """
+    try:
+        if not 1 <= limit <= AUTOCOMPLETE_MAX_RESULTS:
             return JSONResponse(
-                status_code=404,
-                content={
-                    "status": "error", 
-                    "message": f"No skills found for job {job_id}"
-                }
+                status_code=400,
+                content={"status": "error", "message": f"limit must be between 1 and {AUTOCOMPLETE_MAX_RESULTS}"}
             )
-        
-        # Filter out skills the user already has
-        if user_skills:
-            skills = [s for s in skills if s["id"] not in user_skills]
-        
-        # Get all graph data for DP calculation
-        nodes, label_of, edges = get_all_graph_data()
-        
-        # Log the data we'll use for DP calculation
-        logger.info(f"Using {len(nodes)} nodes and {len(edges)} edges for DP calculation")
-        
-        # Run DP to find optimal paths
-        prev = build_dp_paths(nodes, label_of, edges)
-        
-        # Create skill_paths map for the response
-        skill_paths = {}
-        prerequisites = []
-        
-        # Identify job-required skills (skills directly associated with the job)
-        job_skill_ids = [skill["id"] for skill in skills]
-        
-        # For each skill in our job, get its learning path
-        for skill in skills:
-            skill_id = skill["id"]
-            
-            # Build the learning path for this skill if it has prerequisites
-            if skill_id in prev:
-                path = build_path_for_skill(skill_id, prev, nodes)
-                
-                if len(path) > 1:
-                    # Store the path
-                    skill_paths[skill_id] = path
-                    
-                    # Create edges along the path
-                    for i in range(len(path) - 1):
-                        source = path[i]
-                        target = path[i + 1]
-                        
-                        # Find if this is a predicted relationship
-                        edge_data = next((e for e in edges if e["source"] == target and e["target"] == source), None)
-                        is_predicted = edge_data["predicted"] if edge_data and "predicted" in edge_data else True
-                        score = edge_data["score"] if edge_data and "score" in edge_data else 0.7
-                        
-                        prerequisites.append({
-                            "source": target,
-                            "target": source,
-                            "type": "REQUIRES",
-                            "predicted": is_predicted,
-                            "score": score
-                        })
-                else:
-                    logger.info(f"No prerequisites found for {skill['name']}")
-            else:
-                logger.info(f"No path found for {skill['name']}")
-        
-        # If no paths found, create simple relationships
-        if not prerequisites:
-            logger.warning("No paths found using DP, falling back to simple relationships")
-            prerequisites = create_simple_skill_relationships(skills)
-        
-        # Remove duplicate edges
-        unique_prerequisites = []
-        seen = set()
-        for prereq in prerequisites:
-            key = (prereq["source"], prereq["target"])
-            if key not in seen:
-                seen.add(key)
-                unique_prerequisites.append(prereq)
-        
-        logger.info(f"Generated path with {len(skills)} skills, {len(unique_prerequisites)} prerequisites and {len(skill_paths)} skill paths")
-        
-        # Log each skill path for debugging
-        for skill_id, path in skill_paths.items():
-            skill_name = next((s["name"] for s in skills if s["id"] == skill_id), skill_id)
-            path_names = []
-            for p in path:
-                node_data = next((s for s in skills if s["id"] == p), None)
-                if node_data:
-                    path_names.append(f"{node_data['name']} ({node_data['type']})")
-                else:
-                    path_names.append(p)
-            logger.info(f"Skill path for {skill_name}: {' -> '.join(path_names)}")
-        
-        response = {
-            "jobId": job_id,
-            "skills": skills,
-            "prerequisites": unique_prerequisites,
-            "skillPaths": skill_paths
-        }
-        
-        return JSONResponse(content=response)
-        
+        selected = None
+        if types:
+            selected = [t.strip() for t in types.split(",") if t.strip()]
+            unknown = [t for t in selected if t not in SKILL_LABELS + ("Job",)]
+            if unknown:
+                return JSONResponse(
+                    status_code=400,
+                    content={"status": "error", "message": f"Unknown types: {unknown}"}
+                )
+        index = await name_index.get()
+        if index is None:
+            return JSONResponse(
+                status_code=503,
+                headers={"Retry-After": "1"},
+                content={"status": "error", "message": "Name index is not built yet"}
+            )
+        with stage("autocomplete"):
+            results = index.search(q, limit, selected)
+        return JSONResponse(content={"query": q, "results": results, "version": name_index.version})
     except Exception as e:
-        logger.error(f"Error generating path: {e}")
+        logger.error(f"Error searching names for {q!r}: {e}")
         logger.error(traceback.format_exc())
         return JSONResponse(
             status_code=500,
-            content={"status": "error", "message": f"Failed to generate path: {str(e)}"}
+            content={"status": "error", "message": f"Failed to search names: {str(e)}"}
         )
-def get_all_skills():
-    """Get all skills from Neo4j"""
+
+@app.get("/skills")
+async def skill_catalog(request: Request, types: Optional[str] = None, fields: str = "summary",
+                        after: Optional[str] = None, limit: int = CATALOG_PAGE_SIZE):
+    """One page of the skill catalog, ordered by skill id.
+
+    ``types`` is a comma-separated subset of HardSkill, SoftSkill,
+    Technology and Concept. ``fields=summary`` returns ids, names and
+    types, ``fields=full`` adds definitions. Pass the ``nextCursor`` of a
+    page as ``after`` to get the next one. Pages carry an ETag derived from
+    the graph version, so an unchanged page costs a 304.
+    """
     try:
-        driver = neo4j_driver.get_driver()
-        with driver.session() as session:
-            query = """
-            MATCH (s)
-            WHERE s:HardSkill OR s:SoftSkill OR s:Technology OR s:Concept
-            RETURN s.id as id, s.name as name, s.definition as definition, 
-                labels(s) as labels
-            """
-            result = session.run(query)
-            skills = []
-            for record in result:
-                labels = record["labels"]
-                skill_type = "HardSkill"
-                if "Technology" in labels:
-                    skill_type = "Technology"
-                elif "SoftSkill" in labels:
-                    skill_type = "SoftSkill"
-                elif "Concept" in labels:
-                    skill_type = "Concept"
-                
-                skills.append({
-                    "id": record["id"],
-                    "name": record["name"],
-                    "definition": record["definition"],
-                    "type": skill_type
-                })
-            return skills
+        selected = SKILL_LABELS
+        if types:
+            selected = tuple(dict.fromkeys(t.strip() for t in types.split(",") if t.strip()))
+            unknown = [t for t in selected if t not in SKILL_LABELS]
+            if unknown or not selected:
+                return JSONResponse(
+                    status_code=400,
+                    content={"status": "error", "message": f"Unknown skill types: {unknown}. Use {list(SKILL_LABELS)}"}
+                )
+        if fields not in ("summary", "full"):
+            return JSONResponse(
+                status_code=400,
+                content={"status": "error", "message": "fields must be 'summary' or 'full'"}
+            )
+        if not 1 <= limit <= CATALOG_MAX_PAGE_SIZE:
+            return JSONResponse(
+                status_code=400,
+                content={"status": "error", "message": f"limit must be between 1 and {CATALOG_MAX_PAGE_SIZE}"}
+            )
+
+        def page_headers(version):
+            page_key = json.dumps([version, sorted(selected), fields, after, limit])
+            etag = 'W/"' + hashlib.sha1(page_key.encode("utf-8")).hexdigest() + '"'
+            return {"ETag": etag, "Cache-Control": "no-cache"}
+
+        version = await current_graph_version()
+        headers = page_headers(version)
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        snapshot = await graph_cache.get()
+        if snapshot.version != version:
+            # The snapshot was (re)loaded or changed since the version check
+            version = snapshot.version
+            headers = page_headers(version)
+        # One extra row tells whether there is a next page
+        with stage("catalog"):
+            skills = await query_skills(snapshot, selected, after, limit + 1, include_definitions=fields == "full")
+        next_cursor = None
+        if len(skills) > limit:
+            skills = skills[:limit]
+            next_cursor = skills[-1]["id"]
+        return JSONResponse(
+            content={"skills": skills, "nextCursor": next_cursor, "version": version},
+            headers=headers
+        )
     except Exception as e:
-        logger.error(f"Error getting all skills: {e}")
+        logger.error(f"Error listing skills: {e}")
         logger.error(traceback.format_exc())
-        return []
+        return JSONResponse(
+            status_code=500,
+            content={"status": "error", "message": f"Failed to list skills: {str(e)}"}
+        )
 
-def get_existing_prerequisites(skills):
-    """Get existing prerequisite relationships between the given skills"""
+@app.post("/graph/refresh")
+async def refresh_graph():
+    """Force a reload of the in-memory graph snapshot"""
     try:
-        # Extract all skill IDs
-        skill_ids = [skill["id"] for skill in skills]
-        
-        driver = neo4j_driver.get_driver()
-        with driver.session() as session:
-            # Find existing REQUIRES relationships between our skills
-            query = """
-            MATCH (s1)-[r:REQUIRES]->(s2)
-            WHERE s1.id IN $skillIds AND s2.id IN $skillIds
-            RETURN s1.id as source, s2.id as target, 
-                   r.score as score, r.predicted as predicted
-            """
-            result = session.run(query, skillIds=skill_ids)
-            prerequisites = []
-            
-            for record in result:
-                prerequisites.append({
-                    "source": record["source"],
-                    "target": record["target"],
-                    "type": "REQUIRES",
-                    "predicted": record["predicted"] if record["predicted"] is not None else False,
-                    "score": record["score"] if record["score"] is not None else 0.5
-                })
-            
-            logger.info(f"Found {len(prerequisites)} existing prerequisite relationships between skills")
-            
-            # If we don't have enough relationships, look for skill to concept relationships
-            if len(prerequisites) < len(skills) / 2:
-                # Find any skill that requires a concept
-                concept_query = """
-                MATCH (s)-[r:REQUIRES]->(c:Concept)
-                WHERE s.id IN $skillIds AND c.id IN $skillIds
-                RETURN s.id as source, c.id as target, 
-                       r.score as score, r.predicted as predicted
-                """
-                
-                concept_result = session.run(concept_query, skillIds=skill_ids)
-                
-                for record in concept_result:
-                    # Add to prerequisites if not already there
-                    new_prereq = {
-                        "source": record["source"],
-                        "target": record["target"],
-                        "type": "REQUIRES",
-                        "predicted": record["predicted"] if record["predicted"] is not None else False,
-                        "score": record["score"] if record["score"] is not None else 0.7
-                    }
-                    
-                    # Check if we already have this relationship
-                    if not any(p["source"] == new_prereq["source"] and 
-                               p["target"] == new_prereq["target"] for p in prerequisites):
-                        prerequisites.append(new_prereq)
-            
-            logger.info(f"Total prerequisites after adding concept relationships: {len(prerequisites)}")
-            return prerequisites
+        snapshot = await graph_cache.refresh()
+        return JSONResponse(content={"status": "ok", "snapshot": snapshot.info()})
     except Exception as e:
-        logger.error(f"Error getting existing prerequisites: {e}")
+        logger.error(f"Error refreshing graph snapshot: {e}")
         logger.error(traceback.format_exc())
-        return []
+        return JSONResponse(
+            status_code=500,
+            content={"status": "error", "message": f"Failed to refresh graph: {str(e)}"}
+        )
+
+@app.post("/graph/edges/delta")
+async def apply_edge_delta(request: EdgeDeltaRequest):
+    """Apply REQUIRES edge inserts, deletes and score changes to the in-memory graph"""
+    invalid = sorted({change.op for change in request.changes} - {"insert", "update", "delete"})
+    if invalid:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": f"Unknown edge change op: {invalid}. Use insert, update or delete."}
+        )
+    try:
+        snapshot, info = await graph_cache.apply_edge_changes(
+            [change.model_dump() for change in request.changes], request.baseVersion
+        )
+        if info is not None:
+            logger.info(
+                "Applied %d edge changes (%s): %d nodes visited, %d changed",
+                info["changedEdges"],
+                "incremental" if info["incremental"] else f"full recompute, {info['reason']}",
+                info["visitedNodes"], info["changedNodes"],
+            )
+        return JSONResponse(content={"status": "ok", "snapshot": snapshot.info(), "delta": info})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+    except Exception as e:
+        logger.error(f"Error applying edge changes: {e}")
+        logger.error(traceback.format_exc())
+        return JSONResponse(
+            status_code=500,
+            content={"status": "error", "message": f"Failed to apply edge changes: {str(e)}"}
+        )
+
+async def _health_stats_tx(tx):
+    """Database statistics from token and count-store lookups, no graph scans"""
+    result = await tx.run("MATCH (n) RETURN count(n) AS nodeCount")
+    node_count = (await result.single())["nodeCount"]
+    result = await tx.run("CALL db.labels() YIELD label RETURN count(label) AS labelCount")
+    label_count = (await result.single())["labelCount"]
+    result = await tx.run("CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType")
+    types = [record["relationshipType"] async for record in result]
+    relationships = {}
+    # Counts per relationship type are answered from the count store
+    for rel_type in types:
+        escaped = rel_type.replace("`", "``")
+        result = await tx.run(f"MATCH ()-[r:`{escaped}`]->() RETURN count(r) AS count")
+        relationships[rel_type] = (await result.single())["count"]
+    result = await tx.run("MATCH (j:Job) RETURN j.id AS id LIMIT 5")
+    jobs = [record["id"] async for record in result]
+    return {
+        "database_stats": {"nodeCount": node_count, "labelCount": label_count},
+        "jobs_found": len(jobs),
+        "sample_jobs": jobs,
+        "relationships": relationships,
+    }
+
+class HealthStatsCache:
+    """Database statistics gathered in one session and reused for HEALTH_STATS_TTL seconds"""
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._stats = None
+        self._fetched_at = 0.0
+        self._flight = SingleFlight("health_stats")
+
+    async def get(self):
+        """Return ``(stats, fetched_at, stale)``; stale stats are served while Neo4j is unreachable"""
+        if self._stats is not None and time.time() - self._fetched_at < self.ttl:
+            return self._stats, self._fetched_at, False
+        try:
+            await self._flight.do("stats", self._fetch)
+        except Exception as e:
+            if self._stats is None:
+                raise
+            logger.warning(f"Refreshing database statistics failed, serving cached ones: {e}")
+            return self._stats, self._fetched_at, True
+        return self._stats, self._fetched_at, False
+
+    async def _fetch(self):
+        driver = await neo4j_driver.get_driver()
+        start = time.perf_counter()
+        async with driver.session() as session:
+            stats = await session.execute_read(_health_stats_tx)
+        metrics.NEO4J_QUERY_SECONDS.observe(time.perf_counter() - start)
+        metrics.NEO4J_ROUND_TRIPS.inc()
+        self._stats, self._fetched_at = stats, time.time()
+
+health_stats = HealthStatsCache(HEALTH_STATS_TTL)
+
+def connection_info():
+    return {
+        "uri": NEO4J_URI,
+        "user": NEO4J_USER,
+        "password_set": bool(NEO4J_PASSWORD)
+    }
+
+async def neo4j_reachable():
+    """True if a trivial query succeeds on the shared driver"""
+    try:
+        records = await run_read("RETURN 1 AS n")
+        return records[0]["n"] == 1
+    except Exception as e:
+        logger.warning(f"Neo4j is not reachable: {e}")
+        return False
+
+@app.get("/health/live")
+async def health_live():
+    """Liveness probe: the process is up and its event loop responds"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness probe: path requests can be answered from Neo4j or the loaded snapshot"""
+    neo4j_ok = await neo4j_reachable()
+    snapshot = graph_cache.peek()
+    ready = neo4j_ok or snapshot is not None
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "neo4j_connection": "ok" if neo4j_ok else "unavailable",
+            "snapshot": {
+                "version": snapshot.version,
+                "source": snapshot.source,
+                "loadedAt": snapshot.loaded_at
+            } if snapshot is not None else None
+        }
+    )
+
+@app.get("/health/stats")
+async def health_stats_endpoint():
+    """Database statistics, refreshed at most every HEALTH_STATS_TTL seconds"""
+    try:
+        stats, fetched_at, stale = await health_stats.get()
+        return JSONResponse(content={
+            "status": "ok",
+            **stats,
+            "fetchedAt": fetched_at,
+            "stale": stale
+        })
+    except Exception as e:
+        logger.error(f"Failed to fetch database statistics: {e}")
+        logger.error(traceback.format_exc())
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error", "message": f"Failed to fetch database statistics: {str(e)}"}
+        )
 
 @app.get("/health")
 async def health_check():
+    """Connection check plus the cached database statistics (see /health/stats)"""
     try:
         # Test Neo4j connection
-        driver = neo4j_driver.get_driver()
-        connection_info = {
-            "uri": NEO4J_URI,
-            "user": NEO4J_USER,
-            "password_set": bool(NEO4J_PASSWORD)
-        }
-        
-        # Basic connection test
-        with driver.session() as session:
-            result = session.run("RETURN 1 as n")
-            record = result.single()
-            assert record["n"] == 1
-        
-        # Get database stats
-        with driver.session() as session:
-            stats_result = session.run("""
-                MATCH (n)
-                RETURN 
-                    count(n) as nodeCount,
-                    count(DISTINCT labels(n)) as labelCount
-            """)
-            stats_record = stats_result.single()
-            db_stats = {
-                "nodeCount": stats_record["nodeCount"],
-                "labelCount": stats_record["labelCount"]
-            }
-        
-        # Check for jobs
-        with driver.session() as session:
-            jobs_result = session.run("MATCH (j:Job) RETURN j.id as id LIMIT 5")
-            jobs = [record["id"] for record in jobs_result]
-        
-        # Check for relationships
-        with driver.session() as session:
-            rel_result = session.run("""
-                MATCH ()-[r]->() 
-                RETURN type(r) as type, count(r) as count
-            """)
-            relationships = {record["type"]: record["count"] for record in rel_result}
-        
-        response = {
+        records = await run_read("RETURN 1 AS n")
+        assert records[0]["n"] == 1
+        stats, _, _ = await health_stats.get()
+        return JSONResponse(content={
             "status": "healthy",
             "neo4j_connection": "ok",
-            "database_stats": db_stats,
-            "jobs_found": len(jobs),
-            "sample_jobs": jobs,
-            "relationships": relationships,
-            "connection_info": connection_info
-        }
-        
-        # Verify the response is JSON serializable
-        try:
-            json.dumps(response)
-        except Exception as e:
-            logger.error(f"Health response is not JSON serializable: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "status": "error",
-                    "message": "Failed to generate JSON response",
-                    "error": str(e)
-                }
-            )
-            
-        return JSONResponse(content=response)
+            **stats,
+            "connection_info": connection_info()
+        })
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         logger.error(traceback.format_exc())
@@ -1012,11 +2352,7 @@ async def health_check():
             content={
                 "status": "unhealthy", 
                 "error": str(e),
-                "connection_info": {
-                    "uri": NEO4J_URI,
-                    "user": NEO4J_USER,
-                    "password_set": bool(NEO4J_PASSWORD)
-                }
+                "connection_info": connection_info()
             }
         )
 
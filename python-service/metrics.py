@@ -0,0 +1,221 @@
+"""Lightweight Prometheus-style metrics for the path service.
+
+Counters, gauges and histograms are kept in process memory and rendered
+in the Prometheus text exposition format by ``render()``. ``stage(name)``
+times one step of a request: it feeds the ``path_stage_seconds``
+histogram and, when the request asked for it, the Server-Timing header.
+With METRICS_ENABLED=false and no Server-Timing collection every call
+returns immediately.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Seconds; spans cache hits (sub-millisecond) up to full graph reloads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# (stage, seconds) pairs of the current request, None when not collected
+_request_timings = ContextVar("request_timings", default=None)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed upper-bound buckets"""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per-bucket counts (last one is +Inf), sum
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ─── Metrics recorded by the service ─────────────────────────────────────
+REQUEST_SECONDS = Histogram(
+    "path_service_request_seconds", "HTTP request latency by route and status code",
+    ("route", "method", "status"))
+STAGE_SECONDS = Histogram(
+    "path_stage_seconds", "Time spent in each stage of path generation and graph loading",
+    ("stage",))
+NEO4J_ROUND_TRIPS = Counter(
+    "neo4j_round_trips_total", "Read queries sent to Neo4j")
+NEO4J_ROWS = Counter(
+    "neo4j_rows_total", "Records received from Neo4j")
+NEO4J_QUERY_SECONDS = Histogram(
+    "neo4j_query_seconds", "Neo4j read transaction latency")
+GRAPH_NODES = Gauge(
+    "graph_snapshot_nodes", "Nodes in the current graph snapshot")
+GRAPH_EDGES = Gauge(
+    "graph_snapshot_edges", "REQUIRES edges in the current graph snapshot")
+GRAPH_DROPPED_EDGES = Gauge(
+    "graph_snapshot_dropped_cycle_edges", "Edges dropped to break cycles in the current snapshot")
+GRAPH_RELOADS = Counter(
+    "graph_snapshot_reloads_total", "Graph snapshot loads by reason", ("reason",))
+SUBGRAPH_SIZE = Histogram(
+    "job_subgraph_edges", "Edges fetched for cold-start job subgraphs", buckets=SIZE_BUCKETS)
+CACHE_LOOKUPS = Counter(
+    "response_cache_lookups_total", "Response cache lookups by result", ("result",))
+CACHE_EVICTIONS = Counter(
+    "response_cache_evictions_total", "Response cache entries evicted to stay within the byte budget")
+CACHE_BYTES = Gauge(
+    "response_cache_bytes", "Bytes held by the response cache")
+COALESCED_CALLS = Counter(
+    "coalesced_calls_total", "Calls that joined an identical in-flight computation", ("kind",))
+
+
+@contextmanager
+def _timed_stage(name, timings):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+_NOOP = nullcontext()
+
+
+def stage(name):
+    """Context manager timing one stage of the current request"""
+    timings = _request_timings.get()
+    if not METRICS_ENABLED and timings is None:
+        return _NOOP
+    return _timed_stage(name, timings)
+
+
+def start_request_timings():
+    """Start collecting Server-Timing entries for the current request"""
+    if not SERVER_TIMING_ENABLED:
+        return None
+    return _request_timings.set([])
+
+
+def finish_request_timings(token):
+    """Stop collecting and return the Server-Timing header value ("" if none)"""
+    if token is None:
+        return ""
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings)
@@ -0,0 +1,189 @@
+"""In-memory name index for skill and job autocomplete.
+
+Names are normalized (case-folded, accents stripped, punctuation other
+than "+" and "#" turned into spaces, so C++ and C# stay apart) and
+indexed twice:
+
+- every word start of a name ("machine learning", "learning") goes into a
+  sorted key list, so a prefix lookup is a binary search for the start of
+  the matching range: a flattened prefix trie,
+- every character trigram goes into CSR posting lists (sorted trigram
+  codes, offsets, entry numbers), so misspelled queries are matched by
+  trigram overlap.
+
+Prefix matches always rank above fuzzy ones. The index is immutable; a
+new graph version builds a new one.
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+# Prefix-range keys looked at per query; a key sorts before its extensions
+PREFIX_SCAN = 2000
+# Minimum Dice similarity of trigram sets for a fuzzy match
+FUZZY_MIN_SIMILARITY = 0.3
+# Fuzzy candidates scored per query, by shared trigram count
+FUZZY_CANDIDATES = 200
+
+
+_SEPARATORS = re.compile(r"[^\w+#]+|_+")
+
+
+def normalize(text):
+    """Lower-case, accent-free, single-spaced form of a name"""
+    text = (text or "").casefold()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _SEPARATORS.sub(" ", text).strip()
+
+
+def _trigram_codes(texts):
+    """(text number, trigram code) of every trigram of ``texts``.
+
+    Texts are padded so that short words get some trigrams; a code packs
+    the three code points of a trigram into one int64.
+    """
+    padded = [f"  {text} " for text in texts]
+    chars = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    codes = (chars[:-2] << 42) | (chars[1:-1] << 21) | chars[2:]
+    # Drop the trigrams that straddle two texts
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    valid = np.ones(len(codes), dtype=bool)
+    valid[np.concatenate((starts[1:] - 2, starts[1:] - 1))] = False
+    owners = np.repeat(np.arange(len(padded), dtype=np.int64), lengths)[:len(codes)]
+    return owners[valid], codes[valid]
+
+
+class NameIndex:
+    """Prefix and trigram lookups over ``(node_id, name, type, labels)`` entries.
+
+    ``type`` is the one reported with a match; the ``types`` filter of a
+    search matches any of an entry's ``labels``.
+    """
+
+    def __init__(self, entries):
+        self.ids, self.names, self.types = [], [], []
+        label_entries = {}  # label -> entry numbers
+        keys, texts = [], []
+        for node_id, name, node_type, labels in entries:
+            text = normalize(name)
+            if not text:
+                continue
+            entry = len(self.ids)
+            self.ids.append(node_id)
+            self.names.append(name)
+            self.types.append(node_type)
+            for label in labels:
+                label_entries.setdefault(label, []).append(entry)
+            texts.append(text)
+            words = text.split(" ")
+            start = 0
+            for k, word in enumerate(words):
+                # k = 0 is the whole name; it sorts first among equal keys
+                keys.append((text[start:], k, entry))
+                start += len(word) + 1
+
+        keys.sort()
+        self._keys = [key for key, _, _ in keys]
+        self._key_lengths = np.fromiter(map(len, self._keys), dtype=np.int32, count=len(keys))
+        self._key_words = np.fromiter((k for _, k, _ in keys), dtype=np.int32, count=len(keys))
+        self._key_entries = np.fromiter((e for _, _, e in keys), dtype=np.int32, count=len(keys))
+
+        owners, codes = _trigram_codes(texts)
+        self._codes, slots = np.unique(codes, return_inverse=True)
+        # One posting per distinct (trigram, entry), grouped by trigram
+        pairs = np.sort(slots.astype(np.int64) * len(texts) + owners)
+        pairs = np.concatenate((pairs[:1], pairs[1:][pairs[1:] != pairs[:-1]]))
+        self._postings = (pairs % max(len(texts), 1)).astype(np.int32)
+        self._offsets = np.searchsorted(pairs, np.arange(len(self._codes) + 1, dtype=np.int64) * len(texts))
+        self._trigram_counts = np.bincount(self._postings, minlength=len(texts)).astype(np.int32)
+        self._labels = {}   # label -> boolean mask of the entries carrying it
+        for label, members in label_entries.items():
+            mask = np.zeros(len(texts), dtype=bool)
+            mask[members] = True
+            self._labels[label] = mask
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _allowed(self, types):
+        """Boolean mask of the entries with a label in ``types`` (None = all)"""
+        if types is None:
+            return None
+        allowed = np.zeros(len(self.ids), dtype=bool)
+        for label in types:
+            if label in self._labels:
+                allowed |= self._labels[label]
+        return allowed
+
+    def search(self, query, limit=10, types=None):
+        """Top ``limit`` matches for ``query``, best first.
+
+        Each match is ``{"id", "name", "type", "score", "match"}`` where
+        ``match`` is "exact", "prefix" (the name starts with the query),
+        "word" (a later word does) or "fuzzy".
+        """
+        text = normalize(query)
+        if not text or limit <= 0:
+            return []
+        allowed = self._allowed(types)
+        best = {}   # entry -> (score, kind)
+
+        lo = bisect_left(self._keys, text)
+        hi = min(bisect_left(self._keys, text + "\U0010ffff", lo), lo + PREFIX_SCAN)
+        entries = self._key_entries[lo:hi]
+        whole = self._key_words[lo:hi] == 0
+        lengths = self._key_lengths[lo:hi]
+        if allowed is not None:
+            keep = allowed[entries]
+            entries, whole, lengths = entries[keep], whole[keep], lengths[keep]
+        # Every key in the range starts with the query, so equal length means equal
+        exact = whole & (lengths == len(text))
+        scores = np.where(exact, 1.0, np.where(whole, 0.8, 0.6) + 0.1 * len(text) / lengths)
+        kinds = np.where(exact, 0, np.where(whole, 1, 2))
+        # Keep the best key of every entry
+        order = np.argsort(-scores, kind="stable")
+        _, first = np.unique(entries[order], return_index=True)
+        for pos in order[first].tolist():
+            best[int(entries[pos])] = (float(scores[pos]), ("exact", "prefix", "word")[kinds[pos]])
+
+        if len(best) < limit:
+            for entry, similarity in self._fuzzy(text, allowed):
+                if entry not in best:
+                    # Fuzzy scores stay below every prefix match
+                    best[entry] = (0.6 * similarity, "fuzzy")
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], len(self.names[item[0]]), self.names[item[0]]))
+        return [
+            {
+                "id": self.ids[entry],
+                "name": self.names[entry],
+                "type": self.types[entry],
+                "score": round(score, 4),
+                "match": kind,
+            }
+            for entry, (score, kind) in ranked[:limit]
+        ]
+
+    def _fuzzy(self, text, allowed):
+        """``(entry, Dice similarity)`` of the entries sharing enough trigrams with ``text``"""
+        if len(self._codes) == 0:
+            return []
+        query = np.unique(_trigram_codes([text])[1])
+        slots = np.searchsorted(self._codes, query)
+        slots = slots[(slots < len(self._codes)) & (self._codes[np.minimum(slots, len(self._codes) - 1)] == query)]
+        if len(slots) == 0:
+            return []
+        hits = np.concatenate([self._postings[self._offsets[s]:self._offsets[s + 1]] for s in slots])
+        entries, shared = np.unique(hits, return_counts=True)
+        if allowed is not None:
+            keep = allowed[entries]
+            entries, shared = entries[keep], shared[keep]
+        top = np.argsort(-shared, kind="stable")[:FUZZY_CANDIDATES]
+        entries, shared = entries[top], shared[top]
+        similarity = 2.0 * shared / (len(query) + self._trigram_counts[entries])
+        keep = similarity >= FUZZY_MIN_SIMILARITY
+        return zip(entries[keep].tolist(), similarity[keep].tolist())
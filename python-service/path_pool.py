@@ -0,0 +1,199 @@
+"""Process pool for CPU-bound path computations.
+
+Every published graph snapshot is pickled once to PATH_SNAPSHOT_DIR. Each
+worker process loads it on start and again whenever a task names a newer
+version, so requests only ship their own arguments. The pool bounds the
+number of queued and running computations (PoolSaturated when full) and
+gives each one a deadline (DeadlineExceeded when it expires). A worker
+still busy with an expired computation is terminated, and new work goes to
+a fresh set of workers meanwhile.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+import time
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturated(Exception):
+    """Too many computations are already queued or running"""
+
+
+class DeadlineExceeded(Exception):
+    """The computation did not finish before its deadline"""
+
+
+# ─── Worker process side ─────────────────────────────────────────────────
+_worker_snapshot = None
+
+
+def _load_snapshot(path):
+    global _worker_snapshot
+    with open(path, "rb") as f:
+        _worker_snapshot = pickle.load(f)
+    logger.info(f"Worker {os.getpid()} loaded graph snapshot {_worker_snapshot.version}")
+
+
+def _init_worker(path):
+    if path:
+        _load_snapshot(path)
+
+
+def _run_task(path, version, deadline, fn, args, kwargs):
+    # Queued tasks whose caller already gave up are dropped without running
+    if time.time() > deadline:
+        raise DeadlineExceeded()
+    if _worker_snapshot is None or _worker_snapshot.version != version:
+        _load_snapshot(path)
+    return fn(*args, snapshot=_worker_snapshot, **kwargs)
+
+
+# ─── API process side ────────────────────────────────────────────────────
+class PathWorkerPool:
+    """Runs ``fn(*args, snapshot=..., **kwargs)`` in worker processes"""
+
+    def __init__(self, workers, max_pending, timeout, snapshot_dir=None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.snapshot_dir = Path(snapshot_dir or Path(tempfile.gettempdir()) / "career-path-snapshots")
+        self._executor = None
+        self._pending = 0
+        self._version = None
+        self._path = None
+        self._publishing = None
+        self._generation = 0            # bumped by every publish()
+        self._write_lock = threading.Lock()
+        self._futures = set()           # computations submitted to the current executor
+        self._retired = []              # workers of recycled executors, not yet terminated
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def start(self):
+        if not self.enabled or self._executor is not None:
+            return
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            # Workers import the service module, don't fork the event loop
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(str(self._path) if self._path else None,),
+        )
+        logger.info(f"Started {self.workers} path workers (max {self.max_pending} pending computations)")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for processes in self._retired:
+            _terminate(processes)
+        self._retired.clear()
+
+    def publish(self, snapshot):
+        """Make ``snapshot`` available to the workers (graph_cache listener)"""
+        if not self.enabled:
+            return
+        self._generation += 1
+        self._publishing = asyncio.get_running_loop().run_in_executor(
+            None, self._write, snapshot, self._generation
+        )
+
+    def _write(self, snapshot, generation):
+        # One write at a time; a snapshot superseded by a later publish()
+        # before or while it is written is dropped
+        with self._write_lock:
+            if generation != self._generation:
+                return
+            path = self.snapshot_dir / f"snapshot-{os.getpid()}-{time.time_ns()}.pickle"
+            tmp = path.with_suffix(".tmp")
+            try:
+                with open(tmp, "wb") as f:
+                    pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+                if generation != self._generation:
+                    return
+                os.replace(tmp, path)
+            finally:
+                tmp.unlink(missing_ok=True)
+            previous = self._path
+            self._path, self._version = path, snapshot.version
+            # Keep the previous file for workers that are still loading it
+            for old in self.snapshot_dir.glob(f"snapshot-{os.getpid()}-*.pickle"):
+                if old not in (path, previous):
+                    old.unlink(missing_ok=True)
+        logger.info(f"Published graph snapshot {snapshot.version} for path workers ({path.stat().st_size} bytes)")
+
+    async def serves(self, snapshot):
+        """True if ``snapshot`` is the one the workers compute on"""
+        if not self.enabled:
+            return False
+        publishing = self._publishing
+        if publishing is not None:
+            try:
+                await publishing
+            except Exception as e:
+                # Requests compute inline until a later publish() succeeds
+                logger.error(f"Failed to publish graph snapshot for path workers: {e}")
+                if self._publishing is publishing:
+                    self._publishing = None
+                return False
+        return self._version == snapshot.version
+
+    async def run(self, fn, *args, **kwargs):
+        """Run ``fn`` on the published snapshot in a worker, within the deadline"""
+        if self._pending >= self.max_pending:
+            raise PoolSaturated()
+        self.start()
+        self._pending += 1
+        deadline = time.time() + self.timeout
+        future = self._executor.submit(
+            _run_task, str(self._path), self._version, deadline, fn, args, kwargs
+        )
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            # Queued work is cancelled; a running computation would keep its
+            # worker busy, so that worker is recycled
+            if not future.cancel() and not future.done():
+                self._recycle(future)
+            raise DeadlineExceeded()
+        finally:
+            self._pending -= 1
+
+    def _recycle(self, stuck):
+        """Move new work to fresh workers and terminate the one running ``stuck``"""
+        executor, others = self._executor, [f for f in self._futures if f is not stuck]
+        # ProcessPoolExecutor can't stop a single task, and doesn't say which
+        # worker runs it: the old workers finish the other requests' work and
+        # are terminated together after that
+        processes = list(executor._processes.values())
+        self._executor, self._futures = None, set()
+        executor.shutdown(wait=False)
+        self._retired.append(processes)
+        logger.warning(f"Recycling path workers after a computation exceeded {self.timeout}s")
+
+        def terminate_when_done():
+            concurrent.futures.wait(others)
+            _terminate(processes)
+            if processes in self._retired:
+                self._retired.remove(processes)
+
+        threading.Thread(target=terminate_when_done, daemon=True).start()
+
+
+def _terminate(processes):
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
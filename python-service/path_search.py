@@ -0,0 +1,357 @@
+"""Targeted path searches over the CSR skill graph.
+
+Unlike the global DP in graph_engine, these searches only touch the part
+of the graph between a set of start nodes and a set of targets, so their
+cost depends on the size of that gap rather than on the whole graph.
+"""
+import heapq
+import logging
+
+import numpy as np
+
+from graph_engine import ALPHA, BETA, DEFAULT_SEM_PEN, MAX_PATH_LENGTH, PRED, edge_gains
+
+logger = logging.getLogger(__name__)
+
+# Weight of the DP quality terms in the A* edge cost (0 = fewest hops)
+ASTAR_QUALITY_WEIGHT = 0.5
+# Search states (node, path length) A* may expand before giving up
+ASTAR_MAX_EXPANSIONS = 20000
+# Edge relaxations the k-best DP may perform per request
+KBEST_MAX_EXPANSIONS = 200000
+
+
+def _hops_to_targets(graph, targets, max_hops):
+    """Backward BFS: minimum number of hops from every node to a target"""
+    in_offsets, in_edge_ids = graph.in_csr()
+    sources = graph.sources
+    hops = {t: 0 for t in targets}
+    frontier = list(hops)
+    for depth in range(1, max_hops + 1):
+        next_frontier = []
+        for v in frontier:
+            for e in in_edge_ids[in_offsets[v]:in_offsets[v + 1]].tolist():
+                u = int(sources[e])
+                if u not in hops:
+                    hops[u] = depth
+                    next_frontier.append(u)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+    return hops
+
+
+def personalized_paths(graph, known_ids, target_ids, max_length=MAX_PATH_LENGTH, sem_pen=None):
+    """Best paths from the user's known skills to each target skill.
+
+    The known skills are treated as already reached sources (dp = 0) and
+    the DP only runs over nodes that lie on a path of at most
+    ``max_length`` nodes from a known skill to a target. Returns
+    ``{target_id: [known_id, ..., target_id]}`` for every reachable target.
+    """
+    index = graph.index
+    known = [index[n] for n in dict.fromkeys(known_ids) if n in index]
+    targets = [index[n] for n in dict.fromkeys(target_ids) if n in index]
+    if not known or not targets:
+        return {}
+
+    known_set = set(known)
+    max_hops = max_length - 1
+    hops_back = _hops_to_targets(graph, [t for t in targets if t not in known_set], max_hops)
+
+    # Forward BFS from the known skills, pruned to nodes that can still
+    # reach a target within the remaining path length
+    offsets, dst = graph.offsets, graph.targets
+    hops_fwd = {k: 0 for k in known if k in hops_back}
+    frontier = list(hops_fwd)
+    region_edges = []
+    for depth in range(1, max_hops + 1):
+        next_frontier = []
+        for u in frontier:
+            for e in range(offsets[u], offsets[u + 1]):
+                v = int(dst[e])
+                if v in known_set:
+                    continue
+                back = hops_back.get(v)
+                if back is None or depth + back > max_hops:
+                    continue
+                region_edges.append(e)
+                if v not in hops_fwd:
+                    hops_fwd[v] = depth
+                    next_frontier.append(v)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+
+    if not region_edges:
+        return {}
+
+    # Topological order of the region (the graph is a DAG)
+    region_edges = np.unique(np.asarray(region_edges, dtype=np.int64))
+    src = graph.sources[region_edges]
+    tgt = dst[region_edges]
+    indeg = {}
+    out = {}
+    for e, u, v in zip(region_edges.tolist(), src.tolist(), tgt.tolist()):
+        indeg[v] = indeg.get(v, 0) + 1
+        out.setdefault(u, []).append(e)
+    order = [n for n in hops_fwd if n not in indeg]
+    for u in order:
+        for e in out.get(u, ()):
+            v = int(dst[e])
+            indeg[v] -= 1
+            if indeg[v] == 0:
+                order.append(v)
+
+    # DP over the region, seeded from the known skills
+    dp = {k: 0.0 for k in hops_fwd if k in known_set}
+    path_lens = {k: 1 for k in dp}
+    prev = {}
+    for u in order:
+        if u not in dp or not out.get(u):
+            continue
+        edge_ids = np.asarray(out[u], dtype=np.int64)
+        if path_lens[u] + 1 > max_length:
+            continue
+        gains = edge_gains(graph, edge_ids, path_lens[u], sem_pen)
+        for e, gain in zip(edge_ids.tolist(), gains.tolist()):
+            v = int(dst[e])
+            cand = dp[u] + gain
+            if cand > dp.get(v, -np.inf):
+                dp[v] = cand
+                prev[v] = u
+                path_lens[v] = path_lens[u] + 1
+
+    paths = {}
+    for t in targets:
+        if t not in prev:
+            continue
+        path = [t]
+        while path[-1] in prev:
+            path.append(prev[path[-1]])
+        paths[graph.ids[t]] = [graph.ids[n] for n in reversed(path)]
+
+    logger.info(
+        f"Personalized DP over {len(hops_fwd)} nodes and {len(region_edges)} edges "
+        f"reached {len(paths)} of {len(targets)} targets"
+    )
+    return paths
+
+
+def astar_edge_costs(graph, edge_ids, sem_pen=None):
+    """A* cost of the given edges: one hop plus the weighted DP quality terms.
+
+    The quality part reuses the DP's penalties (normalized score, predicted
+    edge, semantic distance), clipped at zero, so every edge costs at least 1.
+    """
+    Smax = graph.score_max
+    s_norm = graph.scores[edge_ids] / Smax if Smax else np.full(len(edge_ids), 0.5)
+    pen = DEFAULT_SEM_PEN if sem_pen is None else sem_pen[edge_ids]
+    quality = ALPHA * s_norm + PRED * graph.predicted[edge_ids] + BETA * pen
+    return 1.0 + ASTAR_QUALITY_WEIGHT * np.maximum(quality, 0.0)
+
+
+def astar_path(graph, start_id, target_id, max_length=MAX_PATH_LENGTH,
+               max_expansions=ASTAR_MAX_EXPANSIONS, sem_pen=None,
+               embeddings=None, node_rows=None):
+    """Cheapest path from a known skill to a target skill with A*.
+
+    Walks prerequisite -> dependent edges from ``start_id``. The heuristic
+    is ``(1 - cos(n, target)) / 2`` over the node embeddings (0 without
+    them). It never exceeds 1 while every edge costs at least 1, so it is
+    admissible and consistent. ``node_rows`` maps node indices to embedding
+    rows (-1 if missing).
+
+    The search state is (node, path length) so the ``max_length`` cap
+    doesn't hide paths: a node first reached by a cheap but long route is
+    still expanded again when a shorter one reaches it. A state is only
+    pruned when the same node was already expanded with no more hops and
+    no more cost. Stops after ``max_expansions`` expanded states.
+
+    Returns ``(path, info)``. ``path`` is the list of node ids, or None if
+    no path was found. ``info`` holds the cost, the number of expanded
+    nodes and whether the budget ran out.
+    """
+    index = graph.index
+    info = {"cost": None, "expanded": 0, "budgetExhausted": False}
+    start, target = index.get(start_id), index.get(target_id)
+    if start is None or target is None:
+        return None, info
+    if start == target:
+        info["cost"] = 0.0
+        return [start_id], info
+
+    target_vec = None
+    if embeddings is not None and node_rows is not None and node_rows[target] >= 0:
+        target_vec = np.asarray(embeddings.matrix[node_rows[target]], dtype=np.float64)
+
+    def heuristic(nodes):
+        if target_vec is None:
+            return np.zeros(len(nodes))
+        rows = node_rows[nodes]
+        h = np.zeros(len(nodes))
+        known = rows >= 0
+        if known.any():
+            cos = embeddings.matrix[rows[known]] @ target_vec
+            h[known] = np.clip((1.0 - cos) / 2.0, 0.0, 1.0)
+        return h
+
+    offsets, dst = graph.offsets, graph.targets
+    # (node, hops) -> best cost / previous state; hops counts the path's nodes
+    g = {(start, 1): 0.0}
+    prev = {}
+    # node -> (hops, cost) of its expanded states
+    expanded = {}
+
+    def dominated(v, k, cost):
+        return any(k_done <= k and g_done <= cost for k_done, g_done in expanded.get(v, ()))
+
+    heap = [(float(heuristic(np.array([start]))[0]), 0.0, start, 1)]
+    while heap:
+        _, g_u, u, k = heapq.heappop(heap)
+        if g_u > g[(u, k)] or dominated(u, k, g_u):
+            continue
+        if u == target:
+            state, path = (u, k), [u]
+            while state in prev:
+                state = prev[state]
+                path.append(state[0])
+            info["cost"] = g_u
+            return [graph.ids[n] for n in reversed(path)], info
+        if info["expanded"] >= max_expansions:
+            info["budgetExhausted"] = True
+            break
+        expanded.setdefault(u, []).append((k, g_u))
+        info["expanded"] += 1
+        if k >= max_length:
+            continue
+
+        edge_ids = np.arange(offsets[u], offsets[u + 1])
+        if len(edge_ids) == 0:
+            continue
+        neighbors = dst[edge_ids]
+        candidates = g_u + astar_edge_costs(graph, edge_ids, sem_pen)
+        h = heuristic(neighbors)
+        for v, cand, h_v in zip(neighbors.tolist(), candidates.tolist(), h.tolist()):
+            if cand >= g.get((v, k + 1), np.inf) or dominated(v, k + 1, cand):
+                continue
+            g[(v, k + 1)] = cand
+            prev[(v, k + 1)] = (u, k)
+            heapq.heappush(heap, (cand + h_v, cand, v, k + 1))
+
+    return None, info
+
+
+def k_best_paths(tables, target_ids, k, exclude_predicted=False, exclude_ids=(),
+                 max_length=MAX_PATH_LENGTH, max_expansions=KBEST_MAX_EXPANSIONS):
+    """Up to ``k`` ranked alternative paths to each target skill.
+
+    Runs a k-best variant of the DP over the snapshot DAG in ``tables``:
+    every node keeps its ``k`` best (score, predecessor entry) pairs per
+    path length instead of a single prev pointer. Only the ancestors of the targets within
+    ``max_length`` nodes are visited, and all targets share that single
+    pass, so paths through common prerequisites are computed once. Edges
+    flagged as predicted and nodes in ``exclude_ids`` can be left out.
+    Relaxation stops after ``max_expansions`` edges.
+
+    Returns ``(paths, info)``. ``paths`` maps each target id to a list of
+    ``{"path": [...], "score": float}``, best first. ``info`` holds the
+    number of relaxed edges and whether the cap was hit.
+    """
+    graph = tables.graph
+    index = graph.index
+    excluded = {index[n] for n in exclude_ids if n in index}
+    targets = [index[n] for n in dict.fromkeys(target_ids) if n in index and index[n] not in excluded]
+    info = {"expansions": 0, "truncated": False}
+    if k <= 0 or not targets:
+        return {}, info
+
+    # Ancestor cone of the targets, with the hops left to the nearest one
+    hops = _hops_to_targets(graph, targets, max_length - 1)
+    for n in excluded:
+        hops.pop(n, None)
+
+    # Local topological order and the usable in-cone edges of every node
+    offsets, dst = graph.offsets, graph.targets
+    out = {}
+    indeg = dict.fromkeys(hops, 0)
+    for u in hops:
+        edge_ids = np.arange(offsets[u], offsets[u + 1])
+        if exclude_predicted:
+            edge_ids = edge_ids[~graph.predicted[edge_ids]]
+        keep = [e for e, v in zip(edge_ids.tolist(), dst[edge_ids].tolist()) if v in hops]
+        if keep:
+            out[u] = np.asarray(keep, dtype=np.int64)
+            for v in dst[out[u]].tolist():
+                indeg[v] += 1
+    order = [n for n, d in indeg.items() if d == 0]
+    for u in order:
+        if u not in out:
+            continue
+        for v in dst[out[u]].tolist():
+            indeg[v] -= 1
+            if indeg[v] == 0:
+                order.append(v)
+
+    # The gain of an edge depends on the length of the path so far, so the
+    # k best paths are kept per (node, path length):
+    # entries[n][length] = [(score, prev_node, prev_length, prev_rank)], best first
+    entries = {int(n): {1: [(0.0, -1, 0, -1)]} for n in tables.source_nodes.tolist() if n in hops}
+    for u in order:
+        if info["truncated"]:
+            break
+        u_entries = entries.get(u)
+        edge_ids = out.get(u)
+        if not u_entries or edge_ids is None:
+            continue
+        targets_of_u = dst[edge_ids].tolist()
+        for length in sorted(u_entries):
+            # The path must still be able to reach a target within max_length
+            if length + max(hops[u], 1) > max_length:
+                continue
+            gains = edge_gains(graph, edge_ids, length, tables.sem_pen).tolist()
+            for rank, (score, _, _, _) in enumerate(u_entries[length]):
+                for v, gain in zip(targets_of_u, gains):
+                    cand = (score + gain, u, length, rank)
+                    v_entries = entries.setdefault(v, {}).setdefault(length + 1, [])
+                    if len(v_entries) < k:
+                        v_entries.append(cand)
+                    elif cand[0] > v_entries[-1][0]:
+                        v_entries[-1] = cand
+                    else:
+                        continue
+                    # Stable insertion keeps earlier entries ahead on ties
+                    i = len(v_entries) - 1
+                    while i > 0 and v_entries[i - 1][0] < v_entries[i][0]:
+                        v_entries[i - 1], v_entries[i] = v_entries[i], v_entries[i - 1]
+                        i -= 1
+                info["expansions"] += len(targets_of_u)
+            if info["expansions"] >= max_expansions:
+                info["truncated"] = True
+                break
+
+    paths = {}
+    ids = graph.ids
+    for t in targets:
+        candidates = [
+            (score, length, rank, prev_node, prev_length, prev_rank)
+            for length, ranked in entries.get(t, {}).items() if length > 1
+            for rank, (score, prev_node, prev_length, prev_rank) in enumerate(ranked)
+        ]
+        # Best score first; shorter paths first on ties
+        candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+        ranked = []
+        for score, _, _, node, length, rank in candidates[:k]:
+            path = [t]
+            while node >= 0:
+                path.append(node)
+                _, node, length, rank = entries[node][length][rank]
+            ranked.append({"path": [ids[n] for n in reversed(path)], "score": score})
+        if ranked:
+            paths[ids[t]] = ranked
+
+    logger.info(
+        "k-best DP (k=%d) over %d nodes relaxed %d edges for %d targets%s",
+        k, len(hops), info["expansions"], len(targets), " (truncated)" if info["truncated"] else "",
+    )
+    return paths, info
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from benchmarks.run import normalized_edges
+from benchmarks.synthetic_graph import generate_graph
+from embeddings import EmbeddingStore
+from graph_engine import CSRGraph
+from path_search import astar_edge_costs, astar_path
+
+
+def cheapest_within(graph, start, max_length):
+    """node -> cheapest cost of a path from ``start`` with at most ``max_length`` nodes"""
+    costs = astar_edge_costs(graph, np.arange(graph.num_edges), None)
+    layer = {start: 0.0}
+    best = dict(layer)
+    for _ in range(max_length - 1):
+        following = {}
+        for u, g_u in layer.items():
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                v, cand = int(graph.targets[e]), g_u + costs[e]
+                if cand < following.get(v, np.inf):
+                    following[v] = cand
+        layer = following
+        for v, cost in layer.items():
+            best[v] = min(cost, best.get(v, np.inf))
+    return best
+
+
+@pytest.mark.parametrize("with_embeddings", [False, True])
+def test_astar_is_optimal_under_the_hop_limit(with_embeddings):
+    data = generate_graph(1500, seed=3)
+    graph = CSRGraph.from_graph_data(data.nodes, data.label_of, normalized_edges(data.edges))
+    embeddings = node_rows = None
+    if with_embeddings:
+        rng = np.random.default_rng(0)
+        matrix = rng.normal(size=(graph.num_nodes, 8)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        embeddings = EmbeddingStore(matrix, list(graph.ids))
+        node_rows = embeddings.rows_for(graph.ids)
+
+    rng = np.random.default_rng(1)
+    starts = np.flatnonzero(np.diff(graph.offsets) > 0)
+    found = 0
+    for _ in range(150):
+        start = int(rng.choice(starts))
+        max_length = int(rng.integers(2, 6))
+        reachable = cheapest_within(graph, start, max_length)
+        # Mostly targets within reach, some that may only be reachable past the cap
+        if rng.random() < 0.8:
+            target = int(rng.choice(list(reachable)))
+        else:
+            target = int(rng.integers(graph.num_nodes))
+        path, info = astar_path(graph, graph.ids[start], graph.ids[target], max_length=max_length,
+                                embeddings=embeddings, node_rows=node_rows)
+        expected = reachable.get(target)
+        if expected is None:
+            assert path is None
+            continue
+        found += 1
+        assert path is not None and len(path) <= max_length
+        assert info["cost"] == pytest.approx(expected)
+    assert found > 100
+
+
+def test_astar_revisits_a_node_reached_by_a_shorter_route():
+    # S-X-A is short but expensive, S-B-C-A cheaper but one hop longer;
+    # only the short one leaves room for A-T under max_length=4
+    labels = {"S": "Concept", "X": "HardSkill", "B": "HardSkill", "C": "HardSkill", "A": "HardSkill", "T": "HardSkill"}
+    nodes = {n: {"id": n, "name": n, "labels": {label}} for n, label in labels.items()}
+    label_of = {n: {label} for n, label in labels.items()}
+    edges = [
+        {"source": dependent, "target": prerequisite, "score": score, "predicted": predicted}
+        for prerequisite, dependent, score, predicted in [
+            ("S", "X", 1.0, True), ("X", "A", 1.0, True),
+            ("S", "B", 0.01, False), ("B", "C", 0.01, False), ("C", "A", 0.01, False),
+            ("A", "T", 0.01, False),
+        ]
+    ]
+    graph = CSRGraph.from_graph_data(nodes, label_of, edges)
+    path, _ = astar_path(graph, "S", "T", max_length=4)
+    assert path == ["S", "X", "A", "T"]
+    path, _ = astar_path(graph, "S", "T", max_length=5)
+    assert path == ["S", "B", "C", "A", "T"]
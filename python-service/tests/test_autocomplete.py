@@ -0,0 +1,73 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.stub_driver import install
+from benchmarks.synthetic_graph import generate_graph
+
+NAMES = {
+    "exact": ("Machine Learning", {"Concept"}),
+    # Typed HardSkill, but a Technology filter must still find it
+    "prefix": ("Machine Learning Engineering", {"HardSkill", "Technology"}),
+    "word": ("Applied Machine Learning", {"Technology"}),
+}
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    data = generate_graph(300, seed=0)
+    skill_ids = [node_id for node_id, labels in data.label_of.items() if "Job" not in labels]
+    ids = dict(zip(NAMES, skill_ids))
+    for kind, (name, labels) in NAMES.items():
+        data.nodes[ids[kind]]["name"] = name
+        data.label_of[ids[kind]] = data.nodes[ids[kind]]["labels"] = set(labels)
+    install(main, data)
+    monkeypatch.setattr(main.graph_cache, "_snapshot", None)
+    monkeypatch.setattr(main.graph_cache, "_last_check", 0.0)
+    for attr in ("index", "version", "_nodes", "_building"):
+        monkeypatch.setattr(main.name_index, attr, None)
+    return data, ids
+
+
+def search(client, q, **params):
+    response = client.get("/autocomplete", params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()["results"]
+
+
+def test_exact_prefix_and_word_matches_rank_in_order(graph):
+    _, ids = graph
+    with TestClient(main.app) as client:
+        results = search(client, "machine learning")
+    assert [(r["id"], r["match"]) for r in results] == [
+        (ids["exact"], "exact"), (ids["prefix"], "prefix"), (ids["word"], "word")
+    ]
+    assert results[0]["score"] > results[1]["score"] > results[2]["score"]
+    assert results[1]["type"] == "HardSkill"
+
+
+def test_misspelled_query_finds_fuzzy_matches(graph):
+    _, ids = graph
+    with TestClient(main.app) as client:
+        results = search(client, "Machin Lerning")
+    assert results[0]["id"] == ids["exact"]
+    assert set(ids.values()) <= {r["id"] for r in results}
+    assert {r["match"] for r in results} == {"fuzzy"}
+    # Fuzzy scores stay below the lowest word match score
+    assert all(r["score"] < 0.6 for r in results)
+
+
+@pytest.mark.parametrize("types", ["Technology", "Concept", "HardSkill,Concept", "Job"])
+def test_type_filter_matches_any_label_like_the_catalog(graph, types):
+    data, ids = graph
+    selected = set(types.split(","))
+    with TestClient(main.app) as client:
+        results = search(client, "machine learning", types=types, limit=50)
+    expected = {kind for kind, node_id in ids.items() if data.label_of[node_id] & selected}
+    assert {r["id"] for r in results} == {ids[kind] for kind in expected}
+
+
+def test_unknown_type_is_rejected(graph):
+    with TestClient(main.app) as client:
+        response = client.get("/autocomplete", params={"q": "machine", "types": "Skill"})
+    assert response.status_code == 400
@@ -0,0 +1,52 @@
+import asyncio
+
+import main
+
+# T can be reached from A directly or through M; the best route depends on
+# the score used for normalization. X-Y carries the graph's largest score
+# but is not an ancestor of the job's skill. S is only mentioned by the job,
+# so no REQUIRES edge carries its labels.
+LABELS = {
+    "A": ["Concept"], "M": ["HardSkill"], "T": ["HardSkill"], "X": ["HardSkill"], "Y": ["Concept"],
+    "S": ["Concept", "Technology"], "J": ["Job"],
+}
+EDGES = [
+    ("T", "A", 0.1), ("T", "M", 0.1), ("M", "A", 1.0), ("X", "Y", 10.0), ("J", "T", None),
+]
+
+
+async def fake_run_read(query, **params):
+    """Answers the graph queries of get_all_graph_data, get_job_subgraph and get_score_max"""
+    if "scoreMax" in query:
+        return [{"scoreMax": max(score or 0.5 for _, _, score in EDGES)}]
+    if "UNWIND $ids" in query:
+        return [
+            {"source": source, "sourceName": source, "sourceLabels": LABELS[source],
+             "target": target, "targetName": target, "targetLabels": LABELS[target],
+             "score": score, "predicted": False}
+            for source, target, score in EDGES
+            if source in params["ids"] and "Job" not in LABELS[target]
+        ]
+    if "MATCH (n1)-[r:REQUIRES]->(n2)" in query:
+        return [{"source": s, "target": t, "score": score, "predicted": False} for s, t, score in EDGES]
+    if "labels(n) as labels" in query:
+        return [{"id": n, "name": n, "labels": labels} for n, labels in LABELS.items()]
+    raise NotImplementedError(query)
+
+
+def test_cold_start_subgraph_picks_the_full_snapshot_path(monkeypatch):
+    monkeypatch.setattr(main, "run_read", fake_run_read)
+    skills = [
+        {"id": "T", "name": "T", "type": "HardSkill", "labels": LABELS["T"]},
+        {"id": "S", "name": "S", "type": "Technology", "labels": LABELS["S"]},
+    ]
+
+    async def snapshots():
+        cold = await main.get_job_snapshot("J", skills)
+        full = main.GraphSnapshot(*await main.get_all_graph_data(), "full")
+        return cold, full
+
+    cold, full = asyncio.run(snapshots())
+    assert cold.graph.score_max == full.graph.score_max == 10.0
+    assert cold.prev["T"] == full.prev["T"] == "M"
+    assert cold.nodes["S"]["labels"] == full.nodes["S"]["labels"] == {"Concept", "Technology"}
@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+from benchmarks.reference_dp import prev_mismatches
+
+
+def random_dag(num_nodes, num_edges, seed):
+    """Skill graph whose REQUIRES edges all point to a lower-numbered node"""
+    rng = random.Random(seed)
+    nodes, label_of = {}, {}
+    for i in range(num_nodes):
+        label = rng.choice(["Concept", "HardSkill", "Technology", "SoftSkill"])
+        nodes[f"s{i}"] = {"id": f"s{i}", "name": f"Skill {i}", "labels": {label}}
+        label_of[f"s{i}"] = {label}
+    pairs = set()
+    while len(pairs) < num_edges:
+        prerequisite, dependent = sorted(rng.sample(range(num_nodes), 2))
+        pairs.add((dependent, prerequisite))
+    # Scores on a coarse grid so ties between predecessors are common
+    edges = [
+        {"source": f"s{a}", "target": f"s{b}", "score": rng.choice([0.25, 0.5, 0.75, 1.0]), "predicted": rng.random() < 0.3}
+        for a, b in sorted(pairs)
+    ]
+    return nodes, label_of, edges
+
+
+@pytest.mark.parametrize("num_nodes,num_edges,seed", [(200, 500, 0), (1000, 3000, 1), (1000, 3000, 2)])
+def test_kernel_matches_networkx_on_acyclic_graphs(num_nodes, num_edges, seed):
+    nodes, label_of, edges = random_dag(num_nodes, num_edges, seed)
+    assert prev_mismatches(nodes, label_of, edges) == []
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.stub_driver import install
+from benchmarks.synthetic_graph import generate_graph
+from graph_store import SharedGraphStore
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    data = generate_graph(2000, seed=0)
+    install(main, data)
+    monkeypatch.setattr(main.graph_cache, "_snapshot", None)
+    monkeypatch.setattr(main.graph_cache, "_last_check", 0.0)
+    return data
+
+
+def longest_path(client, job_id):
+    paths = client.post("/generate-path", json={"jobId": job_id}).json()["learningPaths"]
+    return max(paths.items(), key=lambda item: len(item[1]))
+
+
+def test_path_workers_compute_on_the_snapshot_after_an_edge_delta(graph, monkeypatch, tmp_path):
+    pool = main.path_pool
+    monkeypatch.setattr(pool, "workers", 1)
+    monkeypatch.setattr(pool, "snapshot_dir", tmp_path)
+    job_id = next(iter(graph.job_skills))
+    with TestClient(main.app) as client:
+        client.post("/graph/refresh")
+        skill, path = longest_path(client, job_id)
+        version = main.graph_cache.peek().version
+
+        # (dependent)-[:REQUIRES]->(prerequisite) for the last step of the path
+        response = client.post("/graph/edges/delta", json={
+            "baseVersion": version,
+            "changes": [{"op": "delete", "source": path[-1], "target": path[-2]}]
+        })
+        assert response.status_code == 200
+        assert response.json()["snapshot"]["version"] == f"{version}+delta1"
+
+        pooled = client.post("/generate-path", json={"jobId": job_id}).json()["learningPaths"]
+        monkeypatch.setattr(pool, "workers", 0)
+        main.response_cache.clear()
+        inline = client.post("/generate-path", json={"jobId": job_id}).json()["learningPaths"]
+    pool.shutdown()
+
+    assert pooled[skill] == inline[skill]
+    assert list(zip(pooled[skill], pooled[skill][1:]))[-1:] != [(path[-2], path[-1])]
+
+
+def test_delta_against_another_graph_version_reloads_the_graph(graph):
+    edge = next(e for e in graph.edges if "Job" not in graph.label_of[e["source"]])
+    with TestClient(main.app) as client:
+        version = client.post("/graph/refresh").json()["snapshot"]["version"]
+        response = client.post("/graph/edges/delta", json={
+            "baseVersion": "0:0:None:None",
+            "changes": [{"op": "delete", "source": edge["source"], "target": edge["target"]}]
+        })
+    assert response.status_code == 200
+    assert response.json()["delta"] is None
+    # Reloaded from Neo4j, which still has the edge
+    assert response.json()["snapshot"]["version"] == version
+    assert main.graph_cache.peek().edge_index.get(edge["source"], edge["target"]) is not None
+
+
+def test_shared_snapshot_workers_pick_up_each_others_deltas(graph, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "shared_graph", SharedGraphStore(tmp_path))
+    first, second = main.GraphSnapshotCache(), main.GraphSnapshotCache()
+    edges = [e for e in graph.edges if "Job" not in graph.label_of[e["source"]]]
+
+    async def scenario():
+        await first.get()
+        await second.get()
+        await first.apply_edge_changes(
+            [{"op": "delete", "source": edges[0]["source"], "target": edges[0]["target"]}], first.peek().version
+        )
+        # The second worker sees the delta at its next version check
+        second._last_check = 0.0
+        await second.get()
+        assert second.peek().version == first.peek().version
+        # and builds its own delta on top of it
+        await second.apply_edge_changes(
+            [{"op": "delete", "source": edges[1]["source"], "target": edges[1]["target"]}], second.peek().version
+        )
+        first._last_check = 0.0
+        await first.get()
+
+    asyncio.run(scenario())
+    for cache in (first, second):
+        snapshot = cache.peek()
+        assert snapshot.version.endswith("+delta2")
+        assert snapshot.edge_index.get(edges[0]["source"], edges[0]["target"]) is None
+        assert snapshot.edge_index.get(edges[1]["source"], edges[1]["target"]) is None
+    assert first.peek().dp_tables.prev.tolist() == second.peek().dp_tables.prev.tolist()
@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import main
+from benchmarks.stub_driver import install
+from benchmarks.synthetic_graph import generate_graph
+from graph_engine import CSRGraph
+from graph_store import SharedGraphStore, import_csv, open_snapshot, write_snapshot
+
+
+def two_node_graph():
+    nodes = {
+        "a": {"id": "a", "name": "A", "labels": {"Concept"}},
+        "b": {"id": "b", "name": "B", "labels": {"HardSkill"}},
+    }
+    label_of = {node_id: node["labels"] for node_id, node in nodes.items()}
+    edges = [{"source": "b", "target": "a", "score": 0.5, "predicted": False}]
+    return CSRGraph.from_graph_data(nodes, label_of, edges)
+
+
+def assert_arrays_inside_file(path):
+    graph_file = open_snapshot(path)
+    size = path.stat().st_size
+    for name, spec in graph_file.header["arrays"].items():
+        assert graph_file._data_start + spec["offset"] <= size, name
+
+
+def test_snapshot_with_empty_trailing_arrays_reads_back(tmp_path):
+    path = tmp_path / "graph.cpg"
+    # No definitions, embeddings or DP tables: definition_data is the last
+    # array and it is empty
+    write_snapshot(path, two_node_graph(), ["A", "B"], [None, None], "v1")
+    assert_arrays_inside_file(path)
+
+    snapshot = main.GraphSnapshot.from_file(path)
+    assert snapshot.version == "v1"
+    assert snapshot.nodes["a"] == {"id": "a", "name": "A", "definition": None, "labels": {"Concept"}}
+    assert snapshot.prev["b"] == "a"
+
+
+def test_csv_import_without_definitions_reads_back(tmp_path):
+    nodes_csv, edges_csv = tmp_path / "nodes.csv", tmp_path / "edges.csv"
+    nodes_csv.write_text("nodeId:ID,name,labels:LABEL\na,A,Concept\nb,B,HardSkill\nc,C,Technology\n")
+    edges_csv.write_text(":START_ID,:END_ID,:TYPE,score:float\nb,a,REQUIRES,0.4\nc,b,REQUIRES,0.9\n")
+    path = tmp_path / "graph.cpg"
+    import_csv(nodes_csv, edges_csv, path)
+    assert_arrays_inside_file(path)
+
+    snapshot = main.GraphSnapshot.from_file(path)
+    assert snapshot.graph.num_edges == 2
+    assert snapshot.prev["c"] == "b"
+
+
+def attach_shared(directory):
+    """Runs in a separate process: load the graph through a shared store"""
+    driver = install(main, generate_graph(300, seed=0))
+    main.shared_graph = SharedGraphStore(directory)
+    snapshot = asyncio.run(main.GraphSnapshotCache().get())
+    return os.getpid(), snapshot.version, snapshot.shared_path, driver.round_trips, dict(snapshot.prev)
+
+
+def test_processes_attach_the_published_snapshot(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    executors = [ProcessPoolExecutor(1, mp_context=context) for _ in range(3)]
+    try:
+        publisher = executors[0].submit(attach_shared, tmp_path).result()
+        attaching = [executor.submit(attach_shared, tmp_path) for executor in executors[1:]]
+        attached = [future.result() for future in attaching]
+    finally:
+        for executor in executors:
+            executor.shutdown()
+
+    # The first process loaded the graph from Neo4j and published it
+    assert publisher[3] > 1
+    assert len({pid for pid, *_ in attached}) == 2
+    for _, version, shared_path, round_trips, prev in attached:
+        assert (version, shared_path, prev) == publisher[1:3] + (publisher[4],)
+        # Only the version check went to Neo4j
+        assert round_trips == 1
+    assert [p.name for p in tmp_path.glob("graph-*.cpg")] == [os.path.basename(publisher[2])]
+
+
+def test_replaced_files_are_kept_for_the_grace_period(tmp_path):
+    store = SharedGraphStore(tmp_path)
+    graph = two_node_graph()
+
+    def publish(version):
+        lock = store.acquire()
+        try:
+            return store.publish(lambda path: write_snapshot(path, graph, ["A", "B"], [None, None], version))
+        finally:
+            store.release(lock)
+
+    first, second, third = publish("v1"), publish("v2"), publish("v3")
+    # A process that read "current" before the second publish can still open v1
+    assert open_snapshot(first).version == "v1"
+    store.GRACE_SECONDS = 0
+    fourth = publish("v4")
+    assert sorted(tmp_path.glob("graph-*.cpg")) == sorted([third, fourth])
+    assert store.current() == fourth
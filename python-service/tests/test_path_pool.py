@@ -0,0 +1,105 @@
+import asyncio
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.stub_driver import install
+from benchmarks.synthetic_graph import generate_graph
+from path_pool import DeadlineExceeded, PathWorkerPool
+
+
+def worker_pid(seconds, snapshot):
+    """Runs in a path worker: sleep, then report which process ran"""
+    time.sleep(seconds)
+    return os.getpid()
+
+
+@pytest.fixture
+def graph(monkeypatch, tmp_path):
+    data = generate_graph(300, seed=0)
+    install(main, data)
+    monkeypatch.setattr(main.graph_cache, "_snapshot", None)
+    monkeypatch.setattr(main.graph_cache, "_last_check", 0.0)
+    monkeypatch.setattr(main.path_pool, "workers", 1)
+    monkeypatch.setattr(main.path_pool, "snapshot_dir", tmp_path)
+    main.response_cache.clear()
+    yield data
+    main.path_pool.shutdown()
+
+
+def test_saturated_pool_answers_503(graph, monkeypatch):
+    monkeypatch.setattr(main.path_pool, "max_pending", 0)
+    with TestClient(main.app) as client:
+        client.post("/graph/refresh")
+        response = client.post("/generate-path", json={"jobId": next(iter(graph.job_skills))})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["status"] == "error"
+
+
+def test_timed_out_computation_answers_504(graph, monkeypatch):
+    monkeypatch.setattr(main.path_pool, "timeout", 0.001)
+    with TestClient(main.app) as client:
+        client.post("/graph/refresh")
+        response = client.post("/generate-path", json={"jobId": next(iter(graph.job_skills))})
+    assert response.status_code == 504
+    assert response.json()["status"] == "error"
+
+
+def test_timed_out_computation_does_not_keep_its_worker(tmp_path):
+    pool = PathWorkerPool(1, 4, 3.0, tmp_path)
+
+    async def scenario():
+        pool.publish(SimpleNamespace(version="v1"))
+        assert await pool.serves(SimpleNamespace(version="v1"))
+        first = await pool.run(worker_pid, 0)
+        with pytest.raises(DeadlineExceeded):
+            await pool.run(worker_pid, 60)
+        # With the only worker still sleeping, this would time out as well
+        return first, await pool.run(worker_pid, 0)
+
+    try:
+        first, second = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert second != first
+    deadline = time.time() + 10
+    while os.path.exists(f"/proc/{first}") and time.time() < deadline:
+        time.sleep(0.05)
+    assert not os.path.exists(f"/proc/{first}")
+
+
+def test_publish_keeps_only_the_latest_snapshot(tmp_path):
+    pool = PathWorkerPool(1, 4, 3.0, tmp_path)
+
+    async def scenario():
+        # Both writes wait for the lock; whichever runs first, v1 is dropped
+        with pool._write_lock:
+            pool.publish(SimpleNamespace(version="v1"))
+            pool.publish(SimpleNamespace(version="v2"))
+        return await pool.serves(SimpleNamespace(version="v2"))
+
+    assert asyncio.run(scenario())
+    assert pool._version == "v2"
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_failed_publish_falls_back_to_inline_computation(tmp_path):
+    pool = PathWorkerPool(1, 4, 3.0, tmp_path)
+
+    async def scenario():
+        # Locks can't be pickled, so writing this snapshot fails
+        pool.publish(SimpleNamespace(version="v1", lock=threading.Lock()))
+        failed = [await pool.serves(SimpleNamespace(version="v1")) for _ in range(2)]
+        pool.publish(SimpleNamespace(version="v2"))
+        return failed, await pool.serves(SimpleNamespace(version="v2"))
+
+    failed, served = asyncio.run(scenario())
+    assert failed == [False, False]
+    assert served
+    assert [p.suffix for p in tmp_path.iterdir()] == [".pickle"]
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from benchmarks.stub_driver import install
+from benchmarks.synthetic_graph import generate_graph
+
+REQUESTS = 8
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    data = generate_graph(300, seed=0)
+    driver = install(main, data)
+    monkeypatch.setattr(main.graph_cache, "_snapshot", None)
+    monkeypatch.setattr(main.graph_cache, "_last_check", 0.0)
+    main.response_cache.clear()
+    return data, driver
+
+
+def count_calls(monkeypatch, name, calls):
+    """Count calls of main.<name>, keeping each one in flight a little longer"""
+    fn = getattr(main, name)
+
+    async def counted(*args, **kwargs):
+        calls[name] = calls.get(name, 0) + 1
+        await asyncio.sleep(0.05)
+        return await fn(*args, **kwargs)
+
+    monkeypatch.setattr(main, name, counted)
+
+
+def test_identical_concurrent_requests_share_one_computation(graph, monkeypatch):
+    data, driver = graph
+    job_id = next(iter(data.job_skills))
+    calls = {}
+
+    async def scenario():
+        await main.graph_cache.refresh()
+        count_calls(monkeypatch, "get_job_skills", calls)
+        count_calls(monkeypatch, "build_job_path_body", calls)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            round_trips = driver.round_trips
+            responses = await asyncio.gather(*(
+                client.post("/generate-path", json={"jobId": job_id, "userSkills": []})
+                for _ in range(REQUESTS)
+            ))
+            return responses, driver.round_trips - round_trips
+
+    responses, round_trips = asyncio.run(scenario())
+    assert [r.status_code for r in responses] == [200] * REQUESTS
+    assert len({r.content for r in responses}) == 1
+    assert calls == {"get_job_skills": 1, "build_job_path_body": 1}
+    # The job's skills are read from Neo4j once for all requests
+    assert round_trips == 1
+    assert len(main.path_flight) == len(main.job_skills_flight) == 0
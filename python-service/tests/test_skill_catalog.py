@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.stub_driver import install
+from benchmarks.synthetic_graph import generate_graph
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    data = generate_graph(300, seed=0)
+    # A node with two skill labels is listed once, typed by skill_type_of
+    both = next(n for n, labels in data.label_of.items() if labels == {"Technology"})
+    data.label_of[both] = data.nodes[both]["labels"] = {"Technology", "HardSkill"}
+    for node_id, node in data.nodes.items():
+        node["definition"] = f"Definition of {node_id}"
+    driver = install(main, data)
+    monkeypatch.setattr(main.graph_cache, "_snapshot", None)
+    monkeypatch.setattr(main.graph_cache, "_last_check", 0.0)
+    monkeypatch.setattr(main, "skill_catalog_cache", main.SkillCatalogCache())
+    return data, driver
+
+
+def all_pages(client, **params):
+    skills, after = [], None
+    while True:
+        page = client.get("/skills", params={**params, **({"after": after} if after else {})}).json()
+        skills.extend(page["skills"])
+        after = page["nextCursor"]
+        if after is None:
+            return skills
+
+
+@pytest.mark.parametrize("types", [None, "Concept,Technology", "HardSkill"])
+def test_pages_cover_the_catalog_in_id_order(graph, types):
+    data, driver = graph
+    selected = set(types.split(",")) if types else set(main.SKILL_LABELS)
+    expected = sorted(n for n, labels in data.label_of.items() if labels & selected)
+    with TestClient(main.app) as client:
+        client.get("/skills", params={"limit": 1})
+        round_trips = driver.round_trips
+        skills = all_pages(client, limit=7, **({"types": types} if types else {}))
+        # Pages come from the loaded snapshot, not from a query per page
+        assert driver.round_trips == round_trips
+
+    assert [skill["id"] for skill in skills] == expected
+    for skill in skills:
+        assert skill["type"] == main.skill_type_of(data.label_of[skill["id"]])
+        assert "definition" not in skill
+
+
+def test_full_pages_look_up_definitions_by_id(graph):
+    data, driver = graph
+    with TestClient(main.app) as client:
+        client.post("/graph/refresh")
+        queries = []
+        answer = driver.answer
+        driver.answer = lambda query, params: queries.append(params.get("ids")) or answer(query, params)
+        skills = all_pages(client, fields="full", limit=50)
+
+    assert all(skill["definition"] == f"Definition of {skill['id']}" for skill in skills)
+    # One lookup per page, for that page's skills (plus the cursor row)
+    assert all(ids is not None and len(ids) <= 51 for ids in queries)
+    assert len(queries) == -(-len(skills) // 50)
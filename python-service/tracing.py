@@ -0,0 +1,82 @@
+"""Request-scoped debug traces.
+
+Hot paths log aggregate counters at INFO and route per-record detail
+through ``detail()``. Detail lines are only emitted (at INFO) for requests
+sent with an ``X-Debug-Trace`` header; otherwise they go to DEBUG, which
+is off by default, so they cost one context-variable lookup. Messages use
+%-style arguments and are only formatted when a line is actually written.
+"""
+import logging
+import os
+import time
+import uuid
+from contextvars import ContextVar
+
+# Allow clients to turn on per-request debug traces with X-Debug-Trace
+DEBUG_TRACE_ENABLED = os.getenv("DEBUG_TRACE_ENABLED", "false").lower() in ("1", "true", "yes")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+DEBUG_TRACE_HEADER = "X-Debug-Trace"
+
+_request_id = ContextVar("request_id", default="-")
+_trace = ContextVar("debug_trace", default=None)
+
+
+class RequestTrace:
+    """Detail lines recorded for one traced request"""
+    __slots__ = ("request_id", "started", "events")
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.events = 0
+
+
+class RequestIdFilter(logging.Filter):
+    """Add the current request id to every log record as ``request_id``"""
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class PathNames:
+    """Lazily rendered "a -> b -> c" chain of node names for log messages"""
+    __slots__ = ("path", "nodes")
+
+    def __init__(self, path, nodes):
+        self.path = path
+        self.nodes = nodes
+
+    def __str__(self):
+        nodes = self.nodes
+        return " -> ".join(nodes[n]["name"] if n in nodes else str(n) for n in self.path)
+
+
+def detail(log, msg, *args):
+    """Log per-record detail: INFO for traced requests, DEBUG otherwise"""
+    trace = _trace.get()
+    if trace is not None:
+        trace.events += 1
+        log.info(msg, *args)
+    else:
+        log.debug(msg, *args)
+
+
+def start_request(request_id=None, debug=False):
+    """Bind a request id (and optionally a debug trace) to the current context"""
+    request_id = request_id or uuid.uuid4().hex
+    trace = RequestTrace(request_id) if debug and DEBUG_TRACE_ENABLED else None
+    return request_id, (_request_id.set(request_id), _trace.set(trace))
+
+
+def finish_request(tokens, log):
+    """Log the trace summary, if any, and unbind the request context"""
+    id_token, trace_token = tokens
+    trace = _trace.get()
+    if trace is not None:
+        log.info(
+            "Debug trace finished: %d detail lines in %.1f ms",
+            trace.events, (time.perf_counter() - trace.started) * 1000,
+        )
+    _trace.reset(trace_token)
+    _request_id.reset(id_token)